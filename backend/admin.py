@@ -0,0 +1,32 @@
+"""Admin gating for operational endpoints and request flags.
+
+Admin access is granted by sending the value of the ``ADMIN_TOKEN``
+environment variable in the ``X-Admin-Token`` header. When ``ADMIN_TOKEN``
+is unset every admin feature is disabled.
+"""
+import hmac
+import os
+
+from fastapi import HTTPException, Request
+
+ADMIN_TOKEN_HEADER = "X-Admin-Token"
+
+
+def configured_admin_token():
+    """Return the configured admin token, or None if admin access is disabled."""
+    return os.environ.get('ADMIN_TOKEN') or None
+
+
+def is_admin(request: Request) -> bool:
+    """Check whether the request carries the configured admin token."""
+    expected = configured_admin_token()
+    supplied = request.headers.get(ADMIN_TOKEN_HEADER)
+    if not expected or not supplied:
+        return False
+    return hmac.compare_digest(supplied.encode(), expected.encode())
+
+
+async def require_admin(request: Request):
+    """FastAPI dependency rejecting requests without a valid admin token."""
+    if not is_admin(request):
+        raise HTTPException(status_code=403, detail="Admin token required")
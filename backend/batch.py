@@ -0,0 +1,129 @@
+"""Several API calls in one round trip.
+
+``POST /api/batch`` takes a list of sub-requests against the other ``/api``
+routes::
+
+    {"requests": [
+        {"id": "recent", "method": "GET", "path": "/api/status", "query": {"limit": 50}},
+        {"id": "total", "method": "GET", "path": "/api/status/count"},
+        {"id": "ping", "method": "POST", "path": "/api/status", "body": {"client_name": "dash"}}
+    ]}
+
+and answers with one result per sub-request, in the same order::
+
+    {"responses": [{"id": "recent", "status": 200, "headers": {...}, "body": [...]}, ...]}
+
+Sub-requests are dispatched concurrently and in-process, straight to the
+app's routes through its exception handlers: no sockets or HTTP parsing.
+They skip the app middleware (compression and profiling apply to the batch
+as a whole) and see the batch request's headers, so an admin token or
+client name sent with the batch applies to each of them, including the
+``/api/admin`` routes. A sub-request may add headers of its own, except
+the ones describing bodies and formats: sub-requests always get JSON.
+Being concurrent, sub-requests of one batch run in no particular order;
+send calls that depend on each other in separate batches.
+
+A failing sub-request only fails its own entry. ``BATCH_MAX_REQUESTS``
+(default 20) caps the number of sub-requests per batch.
+"""
+import asyncio
+import json
+import logging
+from urllib.parse import urlencode
+
+from starlette.middleware.exceptions import ExceptionMiddleware
+
+logger = logging.getLogger(__name__)
+
+API_PREFIX = "/api/"
+
+# Set by the dispatcher: they describe the batch's own body and format, or the JSON sub-requests get
+_BATCH_ONLY_HEADERS = {b"accept", b"accept-encoding", b"content-length", b"content-type", b"transfer-encoding"}
+# Carried over from the batch connection; routing state from its own dispatch is not
+_SCOPE_KEYS = ("type", "asgi", "http_version", "scheme", "server", "client", "root_path", "app", "state")
+
+
+class BatchError(ValueError):
+    """A batch that can't be run at all (as opposed to a failing sub-request)."""
+
+
+class BatchDispatcher:
+    def __init__(self, router, exception_handlers, batch_path, max_requests=20):
+        self.batch_path = batch_path
+        self.max_requests = max_requests
+        self._app = ExceptionMiddleware(router, handlers=exception_handlers)
+
+    def validate(self, sub_requests):
+        if not sub_requests:
+            raise BatchError("A batch needs at least one request")
+        if len(sub_requests) > self.max_requests:
+            raise BatchError(f"At most {self.max_requests} requests per batch")
+
+    async def run(self, scope, sub_requests):
+        """Results of ``sub_requests``, dispatched concurrently on behalf of the batch's ``scope``."""
+        self.validate(sub_requests)
+        return await asyncio.gather(*(self._dispatch(scope, sub_request) for sub_request in sub_requests))
+
+    async def _dispatch(self, parent_scope, sub_request):
+        result = {"id": sub_request.id, "status": 500, "headers": {}, "body": None}
+        path = sub_request.path.split("?", 1)[0]
+        if not path.startswith(API_PREFIX) or path.rstrip("/") == self.batch_path.rstrip("/"):
+            result.update(status=400, body={"detail": f"Not a batchable API path: {path}"})
+            return result
+
+        body = b"" if sub_request.body is None else json.dumps(sub_request.body).encode()
+        headers = [(name, value) for name, value in parent_scope["headers"] if name not in _BATCH_ONLY_HEADERS]
+        for name, value in sub_request.headers.items():
+            name = name.lower().encode("latin-1")
+            if name not in _BATCH_ONLY_HEADERS:
+                headers.append((name, value.encode("latin-1")))
+        headers += [(b"accept", b"application/json"), (b"content-length", str(len(body)).encode())]
+        if body:
+            headers.append((b"content-type", b"application/json"))
+        scope = {key: parent_scope[key] for key in _SCOPE_KEYS if key in parent_scope}
+        scope.update(
+            method=sub_request.method.upper(),
+            path=path,
+            raw_path=path.encode(),
+            query_string=urlencode(sub_request.query, doseq=True).encode(),
+            headers=headers,
+        )
+
+        received = False
+
+        async def receive():
+            nonlocal received
+            if not received:
+                received = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            await asyncio.Event().wait()  # never disconnects; the response is read in full
+
+        chunks = []
+
+        async def send(message):
+            if message["type"] == "http.response.start":
+                result["status"] = message["status"]
+                result["headers"] = {
+                    name.decode("latin-1"): value.decode("latin-1") for name, value in message["headers"]
+                    if name != b"content-length"
+                }
+            elif message["type"] == "http.response.body":
+                chunks.append(message.get("body", b""))
+
+        try:
+            await self._app(scope, receive, send)
+        except Exception:
+            logger.exception("Batched %s %s failed", scope["method"], path)
+            result.update(status=500, headers={}, body={"detail": "Internal Server Error"})
+            return result
+
+        result["body"] = _decode_body(b"".join(chunks), result["headers"].get("content-type", ""))
+        return result
+
+
+def _decode_body(raw, content_type):
+    if not raw:
+        return None
+    if content_type.startswith("application/json"):
+        return json.loads(raw)
+    return raw.decode("utf-8", errors="replace")
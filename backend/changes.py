@@ -0,0 +1,105 @@
+"""Change feed for status_checks: "what's new since sequence number X?"
+
+Every insert takes the next number from a counter document (one atomic
+``$inc`` in the ``counters`` collection; a batch takes a block of numbers
+in one ``$inc``) and stores it on the check. A
+consumer reads ``GET /api/status/changes?since=<seq>`` and passes the
+returned ``next_since`` back next time. That is enough to sync
+incrementally and to resume exactly where it left off after a crash.
+
+Taking a number and inserting the document are two round trips, so a
+later number can land before an earlier one. The feed therefore never
+returns past a *horizon* below any number still being inserted: exactly,
+for inserts made through this process, and for other workers by leaving
+out checks newer than ``STATUS_CHANGES_SETTLE_SECONDS``. That defaults to
+0 with a single worker and to ``MULTI_WORKER_SETTLE_SECONDS`` when
+``WEB_CONCURRENCY`` (set by serve.py) says several workers share the
+counter; raise it above the worst insert latency if that is longer.
+
+The feed is always read from the primary: a lagging secondary could be
+missing an earlier number the consumer would then skip for good.
+
+Checks stored before the counter existed have no number and only show up
+in full listings.
+"""
+import asyncio
+import heapq
+from datetime import datetime, timedelta
+
+COUNTER_ID = "status_checks"
+
+# Settle window when several workers allocate from the same counter
+MULTI_WORKER_SETTLE_SECONDS = 5.0
+
+
+def settle_seconds_from_env(environ):
+    """``STATUS_CHANGES_SETTLE_SECONDS``, else the default for the worker count."""
+    value = environ.get("STATUS_CHANGES_SETTLE_SECONDS")
+    if value:
+        return float(value)
+    workers = int(environ.get("WEB_CONCURRENCY") or 1)
+    return MULTI_WORKER_SETTLE_SECONDS if workers > 1 else 0.0
+
+
+class SequenceAllocator:
+    """Hands out increasing sequence numbers and tracks which are not yet inserted."""
+
+    def __init__(self, counter_id=COUNTER_ID):
+        self.counter_id = counter_id
+        self._last_seen = 0
+        self._pending = []  # for allocations still awaiting the counter: _last_seen when they started
+        self._in_flight = set()  # numbers handed out but not released
+
+    async def allocate(self, counters, count=1):
+        """Reserve ``count`` consecutive numbers; returns the first.
+
+        The block is released as a whole by passing that first number to ``release``.
+        """
+        floor = self._last_seen
+        self._pending.append(floor)
+        try:
+            document = await counters.find_one_and_update(
+                {"_id": self.counter_id},
+                {"$inc": {"seq": count}},
+                upsert=True,
+                return_document=True,  # ReturnDocument.AFTER, without importing pymongo at startup
+            )
+        finally:
+            self._pending.remove(floor)
+        last = document["seq"]
+        first = last - count + 1
+        self._in_flight.add(first)
+        self._last_seen = max(self._last_seen, last)
+        return first
+
+    def release(self, seq):
+        """The documents numbered from ``seq`` were inserted (or the insert failed)."""
+        self._in_flight.discard(seq)
+
+    def horizon(self):
+        """Highest number safe to serve, or None when nothing is outstanding here."""
+        bounds = [seq - 1 for seq in self._in_flight] + self._pending
+        return min(bounds) if bounds else None
+
+
+async def read_changes(collections, since, limit, fields, horizon=None, settle_seconds=0.0):
+    """Up to ``limit`` documents with a sequence number above ``since``, in sequence order.
+
+    Sequence numbers are not aligned with time partitions (a check created
+    just before a boundary can be numbered after one created just past it),
+    so every partition is asked (concurrently) for its first ``limit``
+    matches on the seq index and the sorted results are merged.
+    """
+    seq_field = fields["seq"]
+    bounds = {"$gt": since}
+    if horizon is not None:
+        bounds["$lte"] = horizon
+    query = {seq_field: bounds}
+    if settle_seconds:
+        query[fields["timestamp"]] = {"$lt": datetime.utcnow() - timedelta(seconds=settle_seconds)}
+
+    batches = await asyncio.gather(*(
+        collection.find(query).sort(seq_field, 1).limit(limit).to_list(limit) for collection in collections
+    ))
+    merged = heapq.merge(*batches, key=lambda document: document[seq_field])
+    return [document for _, document in zip(range(limit), merged)]
@@ -0,0 +1,84 @@
+"""In-memory directory of distinct client names for typeahead lookups.
+
+Names are kept in one list sorted by their case-folded form, so a prefix
+lookup is a bisect to the first candidate followed by a scan of the ``k``
+matches: O(log n + k), with no database round trip. The list is filled once
+from ``distinct`` over the status_checks collections (on startup, in the
+background) and kept current by ``add`` on every insert.
+
+Names live in process memory: with several workers, a name first written
+through another worker shows up here on the next background reload, at most
+``refresh_seconds`` (``CLIENT_DIRECTORY_REFRESH_SECONDS``, default 300)
+after the last one.
+"""
+import asyncio
+import bisect
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class ClientDirectory:
+    def __init__(self, refresh_seconds=300.0):
+        self.refresh_seconds = refresh_seconds
+        self._entries = []  # (casefolded name, name), sorted
+        self._names = set()
+        self._loaded_at = None
+        self._load_lock = asyncio.Lock()
+        self._reload_task = None
+
+    @classmethod
+    def from_env(cls, environ):
+        return cls(refresh_seconds=float(environ.get('CLIENT_DIRECTORY_REFRESH_SECONDS', '300')))
+
+    def __len__(self):
+        return len(self._entries)
+
+    def add(self, name):
+        if name in self._names:
+            return
+        self._names.add(name)
+        bisect.insort(self._entries, (name.casefold(), name))
+
+    def update(self, names):
+        """Merge many names at once (one sort instead of an insertion each)."""
+        new = set(names) - self._names
+        if not new:
+            return
+        self._names |= new
+        self._entries = sorted(self._entries + [(name.casefold(), name) for name in new])
+
+    def lookup(self, prefix, limit):
+        """Up to ``limit`` names starting with ``prefix`` (case-insensitively), in order."""
+        folded = prefix.casefold()
+        start = bisect.bisect_left(self._entries, (folded,))
+        matches = []
+        for key, name in self._entries[start:start + limit]:
+            if not key.startswith(folded):
+                break
+            matches.append(name)
+        return matches
+
+    async def ensure_loaded(self, loader):
+        """Load from ``loader`` (an async callable returning names) unless already loaded.
+
+        Concurrent callers wait for the one load. Once loaded, a stale
+        directory is reloaded in the background and served as it is meanwhile.
+        """
+        if self._loaded_at is None:
+            async with self._load_lock:
+                if self._loaded_at is None:
+                    self.update(await loader())
+                    self._loaded_at = time.monotonic()
+            return
+        stale = time.monotonic() - self._loaded_at >= self.refresh_seconds
+        if stale and (self._reload_task is None or self._reload_task.done()):
+            self._reload_task = asyncio.create_task(self._reload(loader))
+
+    async def _reload(self, loader):
+        try:
+            self.update(await loader())
+            self._loaded_at = time.monotonic()
+        except Exception:
+            logger.exception("Failed to reload client names")
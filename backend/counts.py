@@ -0,0 +1,155 @@
+"""Cached counts for the status_checks collection.
+
+Counting is cheap compared to listing, but dashboards poll it constantly, so
+results are kept for a short TTL. Inserts bump every cached count whose
+filter matches the new document instead of invalidating it, so a count read
+right after a write is still exact.
+"""
+import asyncio
+import time
+from datetime import timezone
+
+
+def _naive_utc(value):
+    """Stored timestamps are naive UTC; normalise aware query bounds to match."""
+    if value is not None and value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+class StatusFilter:
+    """Optional client_name / [since, until) timestamp filter."""
+
+    __slots__ = ("client_name", "since", "until")
+
+    def __init__(self, client_name=None, since=None, until=None):
+        self.client_name = client_name
+        self.since = _naive_utc(since)
+        self.until = _naive_utc(until)
+
+    @property
+    def key(self):
+        return (self.client_name, self.since, self.until)
+
+    @property
+    def is_empty(self):
+        return self.key == (None, None, None)
+
+    def to_query(self, fields=None):
+        """Mongo query; ``fields`` maps model field names to stored ones (see storage.py)."""
+        client_name = fields["client_name"] if fields else "client_name"
+        timestamp = fields["timestamp"] if fields else "timestamp"
+        query = {}
+        if self.client_name is not None:
+            query[client_name] = self.client_name
+        if self.since is not None or self.until is not None:
+            query[timestamp] = {}
+            if self.since is not None:
+                query[timestamp]["$gte"] = self.since
+            if self.until is not None:
+                query[timestamp]["$lt"] = self.until
+        return query
+
+    def matches(self, document):
+        if self.client_name is not None and document.get("client_name") != self.client_name:
+            return False
+        timestamp = document.get("timestamp")
+        if self.since is not None and (timestamp is None or timestamp < self.since):
+            return False
+        if self.until is not None and (timestamp is None or timestamp >= self.until):
+            return False
+        return True
+
+
+class PendingCount:
+    """A count query in flight, and the matching inserts recorded while it ran."""
+
+    __slots__ = ("status_filter", "inserts")
+
+    def __init__(self, status_filter):
+        self.status_filter = status_filter
+        self.inserts = 0
+
+
+class CountCache:
+    """TTL cache of counts keyed by StatusFilter.
+
+    Inserts recorded while a count query is running are added onto its
+    result when it is stored (``begin`` / ``finish``); otherwise a result
+    computed just before them would be cached without them for a whole TTL.
+    One that landed early enough for the query to see it may then be counted
+    twice until the entry expires: a brief overcount, never a lost write.
+    """
+
+    def __init__(self, ttl=5.0, max_entries=1024):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = {}  # key -> (filter, count, expires_at)
+        self._pending = set()  # PendingCount for each count query in flight
+
+    def get(self, status_filter):
+        entry = self._entries.get(status_filter.key)
+        if entry is None:
+            return None
+        if entry[2] <= time.monotonic():
+            del self._entries[status_filter.key]
+            return None
+        return entry[1]
+
+    def set(self, status_filter, count):
+        self._entries.pop(status_filter.key, None)
+        while len(self._entries) >= self.max_entries:
+            del self._entries[next(iter(self._entries))]
+        self._entries[status_filter.key] = (status_filter, count, time.monotonic() + self.ttl)
+
+    def begin(self, status_filter):
+        """Start tracking inserts for a count query about to run."""
+        pending = PendingCount(status_filter)
+        self._pending.add(pending)
+        return pending
+
+    def finish(self, pending, count=None):
+        """Cache the query's ``count`` plus the inserts recorded since ``begin``; None if the query failed.
+
+        Returns the count as stored.
+        """
+        self._pending.discard(pending)
+        if count is None:
+            return None
+        count += pending.inserts
+        self.set(pending.status_filter, count)
+        return count
+
+    def record_insert(self, document):
+        """Update cached counts in place for a newly inserted document."""
+        for key, (status_filter, count, expires_at) in list(self._entries.items()):
+            if status_filter.matches(document):
+                self._entries[key] = (status_filter, count + 1, expires_at)
+        for pending in self._pending:
+            if pending.status_filter.matches(document):
+                pending.inserts += 1
+
+
+async def count_status_checks(collections, cache, status_filter, fields=None):
+    """Count documents matching the filter across ``collections``, going through the cache.
+
+    Unfiltered totals use the collection metadata via
+    ``estimated_document_count``; filtered counts rely on the
+    client_name/timestamp indexes created at startup. Partitions are counted
+    concurrently.
+    """
+    count = cache.get(status_filter)
+    if count is None:
+        if status_filter.is_empty:
+            counts = [collection.estimated_document_count() for collection in collections]
+        else:
+            query = status_filter.to_query(fields)
+            counts = [collection.count_documents(query) for collection in collections]
+        pending = cache.begin(status_filter)
+        try:
+            total = sum(await asyncio.gather(*counts))
+        except BaseException:
+            cache.finish(pending)
+            raise
+        count = cache.finish(pending, total)
+    return count
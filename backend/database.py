@@ -0,0 +1,55 @@
+"""Lazily created MongoDB handle.
+
+Importing Motor (and pymongo under it) is one of the largest costs of
+importing the app, and nothing needs it until the first query. ``LazyDatabase``
+stands in for a Motor database: the client is only built - and Motor only
+imported - on first attribute access, so ``db.status_checks`` works as before.
+
+A client is never shared across a fork: a process that inherits one builds
+its own on first use (each server worker gets its own connection pool).
+"""
+import os
+
+
+class LazyDatabase:
+    def __init__(self, url, name, **client_options):
+        self._url = url
+        self._name = name
+        self._client_options = client_options
+        self._client = None
+        self._database = None
+        self._pid = None
+
+    @property
+    def client(self):
+        if self._client is not None and self._pid != os.getpid():
+            # Inherited from the parent process; its sockets and pool aren't ours to use
+            self._client = None
+            self._database = None
+        if self._client is None:
+            from motor.motor_asyncio import AsyncIOMotorClient
+
+            self._client = AsyncIOMotorClient(self._url, **self._client_options)
+            self._pid = os.getpid()
+        return self._client
+
+    @property
+    def connected(self):
+        """True once the underlying client has been created."""
+        return self._client is not None
+
+    def __getattr__(self, name):
+        # Only called for attributes not defined on the proxy itself.
+        client = self.client
+        if self._database is None:
+            self._database = client[self._name]
+        return getattr(self._database, name)
+
+    def __getitem__(self, name):
+        return self.__getattr__(name)
+
+    def close(self):
+        if self._client is not None:
+            self._client.close()
+            self._client = None
+            self._database = None
@@ -0,0 +1,213 @@
+"""Response formats and compression for the API.
+
+Two independent pieces:
+
+* Content negotiation - a route can hand its payload to ``negotiate`` and
+  clients sending ``Accept: application/msgpack`` get MessagePack (with
+  native binary timestamps) instead of JSON. Without ``msgpack`` installed
+  every client gets JSON.
+* ``CompressionMiddleware`` - compresses compressible responses above a size
+  threshold with zstd (when ``zstandard`` is installed) or gzip, whichever
+  ``Accept-Encoding`` gives the higher q-value (zstd on a tie). Chunks are
+  compressed and flushed as they arrive, so streaming and chunked responses
+  keep working. Every compressible response carries ``Vary: Accept-Encoding``,
+  compressed or not, so caches never serve one encoding to a client that
+  asked for another.
+"""
+import zlib
+from datetime import datetime, timezone
+
+from pydantic import BaseModel
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.responses import Response
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - optional dependency
+    msgpack = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - optional dependency
+    zstandard = None
+
+MSGPACK_MEDIA_TYPES = ("application/msgpack", "application/x-msgpack")
+COMPRESSIBLE_MEDIA_TYPES = ("application/json", "application/msgpack", "text/")
+
+
+def _accepted(header_value):
+    """Parse an Accept-style header into {token: q}, dropping q=0 entries."""
+    return {token: q for token, q in _qvalues(header_value).items() if q > 0}
+
+
+def _qvalues(header_value):
+    """Parse an Accept-style header into {token: q}, explicit refusals (q=0) included."""
+    qvalues = {}
+    for part in (header_value or "").split(","):
+        token, _, params = part.strip().partition(";")
+        token = token.strip().lower()
+        if not token:
+            continue
+        q = 1.0
+        for param in params.split(";"):
+            name, _, value = param.strip().partition("=")
+            if name == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        qvalues[token] = q
+    return qvalues
+
+
+def wants_msgpack(request):
+    """True if the client prefers MessagePack and we are able to produce it."""
+    if msgpack is None:
+        return False
+    accepted = _accepted(request.headers.get("accept"))
+    msgpack_q = max((accepted.get(t, 0.0) for t in MSGPACK_MEDIA_TYPES), default=0.0)
+    return msgpack_q > 0 and msgpack_q >= accepted.get("application/json", 0.0)
+
+
+def _msgpack_default(value):
+    if isinstance(value, BaseModel):
+        return value.model_dump()
+    if isinstance(value, datetime):
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        return msgpack.Timestamp.from_datetime(value)
+    raise TypeError(f"Cannot serialize {type(value).__name__} to MessagePack")
+
+
+class MsgPackResponse(Response):
+    media_type = "application/msgpack"
+
+    def render(self, content):
+        return msgpack.packb(content, default=_msgpack_default, use_bin_type=True)
+
+
+def negotiate(request, payload):
+    """Return ``payload`` as MessagePack if requested, otherwise unchanged.
+
+    Returning the payload itself keeps FastAPI's normal ``response_model``
+    handling for JSON clients.
+    """
+    if wants_msgpack(request):
+        return MsgPackResponse(payload, headers={"Vary": "Accept"})
+    return payload
+
+
+class _GzipStream:
+    encoding = "gzip"
+
+    def __init__(self, level):
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, chunk, final):
+        data = self._compressor.compress(chunk)
+        return data + self._compressor.flush(zlib.Z_FINISH if final else zlib.Z_SYNC_FLUSH)
+
+
+class _ZstdStream:
+    encoding = "zstd"
+
+    def __init__(self, level):
+        self._compressor = zstandard.ZstdCompressor(level=level).compressobj()
+
+    def compress(self, chunk, final):
+        data = self._compressor.compress(chunk)
+        mode = zstandard.COMPRESSOBJ_FLUSH_FINISH if final else zstandard.COMPRESSOBJ_FLUSH_BLOCK
+        return data + self._compressor.flush(mode)
+
+
+def choose_encoder(accept_encoding, gzip_level=6, zstd_level=3):
+    """Pick the supported encoder the Accept-Encoding header rates highest (zstd on a tie), or None."""
+    qvalues = _qvalues(accept_encoding)
+    default = qvalues.get("*", 0.0)
+    candidates = [("gzip", lambda: _GzipStream(gzip_level))]
+    if zstandard is not None:
+        candidates.insert(0, ("zstd", lambda: _ZstdStream(zstd_level)))
+    best_q, build = 0.0, None
+    for coding, factory in candidates:
+        q = qvalues.get(coding, default)
+        if q > best_q:
+            best_q, build = q, factory
+    return build() if build is not None else None
+
+
+class CompressionMiddleware:
+    """ASGI middleware compressing responses of at least ``minimum_size`` bytes."""
+
+    def __init__(self, app, minimum_size=1024, gzip_level=6, zstd_level=3):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.zstd_level = zstd_level
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        # Wrapped even without an encoder: the response still needs its Vary header
+        encoder = choose_encoder(Headers(scope=scope).get("accept-encoding"), self.gzip_level, self.zstd_level)
+        await self.app(scope, receive, _CompressingSender(send, encoder, self.minimum_size))
+
+
+class _CompressingSender:
+    """Wraps ``send``; buffers until the size threshold, then streams compressed.
+
+    ``encoder`` is None when the client accepts no encoding we support; the
+    response then only gets its Vary header.
+    """
+
+    def __init__(self, send, encoder, minimum_size):
+        self.send = send
+        self.encoder = encoder
+        self.minimum_size = minimum_size
+        self.start_message = None
+        self.buffer = b""
+        self.passthrough = False
+        self.compressing = False
+
+    async def __call__(self, message):
+        if message["type"] == "http.response.start":
+            headers = MutableHeaders(raw=message["headers"])
+            media_type = headers.get("content-type", "")
+            compressible = "content-encoding" not in headers and media_type.startswith(COMPRESSIBLE_MEDIA_TYPES)
+            if compressible:
+                headers.add_vary_header("Accept-Encoding")
+                message["headers"] = headers.raw
+            self.passthrough = not compressible or self.encoder is None
+            if self.passthrough:
+                await self.send(message)
+            else:
+                self.start_message = message
+            return
+        if message["type"] != "http.response.body" or self.passthrough:
+            await self.send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        if not self.compressing:
+            self.buffer += body
+            if len(self.buffer) < self.minimum_size:
+                if more_body:
+                    return
+                # Whole response is below the threshold: send it as-is.
+                await self.send(self.start_message)
+                await self.send({"type": "http.response.body", "body": self.buffer})
+                return
+            self.compressing = True
+            body, self.buffer = self.buffer, b""
+            headers = MutableHeaders(raw=self.start_message["headers"])
+            headers["Content-Encoding"] = self.encoder.encoding
+            del headers["Content-Length"]
+            self.start_message["headers"] = headers.raw
+            await self.send(self.start_message)
+
+        await self.send({
+            "type": "http.response.body",
+            "body": self.encoder.compress(body, final=not more_body),
+            "more_body": more_body,
+        })
@@ -0,0 +1,205 @@
+"""Streaming ingest of status checks over one long-lived request.
+
+An agent reporting every second would otherwise pay a whole HTTP request
+per check. Instead it can open ``POST /api/status/stream`` once and keep
+writing newline-delimited JSON, one ``StatusCheckCreate`` per line::
+
+    {"client_name": "agent-7"}
+    {"client_name": "agent-7"}
+    ...
+
+Lines are batched - up to ``batch_size`` of them, or whatever arrived
+within ``flush_seconds`` of the first - and each batch goes through the
+same storage path as ``POST /api/status``, with one sequence-number
+allocation and one ``insert_many`` per collection. The response is a
+stream of NDJSON acknowledgements sent while the request is still
+open, one per batch::
+
+    {"accepted": 2, "rejected": [], "through_line": 2}
+
+Every line up to ``through_line`` has then been stored, or is listed in
+``rejected`` with its line number and the reason. A final
+``{"done": true, ...}`` line carries the totals when the agent ends the
+request. If the body can't be read to its end (the agent disconnected, or
+the read failed) the final line is ``{"error": "...", ...}`` instead. If a
+batch can't be stored the response is cut off. Either way the agent
+resends from the line after the last ``through_line`` it got.
+
+Backpressure: lines wait in a queue of at most ``queue_size``, and only one
+batch per stream is being written at a time. While the database is slower
+than the agent, the queue fills up and the body stops being read. The
+server then stops reading the socket, and TCP flow control stalls the
+agent's writes. Memory per stream is bounded by the queue, not by how far
+ahead the agent is.
+
+The request body is sent chunked over HTTP/1.1, or as DATA frames when the
+app runs behind an HTTP/2 server or proxy. The agent must read the acks as
+they come, not only after it finishes sending. There is no gRPC service:
+this stack serves plain ASGI, and gRPC would need its own server, port and
+protobuf toolchain to carry the same one-field message.
+
+Configuration (environment):
+
+* ``INGEST_BATCH_SIZE`` - most checks per batch (default 500)
+* ``INGEST_FLUSH_SECONDS`` - longest a check waits for its batch to fill (default 0.05)
+* ``INGEST_QUEUE_SIZE`` - parsed lines buffered per stream (default 2000)
+* ``INGEST_MAX_LINE_BYTES`` - longer lines are rejected (default 4096)
+"""
+import asyncio
+import json
+import logging
+
+from pydantic import ValidationError
+from starlette.requests import ClientDisconnect
+from starlette.responses import StreamingResponse
+
+logger = logging.getLogger(__name__)
+
+NDJSON = "application/x-ndjson"
+_END = object()
+
+
+class IngestSettings:
+    def __init__(self, batch_size=500, flush_seconds=0.05, queue_size=2000, max_line_bytes=4096):
+        self.batch_size = batch_size
+        self.flush_seconds = flush_seconds
+        self.queue_size = queue_size
+        self.max_line_bytes = max_line_bytes
+
+    @classmethod
+    def from_env(cls, environ):
+        return cls(
+            batch_size=int(environ.get('INGEST_BATCH_SIZE', '500')),
+            flush_seconds=float(environ.get('INGEST_FLUSH_SECONDS', '0.05')),
+            queue_size=int(environ.get('INGEST_QUEUE_SIZE', '2000')),
+            max_line_bytes=int(environ.get('INGEST_MAX_LINE_BYTES', '4096')),
+        )
+
+
+async def iter_lines(chunks, max_line_bytes):
+    """(line number, bytes or None) for each non-empty line of ``chunks``; None marks an overlong line.
+
+    Lines are cut out of a chunk by offset; only the unfinished tail is
+    carried over, so a chunk of many lines is not re-copied per line.
+    """
+    buffer = b""
+    number = 0
+    skipping = False  # inside an overlong line, dropping bytes until its newline
+    async for chunk in chunks:
+        buffer = buffer + chunk if buffer else chunk
+        start = 0
+        while True:
+            end = buffer.find(b"\n", start)
+            if end < 0:
+                break
+            line, start = buffer[start:end], end + 1
+            number += 1
+            if skipping:
+                skipping = False
+                yield number, None
+            elif len(line) > max_line_bytes:
+                yield number, None
+            elif line.strip():
+                yield number, line
+        buffer = buffer[start:]
+        if len(buffer) > max_line_bytes:
+            skipping = True
+            buffer = b""
+    if skipping:
+        yield number + 1, None
+    elif buffer.strip():
+        yield number + 1, buffer
+
+
+class IngestStream:
+    """Parses, batches and stores one request's NDJSON lines, yielding acks."""
+
+    def __init__(self, settings, model, store):
+        self.settings = settings
+        self.model = model
+        self.store = store  # async callable storing a list of model instances
+        self._queue = asyncio.Queue(maxsize=settings.queue_size)
+        self.accepted = 0
+        self.rejected = 0
+        self.error = None  # why the body stopped before its end, if it did
+
+    async def _read(self, chunks):
+        try:
+            async for number, line in iter_lines(chunks, self.settings.max_line_bytes):
+                await self._queue.put((number, self._parse(line)))  # waits while the queue is full
+        except ClientDisconnect:
+            self.error = "Client disconnected before the end of the stream"
+            logger.warning("Ingest stream ended early: %s", self.error)
+        except Exception as exc:
+            self.error = f"Failed to read the request body: {exc}"
+            logger.exception("Failed to read the ingest stream")
+        await self._queue.put((None, _END))
+
+    def _parse(self, line):
+        if line is None:
+            return f"Line longer than {self.settings.max_line_bytes} bytes"
+        try:
+            return self.model.model_validate(json.loads(line))
+        except ValidationError as exc:
+            error = exc.errors()[0]
+            return f"{'.'.join(map(str, error['loc'])) or 'line'}: {error['msg']}"
+        except ValueError as exc:  # not JSON
+            return str(exc)
+
+    async def _next_batch(self):
+        """Lines for the next batch (as (number, check or error)), and whether the stream ended."""
+        first = await self._queue.get()
+        if first[1] is _END:
+            return [], True
+        batch = [first]
+        deadline = asyncio.get_running_loop().time() + self.settings.flush_seconds
+        while len(batch) < self.settings.batch_size:
+            timeout = deadline - asyncio.get_running_loop().time()
+            try:
+                item = self._queue.get_nowait() if timeout <= 0 else await asyncio.wait_for(self._queue.get(), timeout)
+            except (asyncio.QueueEmpty, asyncio.TimeoutError):
+                break
+            if item[1] is _END:
+                return batch, True
+            batch.append(item)
+        return batch, False
+
+    async def acks(self, chunks):
+        reader = asyncio.create_task(self._read(chunks))
+        try:
+            done = False
+            while not done:
+                batch, done = await self._next_batch()
+                if not batch:
+                    continue
+                checks = [item for _, item in batch if isinstance(item, self.model)]
+                rejected = [{"line": number, "error": item} for number, item in batch if isinstance(item, str)]
+                if checks:
+                    await self.store(checks)
+                self.accepted += len(checks)
+                self.rejected += len(rejected)
+                yield {"accepted": len(checks), "rejected": rejected, "through_line": batch[-1][0]}
+            if self.error is not None:
+                yield {"error": self.error, "accepted": self.accepted, "rejected": self.rejected}
+            else:
+                yield {"done": True, "accepted": self.accepted, "rejected": self.rejected}
+        finally:
+            reader.cancel()
+
+
+class NDJSONStreamResponse(StreamingResponse):
+    """Streams while the request body is still being read.
+
+    ``StreamingResponse`` also listens for the client disconnecting, which
+    reads request messages and would steal the body from the ingest reader.
+    Here the reader sees the disconnect itself.
+    """
+    media_type = NDJSON
+
+    async def __call__(self, scope, receive, send):
+        await self.stream_response(send)
+
+
+async def ndjson_lines(acks):
+    async for ack in acks:
+        yield json.dumps(ack) + "\n"
@@ -0,0 +1,36 @@
+"""Module-level objects that are only built, and their modules only imported, on first use.
+
+Keeps features that most requests never touch off the import path of
+``server.py``, the way ``LazyDatabase`` does for Motor.
+"""
+import importlib
+
+
+class LazyObject:
+    """Proxy for ``factory()``, called on the first attribute access."""
+
+    def __init__(self, factory):
+        self._factory = factory
+        self._target = None
+
+    @property
+    def built(self):
+        return self._target is not None
+
+    @property
+    def target(self):
+        if self._target is None:
+            self._target = self._factory()
+        return self._target
+
+    def __getattr__(self, name):
+        # Only called for attributes not defined on the proxy itself.
+        return getattr(self.target, name)
+
+
+def lazy_from_env(module, class_name, environ):
+    """``module.class_name.from_env(environ)``, imported and built on first use."""
+    def build():
+        return getattr(importlib.import_module(module), class_name).from_env(environ)
+
+    return LazyObject(build)
@@ -0,0 +1,256 @@
+"""Non-blocking, structured logging for the API.
+
+Log calls on the event loop only put the record on a bounded in-memory
+queue (``QueueHandler``). A listener thread (``QueueListener``) formats the
+records and does the blocking writes to stderr. When the queue is full, for
+example because stderr is a slow pipe, the record is dropped and counted
+instead of stalling a request. The listener reports the number dropped
+once the queue drains.
+
+Every request gets an id: the client's ``X-Request-ID`` when it is sane,
+otherwise a new one. It is echoed in the response's ``X-Request-ID`` and
+attached to every record logged while the request is handled, through a
+context variable, so app and access logs can be joined.
+
+``AccessLogMiddleware`` writes one structured record per request to the
+``access`` logger: route template, method, path, status, duration,
+response bytes and request id. Routes can be sampled so that high-rate
+endpoints don't flood the pipeline. Server errors and slow requests are
+always logged.
+
+Configuration (environment):
+
+* ``LOG_LEVEL`` - root level (default ``INFO``)
+* ``LOG_FORMAT`` - ``json`` (default, one object per line) or ``text``
+* ``LOG_QUEUE_SIZE`` - records buffered before dropping (default 10000)
+* ``ACCESS_LOG_SAMPLE`` - per-route sampling rates, e.g.
+  ``/api/status=0.1,/api/status/stream=1,*=1`` (route templates; ``*`` is
+  the default, 1 unless given)
+* ``ACCESS_LOG_SLOW_MS`` - requests slower than this are always logged (default 1000)
+"""
+import contextvars
+import json
+import logging
+import logging.handlers
+import queue
+import random
+import re
+import sys
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+
+TEXT_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - [%(request_id)s] %(message)s'
+
+request_id_var = contextvars.ContextVar("request_id", default=None)
+
+_VALID_REQUEST_ID = re.compile(r"^[A-Za-z0-9._:-]{1,128}$")
+# LogRecord attributes that aren't user-supplied ``extra`` fields
+_RECORD_ATTRIBUTES = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime", "request_id"}
+
+
+class RequestIdFilter(logging.Filter):
+    """Stamps records with the current request id; runs in the thread that logs."""
+
+    def filter(self, record):
+        if not hasattr(record, "request_id"):
+            record.request_id = request_id_var.get()
+        return True
+
+
+class BoundedQueueHandler(logging.handlers.QueueHandler):
+    """Enqueues without ever blocking; counts what didn't fit."""
+
+    def __init__(self, maxsize):
+        super().__init__(queue.Queue(maxsize))
+        self.dropped = 0
+        self.addFilter(RequestIdFilter())
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def prepare(self, record):
+        # Only what must happen on the logging thread: resolve the message
+        # and traceback (they may reference objects that change later).
+        # Formatting happens on the listener thread.
+        record = logging.makeLogRecord(record.__dict__)
+        record.message = record.getMessage()
+        record.msg, record.args = record.message, None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+class JSONFormatter(logging.Formatter):
+    def format(self, record):
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        if getattr(record, "request_id", None):
+            entry["request_id"] = record.request_id
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRIBUTES:
+                entry[key] = value
+        if record.exc_text:
+            entry["exc"] = record.exc_text
+        return json.dumps(entry, default=str)
+
+
+class _DropReporter(logging.Handler):
+    """Last handler of the listener: reports records dropped since the previous report."""
+
+    def __init__(self, source, target):
+        super().__init__()
+        self.source = source
+        self.target = target
+        self._reported = 0
+
+    def emit(self, record):
+        dropped = self.source.dropped
+        if dropped > self._reported and self.source.queue.empty():
+            self.target.handle(logging.makeLogRecord({
+                "name": __name__, "levelno": logging.WARNING, "levelname": "WARNING",
+                "msg": "Log queue full: dropped %d records", "args": (dropped - self._reported,),
+                "request_id": None, "dropped_total": dropped,
+            }))
+            self._reported = dropped
+
+
+class LogPipeline:
+    def __init__(self, level="INFO", log_format="json", queue_size=10000, stream=None):
+        self.level = level
+        self.handler = BoundedQueueHandler(queue_size)
+        output = logging.StreamHandler(stream or sys.stderr)
+        output.setFormatter(JSONFormatter() if log_format == "json" else logging.Formatter(TEXT_FORMAT))
+        self.listener = logging.handlers.QueueListener(
+            self.handler.queue, output, _DropReporter(self.handler, output)
+        )
+        self._lock = threading.Lock()
+        self._running = False
+
+    @classmethod
+    def from_env(cls, environ):
+        return cls(
+            level=environ.get('LOG_LEVEL', 'INFO').upper(),
+            log_format=environ.get('LOG_FORMAT', 'json'),
+            queue_size=int(environ.get('LOG_QUEUE_SIZE', '10000')),
+        )
+
+    def install(self):
+        """Route the root logger and uvicorn's own loggers through the queue, and start the listener."""
+        root = logging.getLogger()
+        for handler in list(root.handlers):
+            if isinstance(handler, BoundedQueueHandler):
+                root.removeHandler(handler)
+        root.addHandler(self.handler)
+        root.setLevel(self.level)
+        for name in ("uvicorn", "uvicorn.access"):
+            uvicorn_logger = logging.getLogger(name)
+            uvicorn_logger.handlers = [self.handler]
+            uvicorn_logger.propagate = False
+        self.start()
+
+    def start(self):
+        with self._lock:
+            if not self._running:
+                self.listener.start()
+                self._running = True
+
+    def stop(self):
+        """Write out everything queued so far and stop the listener thread."""
+        with self._lock:
+            if self._running:
+                self.listener.stop()
+                self._running = False
+
+    def stats(self):
+        return {"queued": self.handler.queue.qsize(), "capacity": self.handler.queue.maxsize,
+                "dropped": self.handler.dropped}
+
+
+def parse_sample_rates(spec):
+    """``"/api/status=0.1,*=1"`` -> {"/api/status": 0.1, "*": 1.0}"""
+    rates = {"*": 1.0}
+    for part in (spec or "").split(","):
+        route, _, rate = part.strip().rpartition("=")
+        if route:
+            rates[route.strip()] = min(1.0, max(0.0, float(rate)))
+    return rates
+
+
+class AccessLogMiddleware:
+    """Assigns request ids and writes one sampled access record per request."""
+
+    def __init__(self, app, sample_rates=None, slow_ms=1000.0, logger_name="access"):
+        self.app = app
+        self.sample_rates = sample_rates or {"*": 1.0}
+        self.slow_ms = slow_ms
+        self.logger = logging.getLogger(logger_name)
+        self.sampled_out = 0
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_id = _incoming_request_id(scope) or uuid.uuid4().hex
+        token = request_id_var.set(request_id)
+        status = 500
+        sent = 0
+        started = time.perf_counter()
+
+        async def send_with_id(message):
+            nonlocal status, sent
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                message["headers"] = [*message.get("headers", []), (b"x-request-id", request_id.encode())]
+            elif message["type"] == "http.response.body":
+                sent += len(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            duration_ms = (time.perf_counter() - started) * 1000
+            self._log(scope, status, duration_ms, sent, request_id)
+            request_id_var.reset(token)
+
+    def _log(self, scope, status, duration_ms, sent, request_id):
+        route = scope.get("route")
+        template = getattr(route, "path", None)
+        rate = self.sample_rates.get(template, self.sample_rates["*"])
+        if status < 500 and duration_ms < self.slow_ms and rate < 1.0 and random.random() >= rate:
+            self.sampled_out += 1
+            return
+        if not self.logger.isEnabledFor(logging.INFO):
+            return
+        self.logger.info(
+            "%s %s %d", scope["method"], scope["path"], status,
+            extra={
+                "route": template,
+                "method": scope["method"],
+                "path": scope["path"],
+                "status": status,
+                "duration_ms": round(duration_ms, 3),
+                "bytes": sent,
+                "client": scope["client"][0] if scope.get("client") else None,
+                "sample_rate": rate,
+                "request_id": request_id,
+            },
+        )
+
+
+def _incoming_request_id(scope):
+    for name, value in scope["headers"]:
+        if name == b"x-request-id":
+            candidate = value.decode("latin-1")
+            return candidate if _VALID_REQUEST_ID.match(candidate) else None
+    return None
@@ -0,0 +1,237 @@
+"""Memory profiling and leak hunting for long-running workers.
+
+Three tools, served under ``/api/admin/memory`` (admin token required):
+
+* ``RSSSampler`` - a background task that reads the process's resident set
+  size every ``interval`` seconds and logs it with the growth rate, a
+  least-squares slope over the retained samples in bytes per hour. A
+  worker whose RSS keeps climbing shows up in the logs without anyone
+  attaching a profiler. ``MEMORY_SAMPLE_SECONDS`` (default 60, 0 disables),
+  ``MEMORY_SAMPLES`` kept (default 120) and ``MEMORY_GROWTH_WARN_MB_PER_HOUR``
+  (above this the sample is logged as a warning; unset never warns).
+* ``SnapshotStore`` - tracemalloc snapshots, taken on request and kept in a
+  small ring, with the top allocation sites by size and the growth between
+  any two snapshots. Two snapshots a few minutes apart under steady
+  traffic point at the lines whose allocations are never freed.
+  Tracing slows every allocation down and stores a traceback per live
+  block, so it is off until started through the API, or from startup with
+  ``MEMORY_TRACEMALLOC_FRAMES`` (frames per traceback; Python's own
+  ``PYTHONTRACEMALLOC`` works too).
+* ``object_counts`` - live instances of the classes that pile up when the
+  list/serialization path leaks: ``StatusCheck`` models and Motor cursors
+  by default (``MEMORY_TRACKED_TYPES``, comma-separated class names). It
+  walks every object the garbage collector tracks, which holds up request
+  handling for a moment on a large heap.
+
+All of it is per worker process.
+"""
+import asyncio
+import gc
+import itertools
+import logging
+import os
+import threading
+import time
+import tracemalloc
+from collections import Counter, deque
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TRACKED_TYPES = (
+    "StatusCheck", "StatusChange", "AsyncIOMotorCursor", "AsyncIOMotorCommandCursor", "AsyncIOMotorLatentCommandCursor",
+)
+
+# Allocations by the profiler itself and the import machinery only add noise
+_NOISE_FILTERS = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, "<unknown>"),
+)
+
+
+def current_rss():
+    """Resident set size in bytes, or None where it can't be read."""
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def growth_per_hour(samples):
+    """Least-squares slope of (monotonic seconds, bytes) samples, in bytes per hour."""
+    if len(samples) < 2:
+        return None
+    n = len(samples)
+    mean_t = sum(t for t, _ in samples) / n
+    mean_rss = sum(rss for _, rss in samples) / n
+    variance = sum((t - mean_t) ** 2 for t, _ in samples)
+    if not variance:
+        return None
+    covariance = sum((t - mean_t) * (rss - mean_rss) for t, rss in samples)
+    return covariance / variance * 3600
+
+
+class RSSSampler:
+    def __init__(self, interval=60.0, keep=120, warn_bytes_per_hour=None, read_rss=current_rss):
+        self.interval = interval
+        self.warn_bytes_per_hour = warn_bytes_per_hour
+        self.read_rss = read_rss
+        self.samples = deque(maxlen=keep)  # (monotonic seconds, rss bytes)
+
+    @classmethod
+    def from_env(cls, environ):
+        warn = environ.get('MEMORY_GROWTH_WARN_MB_PER_HOUR')
+        return cls(
+            interval=float(environ.get('MEMORY_SAMPLE_SECONDS', '60')),
+            keep=int(environ.get('MEMORY_SAMPLES', '120')),
+            warn_bytes_per_hour=float(warn) * 1024 * 1024 if warn else None,
+        )
+
+    @property
+    def enabled(self):
+        return self.interval > 0
+
+    def sample(self):
+        rss = self.read_rss()
+        if rss is None:
+            return None
+        self.samples.append((time.monotonic(), rss))
+        return rss
+
+    def summary(self):
+        latest = self.samples[-1][1] if self.samples else self.read_rss()
+        return {
+            "rss_bytes": latest,
+            "growth_bytes_per_hour": growth_per_hour(self.samples),
+            "samples": len(self.samples),
+            "window_seconds": self.samples[-1][0] - self.samples[0][0] if len(self.samples) > 1 else 0.0,
+            "interval_seconds": self.interval,
+        }
+
+    async def run(self):
+        """Background loop: sample, log, sleep."""
+        while True:
+            try:
+                rss = self.sample()
+                if rss is not None:
+                    self._log(rss)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("RSS sampling failed")
+            await asyncio.sleep(self.interval)
+
+    def _log(self, rss):
+        growth = growth_per_hour(self.samples)
+        level = logging.INFO
+        if growth is not None and self.warn_bytes_per_hour is not None and growth > self.warn_bytes_per_hour:
+            level = logging.WARNING
+        logger.log(
+            level, "RSS %.1f MiB, growing %s", rss / 2 ** 20,
+            "n/a" if growth is None else f"{growth / 2 ** 20:+.2f} MiB/h",
+            extra={"rss_bytes": rss, "growth_bytes_per_hour": None if growth is None else round(growth)},
+        )
+
+
+class SnapshotStore:
+    """The newest ``keep`` tracemalloc snapshots, by id.
+
+    ``take`` runs in a worker thread (``asyncio.to_thread``) while ``status``
+    and the readers run on the event loop, so the dict is only touched under
+    ``_lock``. Taking and comparing snapshots, the slow part, happens outside it.
+    """
+
+    def __init__(self, keep=5):
+        self.keep = keep
+        self._snapshots = {}  # id -> (taken at, snapshot)
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls, environ):
+        return cls(keep=int(environ.get('MEMORY_SNAPSHOTS', '5')))
+
+    @staticmethod
+    def start(frames=1):
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(frames)
+
+    def stop(self):
+        """Stop tracing and free the snapshots (they hold every traced block)."""
+        tracemalloc.stop()
+        with self._lock:
+            self._snapshots.clear()
+
+    def status(self):
+        tracing = tracemalloc.is_tracing()
+        current, peak = tracemalloc.get_traced_memory() if tracing else (0, 0)
+        with self._lock:
+            snapshots = [(snapshot_id, taken_at) for snapshot_id, (taken_at, _) in self._snapshots.items()]
+        return {
+            "tracing": tracing,
+            "frames": tracemalloc.get_traceback_limit() if tracing else None,
+            "traced_bytes": current,
+            "traced_peak_bytes": peak,
+            "tracemalloc_overhead_bytes": tracemalloc.get_tracemalloc_memory() if tracing else 0,
+            "snapshots": [{"id": snapshot_id, "taken_at": taken_at.isoformat()} for snapshot_id, taken_at in snapshots],
+        }
+
+    def take(self):
+        if not tracemalloc.is_tracing():
+            raise LookupError("tracemalloc is not tracing; start it first")
+        snapshot = tracemalloc.take_snapshot().filter_traces(_NOISE_FILTERS)
+        with self._lock:
+            snapshot_id = next(self._ids)
+            self._snapshots[snapshot_id] = (datetime.utcnow(), snapshot)
+            while len(self._snapshots) > self.keep:
+                del self._snapshots[min(self._snapshots)]
+        return snapshot_id
+
+    def get(self, snapshot_id):
+        with self._lock:
+            entry = self._snapshots.get(snapshot_id)
+            kept = sorted(self._snapshots)
+        if entry is None:
+            raise LookupError(f"No snapshot {snapshot_id}; kept: {kept}")
+        return entry[1]
+
+    def top(self, snapshot_id, group_by="lineno", limit=20):
+        stats = self.get(snapshot_id).statistics(group_by)
+        return [_stat(stat) for stat in stats[:limit]]
+
+    def diff(self, old_id, new_id, group_by="lineno", limit=20):
+        """Allocation sites that grew the most from ``old_id`` to ``new_id``."""
+        stats = self.get(new_id).compare_to(self.get(old_id), group_by)
+        return [_stat(stat) | {"size_diff": stat.size_diff, "count_diff": stat.count_diff} for stat in stats[:limit]]
+
+
+def _stat(stat):
+    frames = [f"{frame.filename}:{frame.lineno}" for frame in stat.traceback]
+    return {"site": frames[0] if frames else None, "traceback": frames, "size": stat.size, "count": stat.count}
+
+
+def object_counts(type_names=DEFAULT_TRACKED_TYPES, top=0):
+    """Live instances of the named classes (matched by class name), plus the ``top`` most common types."""
+    wanted = set(type_names)
+    tracked = dict.fromkeys(type_names, 0)
+    common = Counter()
+    for obj in gc.get_objects():
+        name = type(obj).__name__
+        if name in wanted:
+            tracked[name] += 1
+        if top:
+            common[name] += 1
+    counts = {"tracked": tracked}
+    if top:
+        counts["most_common"] = [{"type": name, "count": count} for name, count in common.most_common(top)]
+    return counts
+
+
+def tracked_types_from_env(environ):
+    names = environ.get('MEMORY_TRACKED_TYPES')
+    if not names:
+        return DEFAULT_TRACKED_TYPES
+    return tuple(name.strip() for name in names.split(",") if name.strip())
@@ -0,0 +1,204 @@
+"""Time-partitioned status_checks collections.
+
+With partitioning on, every check is written to a collection named after
+the period its timestamp falls in - ``status_checks_2026_10`` for monthly
+partitions - and reads only touch the partitions overlapping the requested
+time range. Each partition gets the same storage options and indexes as the
+single collection would (see storage.py), created on its first write. The
+unpartitioned collection goes through the same first-write step.
+
+Partitions are disjoint in time, so a read ordered by timestamp is the
+per-partition sorted cursors taken one after another, oldest partition
+first. A page that fills up in the first partitions never queries the rest.
+The next page resumes after the last check returned: ``after=<timestamp>,<id>``
+is pushed into each partition's query (ties on timestamp are ordered by id),
+and partitions ending before that timestamp are not queried at all.
+Retention drops whole partitions once they fall entirely before the cutoff,
+instead of deleting documents one by one.
+
+Configuration (environment):
+
+* ``STATUS_PARTITIONING`` - ``none`` (default, the single ``status_checks``
+  collection), ``year``, ``month`` or ``day``.
+* ``STATUS_RETENTION_DAYS`` - drop partitions older than this many days
+  (checked hourly). Unset keeps everything; ignored without partitioning.
+
+The set of existing partitions is listed from MongoDB and cached for
+``refresh_seconds``, so partitions created by other workers show up for
+reads within that window.
+"""
+import asyncio
+import re
+import time
+from datetime import datetime, timedelta, timezone
+
+from storage import ensure_collection, index_specs
+
+NONE = "none"
+GRANULARITIES = ("year", "month", "day")
+
+
+def _period_start(timestamp, granularity):
+    if granularity == "year":
+        return datetime(timestamp.year, 1, 1)
+    if granularity == "month":
+        return datetime(timestamp.year, timestamp.month, 1)
+    return datetime(timestamp.year, timestamp.month, timestamp.day)
+
+
+def _next_period(start, granularity):
+    if granularity == "year":
+        return start.replace(year=start.year + 1)
+    if granularity == "month":
+        return start.replace(year=start.year + start.month // 12, month=start.month % 12 + 1)
+    return start + timedelta(days=1)
+
+
+class PartitionRouter:
+    def __init__(self, base, granularity=NONE, codec=None, refresh_seconds=30.0):
+        if granularity != NONE and granularity not in GRANULARITIES:
+            raise ValueError(f"Unsupported partitioning {granularity!r}; use {NONE!r} or one of {GRANULARITIES}")
+        self.base = base
+        self.granularity = granularity
+        self.codec = codec
+        self.refresh_seconds = refresh_seconds
+        self._name_pattern = re.compile(rf"^{re.escape(base)}_(\d{{4}})(?:_(\d{{2}}))?(?:_(\d{{2}}))?$")
+        self._known = {}  # partition name -> (start, end)
+        self._listed_at = None
+        self._ready = set()  # partitions whose collection and indexes this process has ensured
+
+    @classmethod
+    def from_env(cls, base, environ, codec=None):
+        return cls(base, environ.get('STATUS_PARTITIONING', NONE), codec)
+
+    @property
+    def enabled(self):
+        return self.granularity != NONE
+
+    def collection_name(self, timestamp):
+        """Collection a document with ``timestamp`` is written to."""
+        return self.partition_name(timestamp) if self.enabled else self.base
+
+    def partition_name(self, timestamp):
+        start = _period_start(timestamp, self.granularity)
+        parts = {"year": "%Y", "month": "%Y_%m", "day": "%Y_%m_%d"}[self.granularity]
+        return f"{self.base}_{start.strftime(parts)}"
+
+    def partition_range(self, name):
+        """[start, end) covered by a partition name, or None for names that aren't this scheme's partitions."""
+        match = self._name_pattern.match(name)
+        if match is None:
+            return None
+        year, month, day = match.groups()
+        if (month is None) != (self.granularity == "year") or (day is None) != (self.granularity != "day"):
+            return None
+        start = datetime(int(year), int(month or 1), int(day or 1))
+        return start, _next_period(start, self.granularity)
+
+    async def for_write(self, database, timestamp):
+        """Collection a document with ``timestamp`` belongs in, created with its indexes on first use."""
+        name = self.collection_name(timestamp)
+        if name not in self._ready:
+            await self.ensure_ready(database, name)
+            if self.enabled:
+                self._known[name] = self.partition_range(name)
+        return database[name]
+
+    async def ensure_ready(self, database, name):
+        """Create ``name`` with the codec's storage options and indexes, once per process.
+
+        Done before the first insert, since storage options only apply to a
+        collection created explicitly, not to one an insert creates implicitly.
+        """
+        if name in self._ready:
+            return
+        await ensure_collection(database, name, self.codec)
+        for keys in index_specs(self.codec):
+            await database[name].create_index(keys)
+        self._ready.add(name)
+
+    async def for_range(self, database, since=None, until=None):
+        """Names of the partitions overlapping [since, until), oldest first."""
+        if not self.enabled:
+            return [self.base]
+        await self._refresh(database)
+        return [
+            name for name, (start, end) in sorted(self._known.items(), key=lambda item: item[1][0])
+            if (since is None or end > since) and (until is None or start < until)
+        ]
+
+    async def drop_before(self, database, cutoff):
+        """Drop every partition that ends at or before ``cutoff``; returns the dropped names."""
+        if not self.enabled:
+            return []
+        await self._refresh(database, force=True)
+        expired = [name for name, (_, end) in self._known.items() if end <= cutoff]
+        for name in expired:
+            await database.drop_collection(name)
+            self._known.pop(name, None)
+            self._ready.discard(name)
+        return expired
+
+    async def _refresh(self, database, force=False):
+        now = time.monotonic()
+        if not force and self._listed_at is not None and now - self._listed_at < self.refresh_seconds:
+            return
+        names = await database.list_collection_names(filter={"name": {"$regex": f"^{re.escape(self.base)}_"}})
+        known = {}
+        for name in names:
+            period = self.partition_range(name)
+            if period is not None:
+                known[name] = period
+        self._known = known
+        self._listed_at = now
+
+
+def parse_cursor(value):
+    """``<timestamp>,<id>`` - the last listed check's own values - as (naive UTC timestamp, id).
+
+    Raises ValueError for anything else.
+    """
+    timestamp, _, check_id = value.rpartition(",")
+    if not timestamp or not check_id:
+        raise ValueError(f"Expected <timestamp>,<id>; got {value!r}")
+    timestamp = datetime.fromisoformat(timestamp)
+    if timestamp.tzinfo is not None:
+        timestamp = timestamp.astimezone(timezone.utc).replace(tzinfo=None)
+    return timestamp, check_id
+
+
+async def find_in_partitions(collections, query, fields, limit, after=None):
+    """Up to ``limit`` documents matching ``query``, ordered by timestamp then id.
+
+    ``collections`` must be in partition order; each one is only queried if
+    the earlier ones didn't fill the page. ``after`` is a (timestamp, stored
+    id) pair to resume strictly after.
+    """
+    timestamp, check_id = fields["timestamp"], fields["id"]
+    if after is not None:
+        resume = {"$or": [{timestamp: {"$gt": after[0]}}, {timestamp: after[0], check_id: {"$gt": after[1]}}]}
+        query = {"$and": [query, resume]} if query else resume
+    documents = []
+    for collection in collections:
+        remaining = limit - len(documents)
+        if remaining <= 0:
+            break
+        cursor = collection.find(query).sort([(timestamp, 1), (check_id, 1)]).limit(remaining)
+        documents.extend(await cursor.to_list(remaining))
+    return documents
+
+
+async def enforce_retention(router, database, retention_days, interval=3600.0, logger=None):
+    """Background loop dropping partitions older than ``retention_days``."""
+    while True:
+        try:
+            cutoff = datetime.utcnow() - timedelta(days=retention_days)
+            dropped = await router.drop_before(database, cutoff)
+            if dropped and logger is not None:
+                logger.info("Dropped expired partitions: %s", ", ".join(dropped))
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            if logger is not None:
+                logger.exception("Partition retention failed")
+        await asyncio.sleep(interval)
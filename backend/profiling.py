@@ -0,0 +1,213 @@
+"""On-demand profiling of individual API requests.
+
+Any route can be profiled by sending ``X-Profile: 1`` (or ``?profile=1``)
+together with a valid admin token. The request is executed normally, but the
+response body is replaced by the profile:
+
+* ``1`` / ``collapsed`` - wall-clock stack samples in collapsed-stack format,
+  ready for ``flamegraph.pl`` or speedscope. The samples are of the whole
+  event-loop thread, so other requests' coroutines running at the same
+  time, and the loop waiting in its selector, show up in them too; profile
+  on an otherwise idle worker for a clean picture.
+* ``pstats`` - a deterministic cProfile dump, readable with ``pstats`` or
+  snakeviz.
+
+Every non-empty profile is also written to a rotating directory so it can be
+collected later. Rotation only ever removes this module's own
+``profile_*.prof`` / ``profile_*.collapsed.txt`` files, so ``PROFILE_DIR`` can
+be shared with other files.
+"""
+import asyncio
+import cProfile
+import collections
+import io
+import logging
+import marshal
+import sys
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response
+
+from admin import is_admin
+
+logger = logging.getLogger(__name__)
+
+PROFILE_HEADER = "X-Profile"
+PROFILE_QUERY_PARAM = "profile"
+
+COLLAPSED = "collapsed"
+PSTATS = "pstats"
+_MODE_ALIASES = {
+    "1": COLLAPSED,
+    "true": COLLAPSED,
+    COLLAPSED: COLLAPSED,
+    PSTATS: PSTATS,
+}
+
+
+def requested_profile_mode(request):
+    """Return the profiling mode asked for by the request, or None."""
+    value = request.headers.get(PROFILE_HEADER) or request.query_params.get(PROFILE_QUERY_PARAM)
+    if not value:
+        return None
+    return _MODE_ALIASES.get(value.strip().lower())
+
+
+class StackSampler:
+    """Samples the stack of one thread at a fixed interval.
+
+    Running on its own thread means the profiled code needs no
+    instrumentation, so time spent waiting on Mongo shows up as well. The
+    first sample is taken as soon as the sampler thread runs, so even work
+    shorter than ``interval`` gets one.
+    """
+
+    def __init__(self, thread_id, interval=0.001):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.samples = collections.Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        while True:
+            self._sample()
+            if self._stop.wait(self.interval):
+                return
+
+    def _sample(self):
+        frame = sys._current_frames().get(self.thread_id)
+        if frame is not None:
+            self.samples[self._collapse(frame)] += 1
+
+    @staticmethod
+    def _collapse(frame):
+        stack = []
+        while frame is not None:
+            code = frame.f_code
+            stack.append(f"{code.co_name} ({Path(code.co_filename).name}:{code.co_firstlineno})")
+            frame = frame.f_back
+        return ";".join(reversed(stack))
+
+    def collapsed(self):
+        """Render the samples as ``frame;frame;frame count`` lines."""
+        return "".join(f"{stack} {count}\n" for stack, count in self.samples.most_common())
+
+
+class ProfileStore:
+    """Keeps the newest ``keep`` profiles in ``directory``.
+
+    Blocking file I/O: called through ``asyncio.to_thread`` from the middleware.
+    """
+
+    PREFIX = "profile_"
+    SUFFIXES = (".prof", ".collapsed.txt")
+
+    def __init__(self, directory, keep=50):
+        self.directory = Path(directory)
+        self.keep = keep
+
+    def save(self, method, url_path, suffix, payload):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        route = url_path.strip("/").replace("/", "_") or "root"
+        stamp = datetime.utcnow().strftime("%Y%m%dT%H%M%S%f")
+        path = self.directory / f"{self.PREFIX}{stamp}_{method.lower()}_{route}.{suffix}"
+        path.write_bytes(payload)
+        self._rotate()
+        return path
+
+    def profiles(self):
+        """This store's profile files, oldest first (the names start with their timestamp)."""
+        return sorted(
+            path for path in self.directory.iterdir()
+            if path.name.startswith(self.PREFIX) and path.name.endswith(self.SUFFIXES) and path.is_file()
+        )
+
+    def _rotate(self):
+        for stale in self.profiles()[:-self.keep]:
+            stale.unlink(missing_ok=True)
+
+
+class ProfilingMiddleware(BaseHTTPMiddleware):
+    """Runs admin-flagged requests under a profiler and returns the profile."""
+
+    def __init__(self, app, profile_dir, keep=50, interval=0.001):
+        super().__init__(app)
+        self.store = ProfileStore(profile_dir, keep)
+        self.interval = interval
+
+    async def __call__(self, scope, receive, send):
+        # Unflagged requests skip BaseHTTPMiddleware altogether: its response
+        # wrapper reads request messages while streaming, which would swallow
+        # request bodies still arriving (see /status/stream)
+        if scope["type"] != "http" or requested_profile_mode(Request(scope)) is None:
+            await self.app(scope, receive, send)
+            return
+        await super().__call__(scope, receive, send)
+
+    async def dispatch(self, request, call_next):
+        mode = requested_profile_mode(request)
+        if not is_admin(request):
+            return JSONResponse({"detail": "Profiling requires an admin token"}, status_code=403)
+
+        started = time.perf_counter()
+        if mode == PSTATS:
+            profiler = cProfile.Profile()
+            profiler.enable()
+        else:
+            profiler = StackSampler(threading.get_ident(), self.interval)
+            profiler.start()
+        try:
+            response = await call_next(request)
+            # Drain the body so serialization is part of the profile.
+            async for _ in response.body_iterator:
+                pass
+        finally:
+            if mode == PSTATS:
+                profiler.disable()
+            else:
+                profiler.stop()
+        elapsed_ms = (time.perf_counter() - started) * 1000
+
+        headers = {
+            "X-Profile-Mode": mode,
+            "X-Profile-Elapsed-Ms": f"{elapsed_ms:.3f}",
+            "X-Profiled-Status": str(response.status_code),
+        }
+        if mode == PSTATS:
+            payload = _dump_pstats(profiler)
+            suffix, media_type = "prof", "application/octet-stream"
+        else:
+            payload = profiler.collapsed().encode()
+            suffix, media_type = "collapsed.txt", "text/plain; charset=utf-8"
+            headers["X-Profile-Samples"] = str(sum(profiler.samples.values()))
+        if not payload:
+            # Nothing to look at; don't rotate a useful profile out for it
+            logger.info("Profiled %s %s in %.1f ms, no samples", request.method, request.url.path, elapsed_ms)
+            return Response(payload, media_type=media_type, headers=headers)
+
+        path = await asyncio.to_thread(self.store.save, request.method, request.url.path, suffix, payload)
+        logger.info("Profiled %s %s in %.1f ms -> %s", request.method, request.url.path, elapsed_ms, path)
+        headers["X-Profile-File"] = path.name
+        headers["Content-Disposition"] = f'attachment; filename="{path.name}"'
+        return Response(payload, media_type=media_type, headers=headers)
+
+
+def _dump_pstats(profiler):
+    """Serialize a cProfile.Profile in the binary format read by pstats."""
+    profiler.create_stats()
+    buffer = io.BytesIO()
+    marshal.dump(profiler.stats, buffer)
+    return buffer.getvalue()
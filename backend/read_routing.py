@@ -0,0 +1,176 @@
+"""Replica-set read routing with read-your-writes for recent writers.
+
+Bulk reads (listing, counting) can be served by secondaries to take load off
+the primary. A client that has just written is pinned to the primary for a
+short window so it always sees its own writes. There are two pins:
+
+* In process memory, keyed by ``client_name``: covers readers that name
+  themselves (``X-Client-Name`` or the ``client_name`` filter) on the worker
+  they wrote through.
+* A signed token handed back on every successful API write, as the
+  ``rw_pin`` cookie and the ``X-Read-Your-Writes`` header. Echoing either one
+  on reads pins the caller to the primary on *any* worker until the token
+  expires, so read-your-writes holds with several workers and no sticky
+  routing. Workers verify each other's tokens with a shared secret.
+
+Configuration (environment):
+
+* ``MONGO_READ_PREFERENCE`` - ``primary`` (default) or ``secondaryPreferred``.
+* ``MONGO_MAX_STALENESS_SECONDS`` - secondaries lagging the primary by more
+  than this are not read from. Defaults to 90, the smallest bound MongoDB
+  accepts; ``-1`` explicitly opts out of bounding staleness.
+* ``READ_YOUR_WRITES_SECONDS`` - primary-pinning window after a write.
+* ``READ_YOUR_WRITES_SECRET`` - key signing pin tokens. serve.py generates
+  one for its workers when unset; set it explicitly when workers are started
+  some other way or span several hosts, or tokens only hold on the worker
+  that issued them.
+"""
+import hashlib
+import hmac
+import secrets
+import time
+
+PRIMARY = "primary"
+SECONDARY_PREFERRED = "secondaryPreferred"
+
+CLIENT_NAME_HEADER = "X-Client-Name"
+PIN_HEADER = "X-Read-Your-Writes"
+PIN_COOKIE = "rw_pin"
+
+# MongoDB rejects smaller maxStalenessSeconds; -1 means no bound
+MIN_MAX_STALENESS_SECONDS = 90
+NO_STALENESS_BOUND = -1
+
+
+class ReadRouter:
+    def __init__(
+        self, mode=PRIMARY, max_staleness=MIN_MAX_STALENESS_SECONDS, pin_seconds=90.0, max_pins=100_000, secret=None,
+    ):
+        if max_staleness != NO_STALENESS_BOUND and max_staleness < MIN_MAX_STALENESS_SECONDS:
+            raise ValueError(
+                f"max_staleness must be at least {MIN_MAX_STALENESS_SECONDS} seconds, "
+                f"or {NO_STALENESS_BOUND} for no bound; got {max_staleness}"
+            )
+        if mode == PRIMARY:
+            self.read_preference = None
+        elif mode == SECONDARY_PREFERRED:
+            # Imported here so the default primary mode never loads pymongo at startup
+            from pymongo.read_preferences import SecondaryPreferred
+
+            self.read_preference = SecondaryPreferred(max_staleness=max_staleness)
+        else:
+            raise ValueError(f"Unsupported read preference {mode!r}; use {PRIMARY!r} or {SECONDARY_PREFERRED!r}")
+        self.mode = mode
+        self.pin_seconds = pin_seconds
+        self.max_pins = max_pins
+        self._pins = {}  # client_name -> monotonic expiry
+        self._secret = (secret or secrets.token_hex(32)).encode()
+        self._handles = {}  # collection full_name -> collection with read preference applied
+
+    @classmethod
+    def from_env(cls, environ):
+        return cls(
+            mode=environ.get('MONGO_READ_PREFERENCE', PRIMARY),
+            max_staleness=int(environ.get('MONGO_MAX_STALENESS_SECONDS', str(MIN_MAX_STALENESS_SECONDS))),
+            pin_seconds=float(environ.get('READ_YOUR_WRITES_SECONDS', '90')),
+            secret=environ.get('READ_YOUR_WRITES_SECRET'),
+        )
+
+    def record_write(self, client_name):
+        """Pin ``client_name`` to the primary for the read-your-writes window."""
+        if self.mode == PRIMARY or not client_name:
+            return
+        now = time.monotonic()
+        if len(self._pins) >= self.max_pins:
+            self._pins = {name: expiry for name, expiry in self._pins.items() if expiry > now}
+        self._pins[client_name] = now + self.pin_seconds
+
+    def is_pinned(self, client_name):
+        if not client_name:
+            return False
+        expiry = self._pins.get(client_name)
+        if expiry is None:
+            return False
+        if expiry <= time.monotonic():
+            del self._pins[client_name]
+            return False
+        return True
+
+    def issue_pin(self):
+        """Signed token pinning its bearer to the primary for the read-your-writes window."""
+        expiry = int(time.time() + self.pin_seconds)
+        return f"{expiry}.{self._sign(expiry)}"
+
+    def holds_pin(self, token):
+        """True for an unexpired token signed with this router's secret."""
+        if not token:
+            return False
+        expiry, _, signature = token.partition(".")
+        if not expiry.isdigit() or not hmac.compare_digest(signature, self._sign(expiry)):
+            return False
+        return int(expiry) > time.time()
+
+    def _sign(self, expiry):
+        return hmac.new(self._secret, str(expiry).encode(), hashlib.sha256).hexdigest()
+
+    def for_read(self, collection, client_name=None, pin=None):
+        """Return the collection handle a read by ``client_name``, carrying ``pin``, should use."""
+        if self.mode == PRIMARY or self.is_pinned(client_name) or self.holds_pin(pin):
+            return collection
+        handle = self._handles.get(collection.full_name)
+        if handle is None:
+            handle = collection.with_options(read_preference=self.read_preference)
+            self._handles[collection.full_name] = handle
+        return handle
+
+
+def on_primary(database, name):
+    """Collection ``name`` read from the primary, whatever the router mode or connection-string default."""
+    from pymongo import ReadPreference
+
+    return database.get_collection(name, read_preference=ReadPreference.PRIMARY)
+
+
+def reader_name(request, client_name=None):
+    """Identify the reader: the X-Client-Name header, else the client_name filter."""
+    return request.headers.get(CLIENT_NAME_HEADER) or client_name
+
+
+def reader_pin(request):
+    """The pin token a reader echoed back, from the header or the cookie."""
+    return request.headers.get(PIN_HEADER) or request.cookies.get(PIN_COOKIE)
+
+
+class ReadYourWritesMiddleware:
+    """Hands a fresh pin token to every successful API write while reads can go to secondaries.
+
+    ``get_router`` returns the current ReadRouter (looked up per request, so
+    it can be swapped after the middleware is built).
+    """
+
+    def __init__(self, app, get_router, prefix="/api/"):
+        self.app = app
+        self.get_router = get_router
+        self.prefix = prefix
+
+    async def __call__(self, scope, receive, send):
+        router = self.get_router()
+        if (
+            scope["type"] != "http" or router.mode == PRIMARY
+            or scope["method"] != "POST" or not scope["path"].startswith(self.prefix)
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_pin(message):
+            if message["type"] == "http.response.start" and message["status"] < 400:
+                token = router.issue_pin()
+                cookie = f"{PIN_COOKIE}={token}; Max-Age={int(router.pin_seconds)}; Path=/; HttpOnly; SameSite=Lax"
+                message["headers"] = [
+                    *message.get("headers", []),
+                    (PIN_HEADER.lower().encode(), token.encode()),
+                    (b"set-cookie", cookie.encode()),
+                ]
+            await send(message)
+
+        await self.app(scope, receive, send_with_pin)
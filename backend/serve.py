@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Production entrypoint for the API
+Runs ``server:app`` under uvicorn with:
+1. The uvloop event loop and httptools HTTP parser when installed (asyncio
+   and h11 otherwise)
+2. One worker per usable CPU (``WEB_CONCURRENCY`` overrides)
+3. Keep-alive above a load balancer's usual 60 s idle timeout, so the
+   balancer, not us, closes idle connections
+4. A larger listen backlog for connection bursts (still capped by the
+   kernel's somaxconn)
+5. No uvicorn access log: the app writes its own sampled JSON access
+   records off the event loop (see logs.py)
+
+Workers are separate processes that each import the app, so each builds
+its own Motor client - and connection pool - on first use. The total number
+of connections to MongoDB is workers x ``MONGO_MAX_POOL_SIZE``.
+
+Usage: python serve.py [--host 0.0.0.0] [--port 8001] [--workers N] [--keep-alive 75] [--backlog 4096] [--access-log] [--print-config]
+"""
+
+import argparse
+import importlib.util
+import json
+import os
+import secrets
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).parent
+APP = "server:app"
+
+
+def available(module):
+    return importlib.util.find_spec(module) is not None
+
+
+def usable_cpus():
+    try:
+        return len(os.sched_getaffinity(0))  # respects taskset / cgroup cpusets
+    except AttributeError:  # not available on macOS
+        return os.cpu_count() or 1
+
+
+def default_workers(environ=os.environ):
+    concurrency = environ.get("WEB_CONCURRENCY")
+    if concurrency:
+        return max(1, int(concurrency))
+    return usable_cpus()
+
+
+def server_config(args):
+    """Keyword arguments for ``uvicorn.run``."""
+    return {
+        "host": args.host,
+        "port": args.port,
+        "workers": args.workers,
+        "loop": "uvloop" if available("uvloop") else "asyncio",
+        "http": "httptools" if available("httptools") else "h11",
+        "timeout_keep_alive": args.keep_alive,
+        "backlog": args.backlog,
+        "access_log": args.access_log,
+        "lifespan": "on",
+        "proxy_headers": True,
+        "forwarded_allow_ips": os.environ.get("FORWARDED_ALLOW_IPS", "127.0.0.1"),
+        "timeout_graceful_shutdown": args.graceful_shutdown,
+        "app_dir": str(BACKEND_DIR),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the API with production server settings")
+    parser.add_argument("--host", default=os.environ.get("HOST", "0.0.0.0"))
+    parser.add_argument("--port", type=int, default=int(os.environ.get("PORT", "8001")))
+    parser.add_argument("--workers", type=int, default=default_workers())
+    parser.add_argument("--keep-alive", type=int, default=int(os.environ.get("SERVER_KEEP_ALIVE", "75")),
+                        help="Seconds an idle keep-alive connection is held open")
+    parser.add_argument("--backlog", type=int, default=int(os.environ.get("SERVER_BACKLOG", "4096")))
+    parser.add_argument("--graceful-shutdown", type=int, default=30,
+                        help="Seconds in-flight requests get to finish on shutdown")
+    parser.add_argument("--access-log", action="store_true", help="Also enable uvicorn's access log")
+    parser.add_argument("--print-config", action="store_true", help="Print the settings and exit")
+    args = parser.parse_args(argv)
+
+    config = server_config(args)
+    if args.print_config:
+        print(json.dumps(config, indent=2))
+        return
+
+    import uvicorn
+
+    # Tells each worker how many siblings it has (see changes.py)
+    os.environ["WEB_CONCURRENCY"] = str(args.workers)
+    # One key for all workers, so a read-your-writes pin issued by one is honored by the others
+    os.environ.setdefault("READ_YOUR_WRITES_SECRET", secrets.token_hex(32))
+    # Passed as an import string: with several workers each process imports the app itself
+    uvicorn.run(APP, **config)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,23 +1,67 @@
-from fastapi import FastAPI, APIRouter
+from fastapi import FastAPI, APIRouter, Depends, HTTPException, Query, Request, Response
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
-from motor.motor_asyncio import AsyncIOMotorClient
+import asyncio
 import os
 import logging
 from pathlib import Path
-from pydantic import BaseModel, Field
-from typing import List
+from pydantic import BaseModel, Field, TypeAdapter
+from typing import Any, Dict, List, Literal, Optional
 import uuid
 from datetime import datetime
 
+from admin import require_admin
+from changes import SequenceAllocator, read_changes, settle_seconds_from_env
+from clients import ClientDirectory
+from counts import CountCache, StatusFilter, count_status_checks
+from database import LazyDatabase
+from encoding import CompressionMiddleware, negotiate
+from lazy import LazyObject, lazy_from_env
+from logs import AccessLogMiddleware, parse_sample_rates
+from partitions import PartitionRouter, enforce_retention, find_in_partitions, parse_cursor
+from profiling import ProfilingMiddleware
+from read_routing import ReadRouter, ReadYourWritesMiddleware, on_primary, reader_name, reader_pin
+from storage import codec_from_env
+
 
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
 
-# MongoDB connection
+# MongoDB connection (the Motor client is created on first use, once per worker process)
 mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
-db = client[os.environ['DB_NAME']]
+mongo_options = {}
+if os.environ.get('MONGO_MAX_POOL_SIZE'):
+    mongo_options['maxPoolSize'] = int(os.environ['MONGO_MAX_POOL_SIZE'])
+db = LazyDatabase(mongo_url, os.environ['DB_NAME'], **mongo_options)
+
+# Secondary reads for list/count, primary for recent writers
+read_router = ReadRouter.from_env(os.environ)
+
+# Stored document schema for status_checks (legacy or compact)
+status_codec = codec_from_env(os.environ)
+
+# Per-period status_checks collections, pruned by time range on reads
+partitions = PartitionRouter.from_env("status_checks", os.environ, status_codec)
+
+# Change-feed sequence numbers, taken from the counters collection on insert
+sequence = SequenceAllocator()
+changes_settle_seconds = settle_seconds_from_env(os.environ)
+
+# Distinct client names for /clients typeahead, loaded once and updated on insert
+client_directory = ClientDirectory.from_env(os.environ)
+
+# Distinct-client and heavy-hitter sketches over rolling windows, fed on insert
+status_sketches = lazy_from_env("sketches", "RollingSketches", os.environ)
+
+# Batching and backpressure for POST /status/stream
+ingest_settings = lazy_from_env("ingest", "IngestSettings", os.environ)
+
+# RSS growth sampling and on-demand tracemalloc snapshots for /admin/memory
+rss_sampler = lazy_from_env("memory", "RSSSampler", os.environ)
+memory_snapshots = lazy_from_env("memory", "SnapshotStore", os.environ)
+
+# Short-lived cache for /status/count and HEAD /status
+count_cache = CountCache(ttl=float(os.environ.get('STATUS_COUNT_TTL', '5')))
 
 # Create the main app without a prefix
 app = FastAPI()
@@ -25,6 +69,9 @@ app = FastAPI()
 # Create a router with the /api prefix
 api_router = APIRouter(prefix="/api")
 
+# Operational endpoints, all behind the admin token
+admin_router = APIRouter(prefix="/api/admin", dependencies=[Depends(require_admin)])
+
 
 # Define Models
 class StatusCheck(BaseModel):
@@ -35,25 +82,301 @@ class StatusCheck(BaseModel):
 class StatusCheckCreate(BaseModel):
     client_name: str
 
+class StatusCount(BaseModel):
+    count: int
+
+class ClientNames(BaseModel):
+    clients: List[str]
+
+class HeavyHitter(BaseModel):
+    client_name: str
+    count: int
+    # The true count is between count - max_overcount and count
+    max_overcount: int
+
+class StatusSketch(BaseModel):
+    window_seconds: float
+    checks: int
+    distinct_clients: int
+    distinct_relative_error: float
+    heavy_hitters: List[HeavyHitter]
+    client_checks: Optional[int] = None
+
+class StatusChange(StatusCheck):
+    seq: int
+
+class StatusChanges(BaseModel):
+    changes: List[StatusChange]
+    # Pass back as ?since= to continue after the last change returned
+    next_since: int
+
+class BatchItem(BaseModel):
+    # Echoed back on the matching result
+    id: Optional[str] = None
+    method: str = "GET"
+    path: str
+    query: Dict[str, Any] = Field(default_factory=dict)
+    headers: Dict[str, str] = Field(default_factory=dict)
+    body: Any = None
+
+class BatchRequest(BaseModel):
+    requests: List[BatchItem]
+
+class BatchResult(BaseModel):
+    id: Optional[str] = None
+    status: int
+    headers: Dict[str, str]
+    body: Any = None
+
+class BatchResults(BaseModel):
+    responses: List[BatchResult]
+
+# Validates a whole page of documents in one call instead of one model per row
+status_check_list = TypeAdapter(List[StatusCheck])
+status_change_list = TypeAdapter(List[StatusChange])
+
+async def status_collections(request, status_filter, client_name=None, resume_from=None):
+    """Read handles for the partitions the filter's time range (from ``resume_from`` on) overlaps, oldest first"""
+    since = status_filter.since
+    if resume_from is not None and (since is None or resume_from > since):
+        since = resume_from
+    names = await partitions.for_range(db, since, status_filter.until)
+    reader, pin = reader_name(request, client_name), reader_pin(request)
+    return [read_router.for_read(db[name], reader, pin) for name in names]
+
+async def load_client_names():
+    field = status_codec.fields["client_name"]
+    names = set()
+    for name in await partitions.for_range(db):
+        names.update(await db[name].distinct(field))
+    return names
+
 # Add your routes to the router instead of directly to app
 @api_router.get("/")
 async def root():
     return {"message": "Hello World"}
 
+async def store_status_checks(status_objs):
+    """Insert checks and update the in-memory state that follows writes; shared by every ingest path"""
+    by_collection = {}
+    for status_obj in status_objs:
+        name = partitions.collection_name(status_obj.timestamp)
+        by_collection.setdefault(name, []).append(status_obj)
+    seq = await sequence.allocate(db.counters, len(status_objs))
+    try:
+        next_seq = seq
+        for batch in by_collection.values():
+            collection = await partitions.for_write(db, batch[0].timestamp)
+            documents = []
+            for status_obj in batch:
+                document = status_codec.encode(status_obj)
+                document[status_codec.fields["seq"]] = next_seq
+                next_seq += 1
+                documents.append(document)
+            if len(documents) == 1:
+                _ = await collection.insert_one(documents[0])
+            else:
+                _ = await collection.insert_many(documents, ordered=False)
+    finally:
+        sequence.release(seq)
+    for status_obj in status_objs:
+        count_cache.record_insert(status_obj.model_dump())
+        client_directory.add(status_obj.client_name)
+        status_sketches.record(status_obj.client_name)
+        read_router.record_write(status_obj.client_name)
+
 @api_router.post("/status", response_model=StatusCheck)
-async def create_status_check(input: StatusCheckCreate):
+async def create_status_check(input: StatusCheckCreate, request: Request):
     status_dict = input.dict()
     status_obj = StatusCheck(**status_dict)
-    _ = await db.status_checks.insert_one(status_obj.dict())
-    return status_obj
+    await store_status_checks([status_obj])
+    return negotiate(request, status_obj)
+
+@api_router.post("/status/stream")
+async def stream_status_checks(request: Request):
+    # NDJSON StatusCheckCreate lines in, NDJSON acks out while the request is still open (see ingest.py)
+    from ingest import IngestStream, NDJSONStreamResponse, ndjson_lines
+
+    async def store(inputs):
+        await store_status_checks([StatusCheck(**input.dict()) for input in inputs])
+
+    stream = IngestStream(ingest_settings, StatusCheckCreate, store)
+    return NDJSONStreamResponse(ndjson_lines(stream.acks(request.stream())))
+
+@api_router.head("/status")
+async def head_status_checks(
+    request: Request,
+    client_name: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+):
+    status_filter = StatusFilter(client_name, since, until)
+    collections = await status_collections(request, status_filter, client_name)
+    count = await count_status_checks(collections, count_cache, status_filter, status_codec.fields)
+    return Response(headers={"X-Total-Count": str(count)})
 
 @api_router.get("/status", response_model=List[StatusCheck])
-async def get_status_checks():
-    status_checks = await db.status_checks.find().to_list(1000)
-    return [StatusCheck(**status_check) for status_check in status_checks]
+async def get_status_checks(
+    request: Request,
+    client_name: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    limit: int = Query(1000, ge=1, le=1000),
+    after: Optional[str] = None,
+):
+    # Pages run in (timestamp, id) order; the next one starts after=<last timestamp>,<last id>
+    resume = None
+    if after is not None:
+        try:
+            resume_timestamp, resume_id = parse_cursor(after)
+            resume = (resume_timestamp, status_codec.encode_id(resume_id))
+        except ValueError as exc:
+            raise HTTPException(status_code=422, detail=f"Invalid after cursor: {exc}")
+    status_filter = StatusFilter(client_name, since, until)
+    collections = await status_collections(request, status_filter, client_name, resume[0] if resume else None)
+    status_checks = await find_in_partitions(
+        collections, status_filter.to_query(status_codec.fields), status_codec.fields, limit, after=resume
+    )
+    return negotiate(request, status_check_list.validate_python(status_codec.decode_many(status_checks)))
+
+@api_router.get("/status/changes", response_model=StatusChanges)
+async def get_status_changes(
+    request: Request,
+    since: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+):
+    # Sequence numbers don't follow partition boundaries: every partition is a candidate.
+    # Always the primary: a lagging secondary could hide a number the consumer then skips.
+    collections = [on_primary(db, name) for name in await partitions.for_range(db)]
+    documents = await read_changes(
+        collections, since, limit, status_codec.fields,
+        horizon=sequence.horizon(), settle_seconds=changes_settle_seconds,
+    )
+    changes = status_change_list.validate_python(status_codec.decode_many(documents))
+    next_since = changes[-1].seq if changes else since
+    return negotiate(request, StatusChanges(changes=changes, next_since=next_since))
+
+@api_router.get("/clients", response_model=ClientNames)
+async def get_clients(
+    request: Request,
+    prefix: str = "",
+    limit: int = Query(20, ge=1, le=1000),
+):
+    await client_directory.ensure_loaded(load_client_names)
+    return negotiate(request, ClientNames(clients=client_directory.lookup(prefix, limit)))
+
+@api_router.get("/status/sketch", response_model=StatusSketch)
+async def get_status_sketch(
+    request: Request,
+    window: float = Query(300, gt=0),
+    top: int = Query(10, ge=1, le=100),
+    client_name: Optional[str] = None,
+):
+    # Approximate, from this worker's in-memory sketches; no database access
+    summary = status_sketches.summary(window, top, client_name)
+    return negotiate(request, StatusSketch(**summary))
+
+@api_router.get("/status/count", response_model=StatusCount)
+async def get_status_count(
+    request: Request,
+    client_name: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+):
+    status_filter = StatusFilter(client_name, since, until)
+    collections = await status_collections(request, status_filter, client_name)
+    count = await count_status_checks(collections, count_cache, status_filter, status_codec.fields)
+    return negotiate(request, StatusCount(count=count))
+
+@api_router.post("/batch", response_model=BatchResults)
+async def run_batch(input: BatchRequest, request: Request):
+    from batch import BatchError
+
+    try:
+        results = await batch_dispatcher.run(request.scope, input.requests)
+    except BatchError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    return negotiate(request, BatchResults(responses=results))
+
+MemoryGrouping = Literal["lineno", "filename", "traceback"]
+
+@admin_router.get("/memory")
+async def get_memory():
+    return {"rss": rss_sampler.summary(), "tracemalloc": memory_snapshots.status()}
+
+@admin_router.post("/memory/tracemalloc")
+async def start_tracemalloc(frames: int = Query(1, ge=1, le=100)):
+    # Frames per traceback: 1 is enough for "which line", more for "called from where"
+    memory_snapshots.start(frames)
+    return memory_snapshots.status()
+
+@admin_router.delete("/memory/tracemalloc")
+async def stop_tracemalloc():
+    memory_snapshots.stop()
+    return memory_snapshots.status()
+
+@admin_router.post("/memory/snapshots")
+async def take_memory_snapshot(
+    top: int = Query(20, ge=1, le=500),
+    group_by: MemoryGrouping = "lineno",
+):
+    try:
+        snapshot_id = await asyncio.to_thread(memory_snapshots.take)
+    except LookupError as exc:
+        raise HTTPException(status_code=409, detail=str(exc))
+    sites = await asyncio.to_thread(memory_snapshots.top, snapshot_id, group_by, top)
+    return {"id": snapshot_id, "top": sites}
+
+@admin_router.get("/memory/snapshots/{snapshot_id}")
+async def get_memory_snapshot(
+    snapshot_id: int,
+    top: int = Query(20, ge=1, le=500),
+    group_by: MemoryGrouping = "lineno",
+):
+    try:
+        sites = await asyncio.to_thread(memory_snapshots.top, snapshot_id, group_by, top)
+    except LookupError as exc:
+        raise HTTPException(status_code=404, detail=str(exc))
+    return {"id": snapshot_id, "top": sites}
+
+@admin_router.get("/memory/diff")
+async def diff_memory_snapshots(
+    base: int = Query(..., alias="from"),
+    to: Optional[int] = Query(None, description="Defaults to a snapshot taken now"),
+    top: int = Query(20, ge=1, le=500),
+    group_by: MemoryGrouping = "lineno",
+):
+    try:
+        if to is None:
+            to = await asyncio.to_thread(memory_snapshots.take)
+        sites = await asyncio.to_thread(memory_snapshots.diff, base, to, group_by, top)
+    except LookupError as exc:
+        raise HTTPException(status_code=404, detail=str(exc))
+    return {"from": base, "to": to, "growth": sites}
+
+@admin_router.get("/memory/objects")
+async def get_object_counts(top: int = Query(0, ge=0, le=200)):
+    # Walks the whole GC-tracked heap
+    from memory import object_counts, tracked_types_from_env
+
+    return await asyncio.to_thread(object_counts, tracked_types_from_env(os.environ), top)
 
 # Include the router in the main app
 app.include_router(api_router)
+app.include_router(admin_router)
+
+def build_batch_dispatcher():
+    from batch import BatchDispatcher
+
+    return BatchDispatcher(
+        app.router,
+        app.exception_handlers,
+        batch_path="/api/batch",
+        max_requests=int(os.environ.get('BATCH_MAX_REQUESTS', '20')),
+    )
+
+# Sub-requests of /api/batch go straight to the app's routes (API and admin), in-process
+batch_dispatcher = LazyObject(build_batch_dispatcher)
 
 app.add_middleware(
     CORSMiddleware,
@@ -63,13 +386,75 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+# Admin-gated per-request profiling (X-Profile: 1 or ?profile=1)
+app.add_middleware(
+    ProfilingMiddleware,
+    profile_dir=os.environ.get('PROFILE_DIR', str(ROOT_DIR / 'profiles')),
+    keep=int(os.environ.get('PROFILE_KEEP', '50')),
+)
+
+# Signed read-your-writes pins on API writes, honored by every worker (see read_routing.py)
+app.add_middleware(ReadYourWritesMiddleware, get_router=lambda: read_router)
+
+# zstd/gzip compression for larger JSON and MessagePack bodies
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=int(os.environ.get('COMPRESSION_MIN_SIZE', '1024')),
 )
+
+# Request ids and sampled JSON access records (outermost, so timings include compression)
+app.add_middleware(
+    AccessLogMiddleware,
+    sample_rates=parse_sample_rates(os.environ.get('ACCESS_LOG_SAMPLE')),
+    slow_ms=float(os.environ.get('ACCESS_LOG_SLOW_MS', '1000')),
+)
+
+# Logging: records are queued and written by a listener thread, installed on startup
+log_pipeline = lazy_from_env("logs", "LogPipeline", os.environ)
 logger = logging.getLogger(__name__)
 
+async def ensure_indexes():
+    # Backs filtered count_documents calls and time-ranged reads; partitions get theirs on first write.
+    # The first write also waits on this (see PartitionRouter.for_write), so it never races the collection's creation.
+    if partitions.enabled:
+        return
+    try:
+        await partitions.ensure_ready(db, partitions.base)
+    except Exception:
+        logger.exception("Failed to create status_checks indexes; retrying on the first write")
+
+async def preload_client_names():
+    try:
+        await client_directory.ensure_loaded(load_client_names)
+    except Exception:
+        logger.exception("Failed to load client names; retrying on the next /clients request")
+
+async def sample_rss():
+    # A task of its own, so the memory module is imported after startup, not during it
+    if rss_sampler.enabled:
+        await rss_sampler.run()
+
+@app.on_event("startup")
+async def schedule_index_creation():
+    log_pipeline.install()
+    # Runs in the background so startup never waits on the first Mongo round trip
+    app.state.index_task = asyncio.create_task(ensure_indexes())
+    app.state.clients_task = asyncio.create_task(preload_client_names())
+    app.state.memory_task = asyncio.create_task(sample_rss())
+    tracemalloc_frames = os.environ.get('MEMORY_TRACEMALLOC_FRAMES')
+    if tracemalloc_frames:
+        memory_snapshots.start(int(tracemalloc_frames))
+    retention_days = os.environ.get('STATUS_RETENTION_DAYS')
+    if retention_days and partitions.enabled:
+        app.state.retention_task = asyncio.create_task(
+            enforce_retention(partitions, db, float(retention_days), logger=logger)
+        )
+
 @app.on_event("shutdown")
 async def shutdown_db_client():
-    client.close()
\ No newline at end of file
+    for name in ("index_task", "retention_task", "clients_task", "memory_task"):
+        task = getattr(app.state, name, None)
+        if task is not None and not task.done():
+            task.cancel()
+    db.close()
+    log_pipeline.stop()
\ No newline at end of file
@@ -0,0 +1,230 @@
+"""Fixed-memory streaming sketches of status check traffic.
+
+Every insert is hashed once (128-bit BLAKE2b of the client name) and fed to
+three sketches:
+
+* ``HyperLogLog`` - distinct client names, ~1.04/sqrt(2**precision)
+  relative error (1.6% at the default precision of 12, 4 KiB).
+* ``CountMinSketch`` - checks per client name; never underestimates, and
+  overestimates by at most e/width of the window's total with probability
+  1 - e**-depth.
+* ``SpaceSaving`` - the ``capacity`` most frequent client names (heavy
+  hitters), each with its maximum overcount.
+
+``RollingSketches`` keeps a ring of ``buckets`` sets of these sketches, one
+per ``bucket_seconds`` of arrival time, and answers for any window up to
+``buckets * bucket_seconds`` by merging the buckets it covers. Expired
+buckets are cleared in place and reused, so memory is fixed by the
+configuration alone, however many checks or clients arrive.
+
+Configuration (environment):
+
+* ``STATUS_SKETCH_BUCKET_SECONDS`` - bucket width (default 60)
+* ``STATUS_SKETCH_BUCKETS`` - buckets kept (default 60, so one hour)
+
+Sketches live in process memory: each worker reports the traffic it served.
+"""
+import hashlib
+import math
+import time
+from array import array
+
+_TWO_POW_NEG = [2.0 ** -rank for rank in range(65)]
+
+
+def hash128(name):
+    """Two independent 64-bit hashes of ``name``."""
+    digest = hashlib.blake2b(name.encode(), digest_size=16).digest()
+    return int.from_bytes(digest[:8], "little"), int.from_bytes(digest[8:], "little")
+
+
+class HyperLogLog:
+    def __init__(self, precision=12):
+        self.precision = precision
+        self.size = 1 << precision
+        self.registers = bytearray(self.size)
+
+    def add_hash(self, value):
+        index = value >> (64 - self.precision)
+        rest = value & ((1 << (64 - self.precision)) - 1)
+        rank = (64 - self.precision) - rest.bit_length() + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def merge(self, other):
+        self.registers = bytearray(map(max, self.registers, other.registers))
+
+    def count(self):
+        m = self.size
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / sum(_TWO_POW_NEG[rank] for rank in self.registers)
+        zeros = self.registers.count(0)
+        if estimate <= 2.5 * m and zeros:
+            return m * math.log(m / zeros)  # linear counting for small cardinalities
+        return estimate
+
+    @property
+    def relative_error(self):
+        return 1.04 / math.sqrt(self.size)
+
+    def clear(self):
+        self.registers[:] = bytes(self.size)
+
+
+class CountMinSketch:
+    def __init__(self, width=2048, depth=4):
+        self.width = width
+        self.depth = depth
+        self.table = array("I", bytes(4 * width * depth))
+        self.total = 0
+
+    def cells(self, hashes):
+        # Kirsch-Mitzenmacher: row i uses h1 + i * h2
+        h1, h2 = hashes
+        return [row * self.width + (h1 + row * h2) % self.width for row in range(self.depth)]
+
+    def add_hash(self, hashes, count=1):
+        for cell in self.cells(hashes):
+            self.table[cell] += count
+        self.total += count
+
+    def clear(self):
+        self.table = array("I", bytes(4 * self.width * self.depth))
+        self.total = 0
+
+
+class SpaceSaving:
+    def __init__(self, capacity=100):
+        self.capacity = capacity
+        self.counters = {}  # name -> [count, overcount]
+
+    def add(self, name, count=1):
+        counter = self.counters.get(name)
+        if counter is not None:
+            counter[0] += count
+        elif len(self.counters) < self.capacity:
+            self.counters[name] = [count, 0]
+        else:
+            # Replace the smallest counter; the newcomer inherits its count as possible overcount
+            smallest = min(self.counters, key=lambda key: self.counters[key][0])
+            floor = self.counters.pop(smallest)[0]
+            self.counters[name] = [floor + count, floor]
+
+    @property
+    def floor(self):
+        """Upper bound on the count of any name not being tracked."""
+        if len(self.counters) < self.capacity:
+            return 0
+        return min(counter[0] for counter in self.counters.values())
+
+    def clear(self):
+        self.counters.clear()
+
+
+class _Bucket:
+    __slots__ = ("epoch", "distinct", "frequency", "heavy")
+
+    def __init__(self, precision, width, depth, capacity):
+        self.epoch = None
+        self.distinct = HyperLogLog(precision)
+        self.frequency = CountMinSketch(width, depth)
+        self.heavy = SpaceSaving(capacity)
+
+    def reset(self, epoch):
+        self.epoch = epoch
+        self.distinct.clear()
+        self.frequency.clear()
+        self.heavy.clear()
+
+
+class RollingSketches:
+    def __init__(self, bucket_seconds=60.0, buckets=60, precision=12, width=2048, depth=4, capacity=100,
+                 clock=time.time):
+        self.bucket_seconds = bucket_seconds
+        self.clock = clock
+        self.precision = precision
+        self._buckets = [_Bucket(precision, width, depth, capacity) for _ in range(buckets)]
+
+    @classmethod
+    def from_env(cls, environ):
+        return cls(
+            bucket_seconds=float(environ.get('STATUS_SKETCH_BUCKET_SECONDS', '60')),
+            buckets=int(environ.get('STATUS_SKETCH_BUCKETS', '60')),
+        )
+
+    @property
+    def max_window(self):
+        return self.bucket_seconds * len(self._buckets)
+
+    def record(self, client_name):
+        epoch = int(self.clock() // self.bucket_seconds)
+        bucket = self._buckets[epoch % len(self._buckets)]
+        if bucket.epoch != epoch:
+            bucket.reset(epoch)
+        hashes = hash128(client_name)
+        bucket.distinct.add_hash(hashes[0])
+        bucket.frequency.add_hash(hashes)
+        bucket.heavy.add(client_name)
+
+    def _span(self, seconds):
+        """Buckets covering the last ``seconds``: rounded up, capped at the ring size."""
+        return max(1, min(len(self._buckets), math.ceil(seconds / self.bucket_seconds)))
+
+    def _window(self, seconds):
+        now = int(self.clock() // self.bucket_seconds)
+        span = self._span(seconds)
+        return [bucket for bucket in self._buckets if bucket.epoch is not None and now - span < bucket.epoch <= now]
+
+    def summary(self, seconds, top=10, client_name=None):
+        buckets = self._window(seconds)
+        distinct = HyperLogLog(self.precision)
+        for bucket in buckets:
+            distinct.merge(bucket.distinct)
+
+        summary = {
+            "window_seconds": self._span(seconds) * self.bucket_seconds,
+            "checks": sum(bucket.frequency.total for bucket in buckets),
+            "distinct_clients": round(distinct.count()),
+            "distinct_relative_error": round(distinct.relative_error, 4),
+            "heavy_hitters": self._heavy_hitters(buckets, top),
+        }
+        if client_name is not None:
+            summary["client_checks"] = self._frequency(buckets, client_name)
+        return summary
+
+    def _heavy_hitters(self, buckets, top):
+        # Sum each tracked name's counts over the window. A bucket that didn't
+        # track the name may have seen up to its floor of it, which goes into
+        # both the count (keeping it an upper bound) and the overcount.
+        total_floor = 0
+        candidates = {}  # name -> [count, overcount, floors of the buckets tracking it]
+        for bucket in buckets:
+            floor = bucket.heavy.floor
+            total_floor += floor
+            for name, (count, overcount) in bucket.heavy.counters.items():
+                entry = candidates.get(name)
+                if entry is None:
+                    entry = candidates[name] = [0, 0, 0]
+                entry[0] += count
+                entry[1] += overcount
+                entry[2] += floor
+        ranked = sorted(
+            (-(count + total_floor - tracked), name, overcount + total_floor - tracked)
+            for name, (count, overcount, tracked) in candidates.items()
+        )[:top]
+
+        # Count-Min never undercounts either, so the smaller upper bound is the
+        # tighter one; it is only looked up for the names reported
+        hitters = []
+        for negative_count, name, overcount in ranked:
+            estimate = min(-negative_count, self._frequency(buckets, name))
+            hitters.append({"client_name": name, "count": estimate, "max_overcount": min(overcount, estimate)})
+        hitters.sort(key=lambda hitter: (-hitter["count"], hitter["client_name"]))
+        return hitters
+
+    def _frequency(self, buckets, name):
+        if not buckets:
+            return 0
+        hashes = hash128(name)
+        cells = buckets[0].frequency.cells(hashes)
+        return min(sum(bucket.frequency.table[cell] for bucket in buckets) for cell in cells)
@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""
+Backend Startup Timing Report
+Measures, in fresh interpreter processes, how long the API takes to become
+ready to serve:
+1. Import cost per module (fastapi, starlette, pydantic, motor, dotenv, ...)
+2. App construction (importing server.py)
+3. Startup hooks
+4. First request
+5. First MongoDB round trip (includes the deferred Motor import)
+
+Usage: python startup_report.py [--runs 5] [--budget-ms 300] [--json]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).parent
+TRACKED_MODULES = ("fastapi", "starlette", "pydantic", "motor", "pymongo", "dotenv", "msgpack", "zstandard")
+STAGES = ("import_ms", "startup_ms", "first_request_ms", "mongo_ms")
+# Loaded on first use, never by importing server.py
+LAZY_MODULES = ("motor", "pymongo", "memory", "sketches", "ingest", "batch")
+
+# Runs inside the child interpreter, with LAZY_MODULES as arguments; prints one JSON line on stdout.
+_CHILD_SCRIPT = r"""
+import asyncio, json, sys, time
+t0 = time.perf_counter()
+import server
+t1 = time.perf_counter()
+lazy_modules = {name: name in sys.modules for name in sys.argv[1:]}
+
+async def first_request():
+    messages = []
+    scope = {"type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+             "scheme": "http", "path": "/api/", "raw_path": b"/api/", "root_path": "", "query_string": b"",
+             "headers": [(b"host", b"localhost")], "client": ("127.0.0.1", 0), "server": ("localhost", 80)}
+    requests = [{"type": "http.request", "body": b"", "more_body": False}]
+    async def receive():
+        return requests.pop() if requests else {"type": "http.disconnect"}
+    async def send(message):
+        messages.append(message)
+    await server.app(scope, receive, send)
+    return messages[0]["status"]
+
+async def main():
+    await server.app.router.startup()
+    t2 = time.perf_counter()
+    status = await first_request()
+    t3 = time.perf_counter()
+    try:
+        await server.db.command("ping")
+        mongo_error = None
+    except Exception as exc:
+        mongo_error = f"{type(exc).__name__}: {exc}"[:200]
+    t4 = time.perf_counter()
+    await server.app.router.shutdown()
+    return t2, t3, t4, status, mongo_error
+
+t2, t3, t4, status, mongo_error = asyncio.run(main())
+print(json.dumps({
+    "import_ms": (t1 - t0) * 1000,
+    "startup_ms": (t2 - t1) * 1000,
+    "first_request_ms": (t3 - t2) * 1000,
+    "mongo_ms": (t4 - t3) * 1000,
+    "first_request_status": status,
+    "mongo_error": mongo_error,
+    "loaded_at_ready": lazy_modules,
+}))
+"""
+
+
+# Imports every deployment pays regardless of our code: the floor for "ready".
+_FRAMEWORK_SCRIPT = r"""
+import time
+t0 = time.perf_counter()
+import fastapi, pydantic, dotenv, starlette.middleware.cors
+print((time.perf_counter() - t0) * 1000)
+"""
+
+
+def _child_env(mongo_timeout_ms):
+    from dotenv import dotenv_values
+
+    env = dict(os.environ)
+    file_values = dotenv_values(BACKEND_DIR / '.env')
+    for key in ('MONGO_URL', 'DB_NAME'):
+        env.setdefault(key, file_values.get(key) or "")
+    # Bound server selection so an unreachable Mongo costs seconds, not 30 s
+    url = env['MONGO_URL']
+    if "?" in url:
+        url += "&"
+    elif url.count("/") == 2:
+        url += "/?"
+    else:
+        url += "?"
+    env['MONGO_URL'] = f"{url}serverSelectionTimeoutMS={mongo_timeout_ms}"
+    return env
+
+
+def parse_importtime(stderr):
+    """Cumulative microseconds per module from ``python -X importtime`` output."""
+    cumulative = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative_us, name = line[len("import time:"):].split("|")
+        name = name.strip()
+        if cumulative_us.strip().isdigit():
+            cumulative[name] = max(cumulative.get(name, 0), int(cumulative_us))
+    return cumulative
+
+
+def run_once(mongo_timeout_ms=2000, importtime=False):
+    """Start one fresh interpreter and return its stage timings.
+
+    ``-X importtime`` slows imports down noticeably, so the per-module
+    breakdown comes from a separate run when ``importtime`` is set.
+    """
+    started = time.perf_counter()
+    flags = ["-X", "importtime"] if importtime else []
+    proc = subprocess.run(
+        [sys.executable, *flags, "-c", _CHILD_SCRIPT, *LAZY_MODULES],
+        cwd=BACKEND_DIR,
+        env=_child_env(mongo_timeout_ms),
+        capture_output=True,
+        text=True,
+    )
+    total_ms = (time.perf_counter() - started) * 1000
+    if proc.returncode != 0:
+        raise RuntimeError(f"Startup probe failed: {proc.stderr.strip().splitlines()[-1:]}")
+    result = json.loads(proc.stdout.strip().splitlines()[-1])
+    if importtime:
+        local_modules = {p.stem for p in BACKEND_DIR.glob("*.py")}
+        result["module_import_ms"] = {
+            name: us / 1000 for name, us in parse_importtime(proc.stderr).items()
+            if name in TRACKED_MODULES or name in local_modules
+        }
+    result["ready_ms"] = result["import_ms"] + result["startup_ms"]
+    result["process_ms"] = total_ms
+    return result
+
+
+def framework_floor_once():
+    """Time to import just FastAPI, pydantic and dotenv in a fresh process."""
+    proc = subprocess.run([sys.executable, "-c", _FRAMEWORK_SCRIPT], capture_output=True, text=True, check=True)
+    return float(proc.stdout.strip())
+
+
+def measure_startup(runs=3, mongo_timeout_ms=2000):
+    """Medians of ``runs`` fresh-process measurements plus one import breakdown.
+
+    Each app run is paired with a framework-floor run right before it, so a
+    machine that slows down mid-measurement slows both sides of the pair;
+    ``overhead_ms`` is the median of the per-pair differences.
+    """
+    floors, samples = [], []
+    for _ in range(runs):
+        floors.append(framework_floor_once())
+        samples.append(run_once(mongo_timeout_ms))
+    report = {key: statistics.median(s[key] for s in samples) for key in STAGES + ("ready_ms", "process_ms")}
+    report["framework_floor_ms"] = statistics.median(floors)
+    report["overhead_ms"] = statistics.median(s["ready_ms"] - floor for s, floor in zip(samples, floors))
+    report["module_import_ms"] = run_once(mongo_timeout_ms, importtime=True)["module_import_ms"]
+    report["first_request_status"] = samples[-1]["first_request_status"]
+    report["mongo_error"] = samples[-1]["mongo_error"]
+    report["loaded_at_ready"] = samples[-1]["loaded_at_ready"]
+    report["runs"] = runs
+    return report
+
+
+def print_report(report, budget_ms=None):
+    print(f"🚀 Backend startup report (median of {report['runs']} runs)")
+    print("=" * 70)
+    print("📦 Import cost per module (cumulative, one -X importtime run):")
+    for name, ms in sorted(report["module_import_ms"].items(), key=lambda item: -item[1]):
+        print(f"   {name:<20}{ms:>10.1f} ms")
+    print("\n⏱️  Stages:")
+    print(f"   {'import server':<20}{report['import_ms']:>10.1f} ms")
+    print(f"   {'startup hooks':<20}{report['startup_ms']:>10.1f} ms")
+    # The first request shares the loop with the background index task, which
+    # is where Motor gets imported and the first connection is made.
+    print(f"   {'first request':<20}{report['first_request_ms']:>10.1f} ms  (HTTP {report['first_request_status']})")
+    mongo_note = f"  ({report['mongo_error']})" if report["mongo_error"] else ""
+    print(f"   {'first Mongo ping':<20}{report['mongo_ms']:>10.1f} ms{mongo_note}")
+    print(f"   {'whole process':<20}{report['process_ms']:>10.1f} ms")
+    print(f"\n✅ Ready to serve after {report['ready_ms']:.1f} ms")
+    print(f"   framework floor {report['framework_floor_ms']:.1f} ms, our overhead {report['overhead_ms']:.1f} ms")
+    if budget_ms is not None:
+        verdict = "within" if report["ready_ms"] <= budget_ms else "OVER"
+        print(f"📋 Budget: {budget_ms:.0f} ms ({verdict})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Backend startup timing report")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=None, help="exit 1 if time to ready exceeds this")
+    parser.add_argument("--mongo-timeout-ms", type=int, default=2000)
+    parser.add_argument("--json", action="store_true", help="print the raw report as JSON")
+    args = parser.parse_args()
+
+    report = measure_startup(args.runs, args.mongo_timeout_ms)
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report, args.budget_ms)
+    if args.budget_ms is not None and report["ready_ms"] > args.budget_ms:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
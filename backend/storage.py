@@ -0,0 +1,130 @@
+"""Stored document schemas for the status_checks collection.
+
+The API model (``StatusCheck``) is the same under both schemas; a codec maps
+it to and from what is stored.
+
+* ``legacy`` (default) - the model's dict, plus the ObjectId ``_id`` MongoDB
+  adds on insert::
+
+      {"_id": ObjectId(...), "id": "<36-char uuid>", "client_name": ..., "timestamp": ..., "seq": ...}
+
+* ``compact`` - the UUID is the ``_id`` itself, stored as 16 bytes of BSON
+  binary subtype 4, and the other fields get one-letter names::
+
+      {"_id": Binary(<16 bytes>, 4), "c": ..., "t": ..., "s": ...}
+
+  One unique index instead of two identifiers, and the collection is created
+  with WiredTiger's zstd block compressor, which takes care of the client
+  name repeated on every row (index keys already get prefix compression).
+
+``seq`` / ``s`` is the change-feed sequence number (see changes.py), set by
+the caller after encoding.
+
+Configuration (environment):
+
+* ``STATUS_STORAGE_SCHEMA`` - ``legacy`` (default) or ``compact``. The two
+  are not read interchangeably: switch on an empty collection or migrate.
+* ``STATUS_BLOCK_COMPRESSOR`` - WiredTiger block compressor for a compact
+  collection created by the app (default ``zstd``).
+
+bson is imported on first use so neither codec loads pymongo at startup.
+"""
+import uuid
+
+LEGACY = "legacy"
+COMPACT = "compact"
+
+
+class LegacyCodec:
+    name = LEGACY
+    fields = {"id": "id", "client_name": "client_name", "timestamp": "timestamp", "seq": "seq"}
+
+    def encode(self, status_check):
+        return status_check.model_dump()
+
+    def encode_id(self, check_id):
+        return check_id
+
+    def decode_many(self, documents):
+        # Already shaped like the model; validation ignores the extra _id
+        return documents
+
+    def collection_options(self):
+        return {}
+
+
+class CompactCodec:
+    name = COMPACT
+    fields = {"id": "_id", "client_name": "c", "timestamp": "t", "seq": "s"}
+
+    def __init__(self, block_compressor="zstd"):
+        self.block_compressor = block_compressor
+
+    def encode(self, status_check):
+        return {
+            "_id": self.encode_id(status_check.id),
+            "c": status_check.client_name,
+            "t": status_check.timestamp,
+        }
+
+    def encode_id(self, check_id):
+        """Stored form of a check id; ValueError if it isn't a UUID."""
+        from bson.binary import UUID_SUBTYPE, Binary
+
+        return Binary(uuid.UUID(check_id).bytes, UUID_SUBTYPE)
+
+    def decode_many(self, documents):
+        return [
+            {
+                "id": str(_as_uuid(document["_id"])),
+                "client_name": document["c"],
+                "timestamp": document["t"],
+                "seq": document.get("s"),
+            }
+            for document in documents
+        ]
+
+    def collection_options(self):
+        if not self.block_compressor:
+            return {}
+        return {"storageEngine": {"wiredTiger": {"configString": f"block_compressor={self.block_compressor}"}}}
+
+
+def _as_uuid(value):
+    # Binary subtype 4 unless the client was built with uuidRepresentation="standard"
+    return value if isinstance(value, uuid.UUID) else value.as_uuid()
+
+
+def codec_from_env(environ):
+    schema = environ.get('STATUS_STORAGE_SCHEMA', LEGACY)
+    if schema == LEGACY:
+        return LegacyCodec()
+    if schema == COMPACT:
+        return CompactCodec(environ.get('STATUS_BLOCK_COMPRESSOR', 'zstd'))
+    raise ValueError(f"Unsupported storage schema {schema!r}; use {LEGACY!r} or {COMPACT!r}")
+
+
+def index_specs(codec):
+    """Secondary indexes backing filtered counts, time-ranged reads and the change feed, in stored field names.
+
+    Listings page in (timestamp, id) order, so the id ends the time-ordered indexes.
+    """
+    client_name, timestamp, check_id = codec.fields["client_name"], codec.fields["timestamp"], codec.fields["id"]
+    return [
+        [(client_name, 1), (timestamp, 1), (check_id, 1)],
+        [(timestamp, 1), (check_id, 1)],
+        [(codec.fields["seq"], 1)],
+    ]
+
+
+async def ensure_collection(database, name, codec):
+    """Create ``name`` with the codec's storage options unless it already exists."""
+    options = codec.collection_options()
+    if not options:
+        return
+    from pymongo.errors import CollectionInvalid
+
+    try:
+        await database.create_collection(name, **options)
+    except CollectionInvalid:
+        pass  # already there; storage options only apply at creation
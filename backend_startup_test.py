@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+"""
+Backend Cold Start Test Suite
+Guards time-to-ready of the FastAPI backend against regressions:
+1. Time to Ready - import + startup hooks stay within STARTUP_MARGIN_MS
+   (default 100) of the framework floor measured on the same machine
+2. Startup Overhead - our own cost on top of FastAPI/pydantic imports stays
+   within STARTUP_OVERHEAD_BUDGET_MS (default 75)
+3. Deferred Imports - motor/pymongo and the optional feature modules are not
+   loaded before the app is ready
+Timings are medians of STARTUP_RUNS (default 7) fresh processes: the floor
+varies a lot between machines and runs, absolute budgets don't.
+4. Non-blocking Startup - startup hooks do not wait on MongoDB
+5. First Request - the app answers its first request
+"""
+
+import os
+import sys
+import time
+from pathlib import Path
+
+# Add the project root to Python path
+project_root = Path(__file__).parent
+sys.path.append(str(project_root))
+sys.path.append(str(project_root / "backend"))
+
+from harness.reporting import ResultStream, run_timed  # noqa: E402
+from startup_report import measure_startup  # noqa: E402
+
+
+class BackendStartupTester:
+    def __init__(self):
+        self.margin_ms = float(os.environ.get("STARTUP_MARGIN_MS", "100"))
+        self.overhead_budget_ms = float(os.environ.get("STARTUP_OVERHEAD_BUDGET_MS", "75"))
+        self.runs = int(os.environ.get("STARTUP_RUNS", "7"))
+        self.test_results = []
+        self._report = None
+
+    @property
+    def report(self):
+        """Startup measurements, taken once and shared by every test"""
+        if self._report is None:
+            # Unreachable Mongo with a short timeout: startup must not care.
+            self._report = measure_startup(runs=self.runs, mongo_timeout_ms=200)
+        return self._report
+
+    def log_test(self, test_name, status, message="", details=None):
+        """Log test results"""
+        result = {
+            "test": test_name,
+            "status": status,
+            "message": message,
+            "timestamp": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "details": details or {}
+        }
+        self.test_results.append(result)
+
+        status_icon = "✅" if status == "PASS" else "❌" if status == "FAIL" else "⚠️"
+        print(f"{status_icon} {test_name}: {message}")
+        if details:
+            for key, value in details.items():
+                print(f"   {key}: {value}")
+
+    def test_time_to_ready(self):
+        """Test 1: Import + startup hooks stay within a margin of the framework floor"""
+        test_name = "Time to Ready"
+
+        try:
+            ready_ms = self.report["ready_ms"]
+            floor_ms = self.report["framework_floor_ms"]
+            budget_ms = floor_ms + self.margin_ms
+            details = {
+                "Ready (ms)": f"{ready_ms:.1f}",
+                "Framework Floor (ms)": f"{floor_ms:.1f}",
+                "Budget (ms)": f"{budget_ms:.0f} (floor + {self.margin_ms:.0f})",
+                "Runs": self.report["runs"]
+            }
+
+            if ready_ms > budget_ms:
+                self.log_test(test_name, "FAIL", f"Ready in {ready_ms:.1f} ms, over the {budget_ms:.0f} ms budget", details)
+                return False
+
+            self.log_test(test_name, "PASS", f"Ready in {ready_ms:.1f} ms", details)
+            return True
+
+        except Exception as e:
+            self.log_test(test_name, "FAIL", f"Error measuring startup: {str(e)}")
+            return False
+
+    def test_startup_overhead(self):
+        """Test 2: Our own startup cost on top of the framework imports"""
+        test_name = "Startup Overhead"
+
+        try:
+            overhead_ms = self.report["overhead_ms"]
+            details = {
+                "Overhead (ms)": f"{overhead_ms:.1f}",
+                "Budget (ms)": f"{self.overhead_budget_ms:.0f}"
+            }
+
+            if overhead_ms > self.overhead_budget_ms:
+                self.log_test(test_name, "FAIL", f"Backend adds {overhead_ms:.1f} ms over FastAPI/pydantic", details)
+                return False
+
+            self.log_test(test_name, "PASS", f"Backend adds {overhead_ms:.1f} ms over FastAPI/pydantic", details)
+            return True
+
+        except Exception as e:
+            self.log_test(test_name, "FAIL", f"Error measuring startup: {str(e)}")
+            return False
+
+    def test_deferred_mongo_imports(self):
+        """Test 3: Motor, pymongo and the optional feature modules are imported lazily"""
+        test_name = "Deferred Imports"
+
+        try:
+            loaded = [name for name, is_loaded in self.report["loaded_at_ready"].items() if is_loaded]
+
+            if loaded:
+                self.log_test(test_name, "FAIL", f"Loaded before ready: {', '.join(loaded)}")
+                return False
+
+            self.log_test(test_name, "PASS", "motor, pymongo and feature modules load on first use")
+            return True
+
+        except Exception as e:
+            self.log_test(test_name, "FAIL", f"Error measuring startup: {str(e)}")
+            return False
+
+    def test_nonblocking_startup(self):
+        """Test 4: Startup hooks return without waiting on MongoDB"""
+        test_name = "Non-blocking Startup"
+
+        try:
+            startup_ms = self.report["startup_ms"]
+
+            if startup_ms > 50:
+                self.log_test(test_name, "FAIL", f"Startup hooks took {startup_ms:.1f} ms with MongoDB unreachable")
+                return False
+
+            self.log_test(test_name, "PASS", f"Startup hooks took {startup_ms:.1f} ms with MongoDB unreachable")
+            return True
+
+        except Exception as e:
+            self.log_test(test_name, "FAIL", f"Error measuring startup: {str(e)}")
+            return False
+
+    def test_first_request(self):
+        """Test 5: The freshly started app serves GET /api/"""
+        test_name = "First Request"
+
+        try:
+            status = self.report["first_request_status"]
+            details = {"First Request (ms)": f"{self.report['first_request_ms']:.1f}"}
+
+            if status != 200:
+                self.log_test(test_name, "FAIL", f"GET /api/ returned HTTP {status}", details)
+                return False
+
+            self.log_test(test_name, "PASS", "GET /api/ answered after cold start", details)
+            return True
+
+        except Exception as e:
+            self.log_test(test_name, "FAIL", f"Error measuring startup: {str(e)}")
+            return False
+
+    def run_all_tests(self):
+        """Run all cold start tests and generate report"""
+        print("🚀 Starting Backend Cold Start Tests...")
+        print("=" * 70)
+
+        tests = [
+            self.test_time_to_ready,
+            self.test_startup_overhead,
+            self.test_deferred_mongo_imports,
+            self.test_nonblocking_startup,
+            self.test_first_request
+        ]
+
+        passed = 0
+        failed = 0
+        warnings = 0
+
+        report = ResultStream.from_env("backend_startup_test")
+        for test in tests:
+            first = len(self.test_results)
+            ok, wall_time, cpu_time = run_timed(test, self.log_test)
+            if ok:
+                passed += 1
+            else:
+                failed += 1
+            report.test("backend_startup_test", test.__name__, ok, self.test_results[first:], wall_time, cpu_time)
+        report.close()
+
+        # Count warnings
+        warnings = sum(1 for result in self.test_results if result['status'] == 'WARN')
+
+        print("\n" + "=" * 70)
+        print("📊 BACKEND COLD START TEST SUMMARY")
+        print("=" * 70)
+        print(f"✅ Passed: {passed}")
+        print(f"❌ Failed: {failed}")
+        print(f"⚠️  Warnings: {warnings}")
+        print(f"📋 Total: {len(tests)}")
+
+        # Critical issues
+        critical_failures = [r for r in self.test_results if r['status'] == 'FAIL']
+        if critical_failures:
+            print("\n🚨 CRITICAL ISSUES:")
+            for failure in critical_failures:
+                print(f"❌ {failure['test']}: {failure['message']}")
+
+        return {
+            'passed': passed,
+            'failed': failed,
+            'warnings': warnings,
+            'total': len(tests),
+            'success_rate': (passed / len(tests)) * 100,
+            'results': self.test_results
+        }
+
+def main():
+    """Main test execution"""
+    try:
+        tester = BackendStartupTester()
+        results = tester.run_all_tests()
+
+        # Exit with appropriate code
+        if results['failed'] == 0:
+            print(f"\n🎉 ALL COLD START TESTS PASSED! Success rate: {results['success_rate']:.1f}%")
+            sys.exit(0)
+        else:
+            print(f"\n💥 {results['failed']} COLD START TESTS FAILED! Success rate: {results['success_rate']:.1f}%")
+            sys.exit(1)
+
+    except Exception as e:
+        print(f"❌ Test execution failed: {str(e)}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -17,17 +17,105 @@ import json
 import time
 import asyncio
 import subprocess
-import requests
 from pathlib import Path
 
 # Add the project root to Python path
 project_root = Path(__file__).parent
 sys.path.append(str(project_root))
 
+from harness.js_scanner import JsSymbols
+from harness.patterns import PatternScanner, source
+from harness.reporting import ResultStream, run_timed
+from harness.source_index import SourceIndex
+from harness.tags import io_bound, reads
+from harness.telegram_api import NetworkError, TelegramApi
+
+# Source checks, compiled into one scan per file (see harness/patterns.py)
+BOT = source("bot.js")
+TAX = source("tax-manager.js")
+TOKEN = source("token-manager.js")
+TRADING = source("real-trading-manager.js")
+AI = source("ai-integrations.js")
+
+SOL_TAX_BOT_CHECKS = {
+    "SOL Tax Collection State": BOT.has("solTaxCollection"),
+    "Dynamic Fees State": BOT.has("dynamicFees"),
+    "Tax Manager Import": BOT.has("require('./tax-manager')") | BOT.has("TaxManager"),
+    "SOL Collection Logic": BOT.has("collectInSOL"),
+    "Tax Exemption System": BOT.has("exemptWallets")
+}
+
+SOL_TAX_MANAGER_CHECKS = {
+    "Tax Manager Class": TAX.has("class TaxManager"),
+    "SOL Tax Calculation": TAX.has("calculateSOLTax") | TAX.has("collectSOLTax"),
+    "Tax Collection Tracking": TAX.has("trackTaxCollection") | TAX.has("taxStats"),
+    "Exemption Methods": TAX.has("exemptWallet") | TAX.has("addExemption")
+}
+
+MISSING_COMMAND_CHECKS = {
+    "/set_fees Command": BOT.has("/set_fees") & BOT.has("setFeesCommand"),
+    "/mint_rugpull Command": BOT.has("/mint_rugpull") & (BOT.has("mintRugpullCommand") | BOT.has("mint_rugpull")),
+    "/exempt_wallet Command": BOT.has("/exempt_wallet") & BOT.has("exemptWalletCommand"),
+    "Set Fees Handler": BOT.has("bot.onText(/\\/set_fees/"),
+    "Mint Rugpull Handler": BOT.has("bot.onText(/\\/mint_rugpull/"),
+    "Exempt Wallet Handler": BOT.has("bot.onText(/\\/exempt_wallet/")
+}
+
+MISSING_COMMAND_UI_CHECKS = {
+    "Set Fees UI": BOT.has("callback_data: 'set_fees'"),
+    "Tax Rate Configuration": BOT.has("0-99%") | BOT.has_i("tax rate"),
+    "Token Selection UI": BOT.has("Select token") | BOT.has_i("choose token"),
+    "Educational Messaging": BOT.has_i("research") & BOT.has_i("simulation")
+}
+
+TOKEN_ALLOCATION_CHECKS = {
+    "Wallet 1 Share Calculation": TOKEN.has("wallet1Share") | TOKEN.has("0.2") | TOKEN.has("20%"),
+    "Supply Distribution Logic": TOKEN.has("totalSupply *") & (TOKEN.has("0.2") | TOKEN.has("20")),
+    "Mint to Wallet 1": TOKEN.has("mintTo"),
+    "Remaining Supply Handling": TOKEN.has("remainingSupply") | TOKEN.has("80%"),
+    "Not 100% to Wallet 1": ~(TOKEN.has("mintAmount = totalSupply * Math.pow(10, 9)") & TOKEN.has("mintTo(") & TOKEN.has("totalSupply"))
+}
+
+FULL_SUPPLY_TO_WALLET1 = TOKEN.has("mintAmount = totalSupply * Math.pow(10, 9)")
+
+CHART_ACTIVITY_CHECKS = {
+    "Start Chart Activity Method": TRADING.has("startChartActivity"),
+    "Stop Chart Activity Method": TRADING.has("stopChartActivity"),
+    "Generate Chart Activity Trade": TRADING.has("generateChartActivityTrade"),
+    "Small Trade Logic": TRADING.has("0.005") | TRADING.has("0.02"),
+    "Periodic Trading": TRADING.has("setInterval") | TRADING.has("setTimeout"),
+    "Chart Activity State": TRADING.has("chartActivity") | TRADING.has("isChartActive")
+}
+
+CRAIYON_CHECKS = {
+    "Craiyon Integration": AI.has_i("craiyon"),
+    "No DALL-E 3 References": ~AI.has_i("dall-e") & ~AI.has_i("dalle"),
+    "No Fal.ai References": ~AI.has_i("fal.ai") & ~AI.has_i("fal-ai"),
+    "Placeholder Images": AI.has_i("placeholder"),
+    "No API Key Required": ~AI.has("API_KEY") | ~AI.has_i("key"),
+    "Free Service": AI.has_i("free") | ~(AI.has_i("subscription") | AI.has_i("paid"))
+}
+
+LEGACY_AI_PROVIDER_PRESENT = AI.has_i("dall-e") | AI.has_i("fal.ai")
+
+INITIALIZATION_CHECKS = {
+    "Tax Manager Import": BOT.has("require('./tax-manager')") | BOT.has("TaxManager"),
+    "Tax Manager Initialization": BOT.has("new TaxManager") | BOT.has("taxManager"),
+    "AI Integrations Import": BOT.has("require('./ai-integrations')"),
+    "Real Trading Manager Import": BOT.has("require('./real-trading-manager')"),
+    "All Command Handlers": BOT.has("/set_fees") & BOT.has("/mint_rugpull") & BOT.has("/exempt_wallet"),
+    "Bot State Management": BOT.has("botState"),
+    "Error Handling": BOT.has("try {") & BOT.has("catch")
+}
+
 class MemeBotCriticalTester:
     def __init__(self):
         self.telegram_bot_dir = project_root / "telegram-bot"
         self.bot_token = None
+        self.sources = SourceIndex.shared(self.telegram_bot_dir)
+        self.scanner = PatternScanner.shared(self.sources)
+        self.telegram = TelegramApi.shared()
+        self.symbols = JsSymbols.shared(self.sources)
         self.test_results = []
         self.load_config()
     
@@ -64,6 +152,7 @@ class MemeBotCriticalTester:
             for key, value in details.items():
                 print(f"   {key}: {value}")
     
+    @reads("bot.js", "tax-manager.js")
     def test_sol_tax_system_implementation(self):
         """Test 1: Verify SOL-based tax system implementation"""
         test_name = "SOL-Based Tax System"
@@ -75,29 +164,10 @@ class MemeBotCriticalTester:
                 self.log_test(test_name, "FAIL", "tax-manager.js file is missing - critical feature not implemented")
                 return False
             
-            # Check bot.js for tax system integration
-            bot_js_path = self.telegram_bot_dir / "bot.js"
-            with open(bot_js_path, 'r') as f:
-                bot_content = f.read()
-            
             # Check for SOL tax collection system in bot state
-            tax_system_checks = {
-                "SOL Tax Collection State": "solTaxCollection" in bot_content,
-                "Dynamic Fees State": "dynamicFees" in bot_content,
-                "Tax Manager Import": "require('./tax-manager')" in bot_content or "TaxManager" in bot_content,
-                "SOL Collection Logic": "collectInSOL" in bot_content,
-                "Tax Exemption System": "exemptWallets" in bot_content
-            }
+            tax_system_checks = self.scanner.evaluate(SOL_TAX_BOT_CHECKS)
             
-            with open(tax_manager_path, 'r') as f:
-                tax_content = f.read()
-            
-            tax_manager_checks = {
-                "Tax Manager Class": "class TaxManager" in tax_content,
-                "SOL Tax Calculation": "calculateSOLTax" in tax_content or "collectSOLTax" in tax_content,
-                "Tax Collection Tracking": "trackTaxCollection" in tax_content or "taxStats" in tax_content,
-                "Exemption Methods": "exemptWallet" in tax_content or "addExemption" in tax_content
-            }
+            tax_manager_checks = self.scanner.evaluate(SOL_TAX_MANAGER_CHECKS)
             
             failed_checks = []
             for check, passed in {**tax_system_checks, **tax_manager_checks}.items():
@@ -121,32 +191,17 @@ class MemeBotCriticalTester:
             self.log_test(test_name, "FAIL", f"Error analyzing SOL tax system: {str(e)}")
             return False
     
+    @reads("bot.js")
     def test_missing_commands_implementation(self):
         """Test 2: Verify missing commands (/set_fees, /mint_rugpull, /exempt_wallet)"""
         test_name = "Missing Commands Implementation"
         
         try:
-            bot_js_path = self.telegram_bot_dir / "bot.js"
-            with open(bot_js_path, 'r') as f:
-                bot_content = f.read()
-            
             # Check for the three critical missing commands
-            command_checks = {
-                "/set_fees Command": "/set_fees" in bot_content and "setFeesCommand" in bot_content,
-                "/mint_rugpull Command": "/mint_rugpull" in bot_content and ("mintRugpullCommand" in bot_content or "mint_rugpull" in bot_content),
-                "/exempt_wallet Command": "/exempt_wallet" in bot_content and "exemptWalletCommand" in bot_content,
-                "Set Fees Handler": "bot.onText(/\\/set_fees/" in bot_content,
-                "Mint Rugpull Handler": "bot.onText(/\\/mint_rugpull/" in bot_content,
-                "Exempt Wallet Handler": "bot.onText(/\\/exempt_wallet/" in bot_content
-            }
+            command_checks = self.scanner.evaluate(MISSING_COMMAND_CHECKS)
             
             # Check for interactive UI elements
-            ui_checks = {
-                "Set Fees UI": "callback_data: 'set_fees'" in bot_content,
-                "Tax Rate Configuration": "0-99%" in bot_content or "tax rate" in bot_content.lower(),
-                "Token Selection UI": "Select token" in bot_content or "choose token" in bot_content.lower(),
-                "Educational Messaging": "research" in bot_content.lower() and "simulation" in bot_content.lower()
-            }
+            ui_checks = self.scanner.evaluate(MISSING_COMMAND_UI_CHECKS)
             
             failed_checks = []
             for check, passed in {**command_checks, **ui_checks}.items():
@@ -173,23 +228,14 @@ class MemeBotCriticalTester:
             self.log_test(test_name, "FAIL", f"Error analyzing missing commands: {str(e)}")
             return False
     
+    @reads("token-manager.js")
     def test_updated_token_creation(self):
         """Test 3: Verify token creation gives Wallet 1 only 20% of supply"""
         test_name = "Updated Token Creation (20% Allocation)"
         
         try:
-            token_manager_path = self.telegram_bot_dir / "token-manager.js"
-            with open(token_manager_path, 'r') as f:
-                token_content = f.read()
-            
             # Check for 20% allocation logic
-            allocation_checks = {
-                "Wallet 1 Share Calculation": "wallet1Share" in token_content or "0.2" in token_content or "20%" in token_content,
-                "Supply Distribution Logic": "totalSupply *" in token_content and ("0.2" in token_content or "20" in token_content),
-                "Mint to Wallet 1": "mintTo" in token_content,
-                "Remaining Supply Handling": "remainingSupply" in token_content or "80%" in token_content,
-                "Not 100% to Wallet 1": not ("mintAmount = totalSupply * Math.pow(10, 9)" in token_content and "mintTo(" in token_content and "totalSupply" in token_content)
-            }
+            allocation_checks = self.scanner.evaluate(TOKEN_ALLOCATION_CHECKS)
             
             failed_checks = []
             for check, passed in allocation_checks.items():
@@ -202,7 +248,7 @@ class MemeBotCriticalTester:
             }
             
             # Special check: if we still see 100% allocation, it's a critical failure
-            if "mintAmount = totalSupply * Math.pow(10, 9)" in token_content:
+            if self.scanner.check(FULL_SUPPLY_TO_WALLET1):
                 self.log_test(test_name, "FAIL", "Token creation still gives 100% to Wallet 1 - not updated", details)
                 return False
             
@@ -220,28 +266,19 @@ class MemeBotCriticalTester:
             self.log_test(test_name, "FAIL", f"Error analyzing token creation: {str(e)}")
             return False
     
+    @reads("bot.js")
     def test_enhanced_status_command(self):
         """Test 4: Verify /status shows SOL tax collection stats"""
         test_name = "Enhanced Status Command"
         
         try:
-            bot_js_path = self.telegram_bot_dir / "bot.js"
-            with open(bot_js_path, 'r') as f:
-                bot_content = f.read()
-            
-            # Find the showStatus function
-            status_function_start = bot_content.find("async function showStatus(")
-            if status_function_start == -1:
-                status_function_start = bot_content.find("function showStatus(")
+            # Exact body of showStatus from the JS symbol table
+            status_function = self.symbols.body("bot.js", "showStatus")
             
-            if status_function_start == -1:
+            if status_function is None:
                 self.log_test(test_name, "FAIL", "showStatus function not found")
                 return False
             
-            # Extract the showStatus function (approximate)
-            status_function_end = bot_content.find("}", status_function_start + 500)  # Look for closing brace
-            status_function = bot_content[status_function_start:status_function_end + 1]
-            
             # Check for SOL tax stats in status display
             status_checks = {
                 "SOL Tax Collection Display": "SOL" in status_function and ("tax" in status_function.lower() or "collected" in status_function.lower()),
@@ -259,7 +296,7 @@ class MemeBotCriticalTester:
             details = {
                 "Status Function Checks": list(status_checks.keys()),
                 "Failed Checks": failed_checks,
-                "Function Found": status_function_start != -1
+                "Function Found": status_function is not None
             }
             
             if len(failed_checks) > 2:
@@ -276,24 +313,14 @@ class MemeBotCriticalTester:
             self.log_test(test_name, "FAIL", f"Error analyzing status command: {str(e)}")
             return False
     
+    @reads("real-trading-manager.js")
     def test_chart_activity_simulation(self):
         """Test 5: Verify chart activity simulation methods in real-trading-manager.js"""
         test_name = "Chart Activity Simulation"
         
         try:
-            real_trading_path = self.telegram_bot_dir / "real-trading-manager.js"
-            with open(real_trading_path, 'r') as f:
-                trading_content = f.read()
-            
             # Check for chart activity methods
-            chart_activity_checks = {
-                "Start Chart Activity Method": "startChartActivity" in trading_content,
-                "Stop Chart Activity Method": "stopChartActivity" in trading_content,
-                "Generate Chart Activity Trade": "generateChartActivityTrade" in trading_content,
-                "Small Trade Logic": "0.005" in trading_content or "0.02" in trading_content,
-                "Periodic Trading": "setInterval" in trading_content or "setTimeout" in trading_content,
-                "Chart Activity State": "chartActivity" in trading_content or "isChartActive" in trading_content
-            }
+            chart_activity_checks = self.scanner.evaluate(CHART_ACTIVITY_CHECKS)
             
             failed_checks = []
             for check, passed in chart_activity_checks.items():
@@ -319,24 +346,14 @@ class MemeBotCriticalTester:
             self.log_test(test_name, "FAIL", f"Error analyzing chart activity: {str(e)}")
             return False
     
+    @reads("ai-integrations.js")
     def test_craiyon_integration(self):
         """Test 6: Verify Craiyon integration and removal of DALL-E 3/Fal.ai"""
         test_name = "Craiyon Integration"
         
         try:
-            ai_integrations_path = self.telegram_bot_dir / "ai-integrations.js"
-            with open(ai_integrations_path, 'r') as f:
-                ai_content = f.read()
-            
             # Check for Craiyon integration
-            craiyon_checks = {
-                "Craiyon Integration": "craiyon" in ai_content.lower(),
-                "No DALL-E 3 References": "dall-e" not in ai_content.lower() and "dalle" not in ai_content.lower(),
-                "No Fal.ai References": "fal.ai" not in ai_content.lower() and "fal-ai" not in ai_content.lower(),
-                "Placeholder Images": "placeholder" in ai_content.lower(),
-                "No API Key Required": "API_KEY" not in ai_content or "key" not in ai_content.lower(),
-                "Free Service": "free" in ai_content.lower() or not ("subscription" in ai_content.lower() or "paid" in ai_content.lower())
-            }
+            craiyon_checks = self.scanner.evaluate(CRAIYON_CHECKS)
             
             failed_checks = []
             for check, passed in craiyon_checks.items():
@@ -349,7 +366,7 @@ class MemeBotCriticalTester:
             }
             
             # Critical failure if DALL-E or Fal.ai still present
-            if "dall-e" in ai_content.lower() or "fal.ai" in ai_content.lower():
+            if self.scanner.check(LEGACY_AI_PROVIDER_PRESENT):
                 self.log_test(test_name, "FAIL", "DALL-E 3 or Fal.ai references still present - not completely removed", details)
                 return False
             
@@ -367,25 +384,22 @@ class MemeBotCriticalTester:
             self.log_test(test_name, "FAIL", f"Error analyzing Craiyon integration: {str(e)}")
             return False
     
+    @reads(
+        "bot.js",
+        "wallet-manager.js",
+        "token-manager.js",
+        "ai-integrations.js",
+        "real-trading-manager.js",
+        "raydium-manager.js",
+        "metadata-manager.js",
+    )
     def test_bot_initialization_with_new_modules(self):
         """Test 7: Verify bot initializes without crashes with all new modules"""
         test_name = "Bot Initialization with New Modules"
         
         try:
-            bot_js_path = self.telegram_bot_dir / "bot.js"
-            with open(bot_js_path, 'r') as f:
-                bot_content = f.read()
-            
             # Check for all required imports and initializations
-            initialization_checks = {
-                "Tax Manager Import": "require('./tax-manager')" in bot_content or "TaxManager" in bot_content,
-                "Tax Manager Initialization": "new TaxManager" in bot_content or "taxManager" in bot_content,
-                "AI Integrations Import": "require('./ai-integrations')" in bot_content,
-                "Real Trading Manager Import": "require('./real-trading-manager')" in bot_content,
-                "All Command Handlers": "/set_fees" in bot_content and "/mint_rugpull" in bot_content and "/exempt_wallet" in bot_content,
-                "Bot State Management": "botState" in bot_content,
-                "Error Handling": "try {" in bot_content and "catch" in bot_content
-            }
+            initialization_checks = self.scanner.evaluate(INITIALIZATION_CHECKS)
             
             # Check if all required files exist
             required_files = [
@@ -429,6 +443,7 @@ class MemeBotCriticalTester:
             self.log_test(test_name, "FAIL", f"Error analyzing bot initialization: {str(e)}")
             return False
     
+    @io_bound
     def test_telegram_bot_connectivity(self):
         """Test 8: Test Telegram Bot API connectivity"""
         test_name = "Telegram Bot API Connectivity"
@@ -438,9 +453,8 @@ class MemeBotCriticalTester:
             return True
         
         try:
-            # Test bot token validity
-            url = f"https://api.telegram.org/bot{self.bot_token}/getMe"
-            response = requests.get(url, timeout=10)
+            # Test bot token validity (TELEGRAM_API_BASE_URL selects the endpoint)
+            response = self.telegram.get_me(self.bot_token)
             
             if response.status_code == 200:
                 bot_info = response.json()
@@ -460,7 +474,7 @@ class MemeBotCriticalTester:
                 self.log_test(test_name, "FAIL", f"HTTP {response.status_code}: {response.text}")
                 return False
                 
-        except requests.exceptions.RequestException as e:
+        except NetworkError as e:
             self.log_test(test_name, "FAIL", f"Network error: {str(e)}")
             return False
         except Exception as e:
@@ -487,16 +501,16 @@ class MemeBotCriticalTester:
         failed = 0
         warnings = 0
         
+        report = ResultStream.from_env("backend_test")
         for test in tests:
-            try:
-                result = test()
-                if result:
-                    passed += 1
-                else:
-                    failed += 1
-            except Exception as e:
-                self.log_test(test.__name__, "FAIL", f"Test execution error: {str(e)}")
+            first = len(self.test_results)
+            ok, wall_time, cpu_time = run_timed(test, self.log_test)
+            if ok:
+                passed += 1
+            else:
                 failed += 1
+            report.test("backend_test", test.__name__, ok, self.test_results[first:], wall_time, cpu_time)
+        report.close()
         
         # Count warnings
         warnings = sum(1 for result in self.test_results if result['status'] == 'WARN')
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Encoding Benchmark for GET /api/status payloads
+Compares payload size and encode CPU time for JSON vs MessagePack, with and
+without gzip/zstd compression, over a list of StatusCheck rows.
+
+Each run's CPU times are stored in the harness results history
+(harness/history.py) for regression tracking.
+
+Usage: python benchmarks/bench_encoding.py [--rows 1000] [--repeat 20]
+"""
+
+import argparse
+import json
+import sys
+import time
+import zlib
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+sys.path.append(str(project_root / "backend"))
+
+from harness.history import record_benchmark  # noqa: E402
+from encoding import _GzipStream, _ZstdStream, _msgpack_default, msgpack, zstandard  # noqa: E402
+from server import StatusCheck  # noqa: E402
+
+
+def make_rows(count):
+    return [StatusCheck(client_name=f"agent-{i % 50:03d}") for i in range(count)]
+
+
+def encode_json(rows):
+    return json.dumps([row.model_dump(mode="json") for row in rows]).encode()
+
+
+def encode_msgpack(rows):
+    return msgpack.packb([row.model_dump() for row in rows], default=_msgpack_default, use_bin_type=True)
+
+
+def compress_with(stream_cls, level, chunk_size=4096):
+    """Compress in chunks the way CompressionMiddleware does for streamed bodies."""
+    def compress(data):
+        stream = stream_cls(level)
+        chunks = [data[i:i + chunk_size] for i in range(0, len(data), chunk_size)] or [b""]
+        return b"".join(stream.compress(chunk, final=i == len(chunks) - 1) for i, chunk in enumerate(chunks))
+    return compress
+
+
+def measure(encode, rows, repeat):
+    cpu_start = time.process_time()
+    for _ in range(repeat):
+        payload = encode(rows)
+    cpu_ms = (time.process_time() - cpu_start) * 1000 / repeat
+    return len(payload), cpu_ms
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    rows = make_rows(args.rows)
+    variants = [("json", encode_json)]
+    compressors = [("gzip-1", compress_with(_GzipStream, 1)), ("gzip-6", compress_with(_GzipStream, 6))]
+    if zstandard is not None:
+        compressors += [("zstd-3", compress_with(_ZstdStream, 3)), ("zstd-9", compress_with(_ZstdStream, 9))]
+    else:
+        print("⚠️ zstandard not installed, skipping zstd variants")
+    if msgpack is not None:
+        variants.append(("msgpack", encode_msgpack))
+    else:
+        print("⚠️ msgpack not installed, skipping MessagePack variants")
+
+    print(f"📊 Encoding {args.rows} StatusCheck rows, {args.repeat} repetitions")
+    print("=" * 70)
+    print(f"{'format':<22}{'bytes':>12}{'bytes/row':>12}{'ratio':>10}{'cpu ms':>12}")
+    baseline = None
+    metrics = {}
+    for name, encode in variants:
+        for suffix, compress in [("", None)] + compressors:
+            label = f"{name}+{suffix}" if suffix else name
+            func = encode if compress is None else (lambda r, e=encode, c=compress: c(e(r)))
+            size, cpu_ms = measure(func, rows, args.repeat)
+            baseline = baseline or size
+            metrics[label] = cpu_ms / 1000
+            print(f"{label:<22}{size:>12}{size / args.rows:>12.1f}{baseline / size:>9.2f}x{cpu_ms:>12.2f}")
+
+    # Sanity check: the chunked gzip stream is a valid single gzip member.
+    payload = encode_json(rows)
+    assert zlib.decompress(compress_with(_GzipStream, 6)(payload), 16 + zlib.MAX_WBITS) == payload
+
+    record_benchmark(f"bench_encoding[rows={args.rows}]", metrics)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Source Check Benchmark for the harness suites
+Evaluates every declared source check from backend_test, comprehensive_meme_bot_test
+and launch_token_test against a bot.js padded to --size bytes, once the old way
+(a substring scan per check, re-lowering the text for case-insensitive ones)
+and once through PatternScanner (one Aho-Corasick pass per file).
+
+Timings are stored in the harness results history (harness/history.py).
+
+Usage: python benchmarks/bench_patterns.py [--size 1000000] [--repeat 3]
+"""
+
+import argparse
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+import backend_test  # noqa: E402
+import comprehensive_meme_bot_test  # noqa: E402
+import launch_token_test  # noqa: E402
+from harness.history import record_benchmark  # noqa: E402
+from harness.patterns import ahocorasick, All, Any, Contains, Expr, Not, PatternScanner  # noqa: E402
+from harness.source_index import SourceIndex  # noqa: E402
+
+SUITES = [backend_test, comprehensive_meme_bot_test, launch_token_test]
+
+
+def declared_checks():
+    """Every check dict and standalone expression the suites declare, flattened"""
+    checks = {}
+    for module in SUITES:
+        for name, value in vars(module).items():
+            if isinstance(value, Expr):
+                checks[f"{module.__name__}.{name}"] = value
+            elif isinstance(value, dict) and value and all(isinstance(v, Expr) for v in value.values()):
+                for check, expr in value.items():
+                    checks[f"{module.__name__}.{name}[{check}]"] = expr
+    return checks
+
+
+def legacy_evaluate(expr, texts):
+    """What the suites did before: one substring scan per term"""
+    if isinstance(expr, Contains):
+        text = texts[expr.file]
+        if expr.ignore_case:
+            text = text.lower()
+        if expr.at_least == 1:
+            return expr.needle in text
+        return text.count(expr.needle) >= expr.at_least
+    if isinstance(expr, All):
+        return all(legacy_evaluate(term, texts) for term in expr.terms)
+    if isinstance(expr, Any):
+        return any(legacy_evaluate(term, texts) for term in expr.terms)
+    if isinstance(expr, Not):
+        return not legacy_evaluate(expr.term, texts)
+    raise TypeError(expr)
+
+
+def make_tree(target, size):
+    """Copy telegram-bot/*.js into ``target``, padding bot.js to ``size`` bytes"""
+    source_dir = project_root / "telegram-bot"
+    for path in source_dir.glob("*.js"):
+        shutil.copy(path, target / path.name)
+    bot = (source_dir / "bot.js").read_text()
+    repeats = max(1, -(-size // len(bot.encode())))
+    (target / "bot.js").write_text("\n".join([bot] * repeats))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--size", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    checks = declared_checks()
+    terms = sum(1 for expr in checks.values() for _ in expr.patterns())
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        make_tree(root, args.size)
+        files = {pattern.file for expr in checks.values() for pattern in expr.patterns()}
+        texts = {name: SourceIndex(root).read(name) for name in files}
+
+        print(f"📊 {len(checks)} checks ({terms} substring terms) over {len(files)} files, "
+              f"bot.js = {len(texts['bot.js'].encode()):,} bytes, {args.repeat} repetitions")
+        print("=" * 70)
+
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            expected = {name: legacy_evaluate(expr, texts) for name, expr in checks.items()}
+        legacy_ms = (time.perf_counter() - start) * 1000 / args.repeat
+
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            # Fresh index and scanner each time: includes reading, lowering and the scan
+            scanner = PatternScanner(SourceIndex(root))
+            results = scanner.evaluate(checks)
+        scanner_ms = (time.perf_counter() - start) * 1000 / args.repeat
+
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            scanner.evaluate(checks)
+        warm_ms = (time.perf_counter() - start) * 1000 / args.repeat
+
+    engine = "pyahocorasick" if ahocorasick is not None else "substring fallback (pyahocorasick not installed)"
+    print(f"   engine: {engine}")
+    print(f"{'strategy':<34}{'ms':>12}{'speedup':>12}")
+    print(f"{'per-check substring scans':<34}{legacy_ms:>12.1f}{1:>11.2f}x")
+    print(f"{'PatternScanner (cold)':<34}{scanner_ms:>12.1f}{legacy_ms / scanner_ms:>11.2f}x")
+    print(f"{'PatternScanner (warm tables)':<34}{warm_ms:>12.2f}{legacy_ms / warm_ms:>11.0f}x")
+    print(f"   scans per cold run: {scanner.scans}")
+
+    assert results == expected, "PatternScanner disagrees with the substring checks"
+    # Term by term too: an OR can hide a wrong term from the check results
+    contains = {(p.file, p.key, p.at_least): p for expr in checks.values() for p in expr.patterns()}
+    wrong = [key for key, pattern in contains.items() if scanner.check(pattern) != legacy_evaluate(pattern, texts)]
+    assert not wrong, f"PatternScanner disagrees with the substring checks on {wrong}"
+
+    record_benchmark(f"bench_patterns[size={args.size}]", {
+        "per-check substring scans": legacy_ms / 1000,
+        "PatternScanner (cold)": scanner_ms / 1000,
+        "PatternScanner (warm tables)": warm_ms / 1000,
+    })
+
+
+if __name__ == "__main__":
+    main()
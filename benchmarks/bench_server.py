@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+Server Settings Benchmark for the status endpoints
+Starts the API twice on local ports - once as a bare ``uvicorn server:app``
+(default settings) and once through backend/serve.py (tuned settings) - and
+drives each with the same keep-alive HTTP/1.1 load: a fixed number of
+concurrent connections per endpoint for a fixed time. Reports throughput
+and p50/p99 latency per endpoint.
+
+The database-backed endpoints (GET /api/status, /api/status/count, POST
+/api/status) are only measured when MongoDB is reachable; otherwise the
+in-memory ones (/api/, /api/status/sketch) still compare the two servers.
+Uses the ``bench_server`` database.
+
+Usage: python benchmarks/bench_server.py [--connections 32] [--seconds 5] [--workers N] [--mongo-url URL]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from harness.history import record_benchmark  # noqa: E402
+
+BACKEND_DIR = project_root / "backend"
+MEMORY_ENDPOINTS = [("GET", "/api/", None), ("GET", "/api/status/sketch", None)]
+DATABASE_ENDPOINTS = [
+    ("GET", "/api/status?limit=100", None),
+    ("GET", "/api/status/count", None),
+    ("POST", "/api/status", {"client_name": "bench-agent"}),
+]
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def mongo_reachable(url):
+    from pymongo import MongoClient
+    from pymongo.errors import PyMongoError
+
+    client = MongoClient(url, serverSelectionTimeoutMS=2000)
+    try:
+        client.admin.command("ping")
+        return True
+    except PyMongoError:
+        return False
+    finally:
+        client.close()
+
+
+def server_commands(port, workers):
+    return {
+        "default": [sys.executable, "-m", "uvicorn", "server:app", "--port", str(port)],
+        "tuned": [sys.executable, "serve.py", "--host", "127.0.0.1", "--port", str(port), "--workers", str(workers)],
+    }
+
+
+def encode_request(method, path, body):
+    payload = b"" if body is None else json.dumps(body).encode()
+    head = f"{method} {path} HTTP/1.1\r\nHost: 127.0.0.1\r\nContent-Length: {len(payload)}\r\n"
+    if payload:
+        head += "Content-Type: application/json\r\n"
+    return (head + "\r\n").encode() + payload
+
+
+async def read_response(reader):
+    head = await reader.readuntil(b"\r\n\r\n")
+    status = int(head.split(b" ", 2)[1])
+    length = 0
+    for line in head.split(b"\r\n")[1:]:
+        name, _, value = line.partition(b":")
+        if name.strip().lower() == b"content-length":
+            length = int(value)
+    await reader.readexactly(length)
+    return status
+
+
+async def wait_until_ready(port, timeout=30.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            writer.write(encode_request("GET", "/api/", None))
+            status = await read_response(reader)
+            writer.close()
+            if status == 200:
+                return
+        except OSError:
+            pass
+        await asyncio.sleep(0.2)
+    raise RuntimeError(f"Server on port {port} did not become ready")
+
+
+async def drive(port, request, connections, seconds):
+    """Latencies (seconds) of every request completed by ``connections`` keep-alive clients in ``seconds``."""
+    latencies = []
+    errors = 0
+    deadline = time.perf_counter() + seconds
+
+    async def client():
+        nonlocal errors
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        try:
+            while time.perf_counter() < deadline:
+                start = time.perf_counter()
+                writer.write(request)
+                status = await read_response(reader)
+                latencies.append(time.perf_counter() - start)
+                if status >= 400:
+                    errors += 1
+        finally:
+            writer.close()
+
+    await asyncio.gather(*(client() for _ in range(connections)))
+    return latencies, errors
+
+
+def measure(command, port, endpoints, args, env):
+    process = subprocess.Popen(command, cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    results = {}
+    try:
+        asyncio.run(wait_until_ready(port))
+        for method, path, body in endpoints:
+            request = encode_request(method, path, body)
+            latencies, errors = asyncio.run(drive(port, request, args.connections, args.seconds))
+            latencies.sort()
+            results[f"{method} {path}"] = {
+                "rps": len(latencies) / args.seconds,
+                "p50": statistics.median(latencies),
+                "p99": latencies[int(len(latencies) * 0.99) - 1],
+                "errors": errors,
+            }
+    finally:
+        process.terminate()
+        process.wait(timeout=30)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--connections", type=int, default=32)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--workers", type=int, default=None, help="Tuned server workers (default: serve.py's)")
+    parser.add_argument("--mongo-url", default=os.environ.get("MONGO_URL", "mongodb://localhost:27017"))
+    args = parser.parse_args()
+
+    sys.path.append(str(BACKEND_DIR))
+    from serve import default_workers
+
+    workers = args.workers or default_workers()
+    endpoints = list(MEMORY_ENDPOINTS)
+    if mongo_reachable(args.mongo_url):
+        endpoints += DATABASE_ENDPOINTS
+    else:
+        print(f"⚠️ MongoDB not reachable at {args.mongo_url}; measuring the in-memory endpoints only")
+    env = dict(os.environ, MONGO_URL=args.mongo_url, DB_NAME="bench_server")
+
+    print(f"📊 {args.connections} keep-alive connections x {args.seconds:g}s per endpoint; tuned: {workers} worker(s)")
+    print("=" * 86)
+    print(f"{'server':<9}{'endpoint':<30}{'req/s':>12}{'p50 ms':>11}{'p99 ms':>11}{'errors':>9}")
+    metrics = {}
+    port = free_port()
+    for name, command in server_commands(port, workers).items():
+        for endpoint, result in measure(command, port, endpoints, args, env).items():
+            print(f"{name:<9}{endpoint:<30}{result['rps']:>12,.0f}{result['p50'] * 1000:>11.2f}"
+                  f"{result['p99'] * 1000:>11.2f}{result['errors']:>9}")
+            metrics[f"{name} {endpoint} p50"] = result["p50"]
+            metrics[f"{name} {endpoint} p99"] = result["p99"]
+
+    record_benchmark(f"bench_server[connections={args.connections},workers={workers}]", metrics)
+
+
+if __name__ == "__main__":
+    main()
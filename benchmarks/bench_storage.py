@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Storage Benchmark for status_checks documents
+Compares the legacy and compact stored schemas (backend/storage.py): BSON
+bytes per document, and - against a live MongoDB - on-disk collection and
+index size plus insert and scan throughput. Scans include decoding and
+validating every row into StatusCheck, as GET /api/status does.
+
+Without a reachable server only the BSON sizes are reported. Uses (and
+drops) collections in the ``bench_storage`` database.
+
+Usage: python benchmarks/bench_storage.py [--docs 20000] [--clients 50] [--mongo-url URL]
+"""
+
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+sys.path.append(str(project_root / "backend"))
+
+import bson  # noqa: E402
+from pymongo import MongoClient  # noqa: E402
+from pymongo.errors import PyMongoError  # noqa: E402
+
+from harness.history import record_benchmark  # noqa: E402
+from server import StatusCheck, status_check_list  # noqa: E402
+from storage import CompactCodec, LegacyCodec, index_specs  # noqa: E402
+
+CODECS = [LegacyCodec(), CompactCodec("zstd")]
+
+
+def make_rows(count, clients):
+    return [StatusCheck(client_name=f"agent-{i % clients:03d}") for i in range(count)]
+
+
+def stored_documents(codec, rows):
+    documents = [codec.encode(row) for row in rows]
+    if codec.name == "legacy":
+        for document in documents:
+            document["_id"] = bson.ObjectId()  # what insert_one adds
+    return documents
+
+
+def bson_bytes(codec, rows):
+    documents = stored_documents(codec, rows)
+    return sum(len(bson.encode(document)) for document in documents) / len(documents)
+
+
+def measure_server(client, codec, rows, batch):
+    database = client["bench_storage"]
+    name = f"status_checks_{codec.name}"
+    database.drop_collection(name)
+    database.create_collection(name, **codec.collection_options())
+    collection = database[name]
+    for keys in index_specs(codec):
+        collection.create_index(keys)
+
+    documents = stored_documents(codec, rows)
+    start = time.perf_counter()
+    for i in range(0, len(documents), batch):
+        collection.insert_many(documents[i:i + batch], ordered=False)
+    insert_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    scanned = status_check_list.validate_python(codec.decode_many(list(collection.find())))
+    scan_seconds = time.perf_counter() - start
+    assert len(scanned) == len(rows)
+
+    stats = database.command("collStats", name)
+    database.drop_collection(name)
+    return {
+        "avg_obj": stats["avgObjSize"],
+        "storage": stats["storageSize"],
+        "indexes": stats["totalIndexSize"],
+        "insert_seconds": insert_seconds,
+        "scan_seconds": scan_seconds,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--docs", type=int, default=20000)
+    parser.add_argument("--clients", type=int, default=50)
+    parser.add_argument("--batch", type=int, default=1000)
+    parser.add_argument("--mongo-url", default=os.environ.get("MONGO_URL", "mongodb://localhost:27017"))
+    args = parser.parse_args()
+
+    rows = make_rows(args.docs, args.clients)
+    print(f"📊 {args.docs} StatusCheck rows across {args.clients} client names")
+    print("=" * 70)
+    print(f"{'schema':<10}{'BSON bytes/doc':>16}")
+    for codec in CODECS:
+        print(f"{codec.name:<10}{bson_bytes(codec, rows):>16.1f}")
+
+    client = MongoClient(args.mongo_url, serverSelectionTimeoutMS=2000)
+    try:
+        client.admin.command("ping")
+    except PyMongoError as e:
+        print(f"\n⚠️ MongoDB not reachable at {args.mongo_url} ({type(e).__name__}); skipping server measurements")
+        return
+
+    print(f"\n{'schema':<10}{'avg obj':>10}{'disk/doc':>10}{'index/doc':>11}{'insert/s':>12}{'scan/s':>12}")
+    metrics = {}
+    try:
+        for codec in CODECS:
+            result = measure_server(client, codec, rows, args.batch)
+            print(f"{codec.name:<10}{result['avg_obj']:>10.1f}{result['storage'] / args.docs:>10.1f}"
+                  f"{result['indexes'] / args.docs:>11.1f}{args.docs / result['insert_seconds']:>12,.0f}"
+                  f"{args.docs / result['scan_seconds']:>12,.0f}")
+            metrics[f"{codec.name} insert"] = result["insert_seconds"]
+            metrics[f"{codec.name} scan"] = result["scan_seconds"]
+    finally:
+        client.close()
+
+    record_benchmark(f"bench_storage[docs={args.docs}]", metrics)
+
+
+if __name__ == "__main__":
+    main()
@@ -23,9 +23,95 @@ from pathlib import Path
 project_root = Path(__file__).parent
 sys.path.append(str(project_root))
 
+from harness.patterns import PatternScanner, source
+from harness.reporting import ResultStream, run_timed
+from harness.source_index import SourceIndex
+from harness.tags import reads
+
+# Source checks, compiled into one scan per file (see harness/patterns.py)
+BOT = source("bot.js")
+TAX = source("tax-manager.js")
+TOKEN = source("token-manager.js")
+TRADING = source("real-trading-manager.js")
+AI = source("ai-integrations.js")
+RAYDIUM = source("raydium-manager.js")
+
+AUTO_BRAND_CHECKS = {
+    "Auto Brand Command Handler": BOT.has("/auto_brand"),
+    "Craiyon Integration": AI.has_i("craiyon"),
+    "No DALL-E References": ~AI.has_i("dall-e") & ~AI.has_i("dalle"),
+    "No Fal.ai References": ~AI.has_i("fal.ai"),
+    "AI Branding Function": AI.has("generateBranding") | AI.has("autoBrand"),
+    "Command Callback": BOT.has("auto_brand")
+}
+
+SET_FEES_CHECKS = {
+    "Set Fees Command Handler": BOT.has("/set_fees"),
+    "Tax Rate Configuration": BOT.has("0-99%") | (BOT.has("0%") & BOT.has("99%")),
+    "SOL-based Tax System": BOT.has("SOL") & BOT.has_i("tax"),
+    "Interactive UI": BOT.has("callback_data: 'set_fees'"),
+    "Tax Manager Integration": BOT.has("taxManager"),
+    "Buy/Sell Tax Options": BOT.has("buyTax") & BOT.has("sellTax")
+}
+
+CHART_ACTIVITY_CHECKS = {
+    "Chart Activity Command": BOT.has("/chart_activity"),
+    "Start Chart Activity": TRADING.has("startChartActivity"),
+    "Stop Chart Activity": TRADING.has("stopChartActivity"),
+    "Small Trade Logic": TRADING.has("0.005") & TRADING.has("0.02"),
+    "Periodic Trading": TRADING.has("setInterval") | TRADING.has("setTimeout"),
+    "Command Handler": BOT.has("chart_activity")
+}
+
+EXEMPT_WALLET_CHECKS = {
+    "Exempt Wallet Command": BOT.has("/exempt_wallet"),
+    "Tax Exemption Logic": TAX.has("exemptWallet") | TAX.has("addExemption"),
+    "Exempt Wallets State": BOT.has("exemptWallets"),
+    "Command Handler": BOT.has("exempt_wallet"),
+    "Tax Manager Integration": BOT.has("taxManager")
+}
+
+MINT_RUGPULL_CHECKS = {
+    "Mint Rugpull Command": BOT.has("/mint_rugpull"),
+    "Educational Messaging": BOT.has_i("research") & BOT.has_i("simulation"),
+    "Devnet Research Label": BOT.has_i("devnet"),
+    "Command Handler": BOT.has("mint_rugpull"),
+    "Interactive UI": BOT.has("callback_data: 'mint_rugpull'"),
+    "Educational Warning": BOT.has_i("educational") | BOT.has_i("research")
+}
+
+LIQUIDITY_LOCK_CHECKS = {
+    "Liquidity Lock Command": BOT.has("/liquidity_lock"),
+    "1-Month Duration": RAYDIUM.has("30") | RAYDIUM.has_i("1 month"),
+    "Lock Liquidity Method": RAYDIUM.has("lockLiquidity"),
+    "Command Handler": BOT.has("liquidity_lock") | BOT.has("lock_liquidity"),
+    "Lock Verification": RAYDIUM.has("getLiquidityLock")
+}
+
+WALLET1_ALLOCATION_CHECKS = {
+    "20% Allocation Logic": TOKEN.has("0.2") | TOKEN.has("20%"),
+    "Wallet 1 Share": TOKEN.has("wallet1Share"),
+    "Not 100% to Wallet 1": ~TOKEN.has("mintAmount = totalSupply * Math.pow(10, 9)"),
+    "Supply Distribution": TOKEN.has("totalSupply *"),
+    "Mint to Wallet 1": TOKEN.has("mintTo")
+}
+
+FULL_SUPPLY_TO_WALLET1 = TOKEN.has("mintAmount = totalSupply * Math.pow(10, 9)")
+
+SOL_TAX_CHECKS = {
+    "Tax Manager Class": TAX.has("class TaxManager"),
+    "SOL Collection State": BOT.has("solTaxCollection"),
+    "Collect in SOL Flag": BOT.has("collectInSOL"),
+    "SOL Tax Calculation": TAX.has("calculateTaxAmount") | TAX.has("calculateSOLTax"),
+    "Tax Stats Tracking": TAX.has("taxStats") | TAX.has("recordTaxCollection"),
+    "Status Shows SOL Tax": BOT.has("SOL Collected") & BOT.has("Tax Recipient: Wallet 1")
+}
+
 class ComprehensiveMemeBotTester:
     def __init__(self):
         self.telegram_bot_dir = project_root / "telegram-bot"
+        self.sources = SourceIndex.shared(self.telegram_bot_dir)
+        self.scanner = PatternScanner.shared(self.sources)
         self.test_results = []
         
     def log_test(self, test_name, status, message="", details=None):
@@ -45,27 +131,13 @@ class ComprehensiveMemeBotTester:
             for key, value in details.items():
                 print(f"   {key}: {value}")
     
+    @reads("bot.js", "ai-integrations.js")
     def test_auto_brand_command(self):
         """Test /auto_brand command with Craiyon integration"""
         test_name = "/auto_brand Command"
         
         try:
-            bot_js_path = self.telegram_bot_dir / "bot.js"
-            with open(bot_js_path, 'r') as f:
-                bot_content = f.read()
-            
-            ai_integrations_path = self.telegram_bot_dir / "ai-integrations.js"
-            with open(ai_integrations_path, 'r') as f:
-                ai_content = f.read()
-            
-            checks = {
-                "Auto Brand Command Handler": "/auto_brand" in bot_content,
-                "Craiyon Integration": "craiyon" in ai_content.lower(),
-                "No DALL-E References": "dall-e" not in ai_content.lower() and "dalle" not in ai_content.lower(),
-                "No Fal.ai References": "fal.ai" not in ai_content.lower(),
-                "AI Branding Function": "generateBranding" in ai_content or "autoBrand" in ai_content,
-                "Command Callback": "auto_brand" in bot_content
-            }
+            checks = self.scanner.evaluate(AUTO_BRAND_CHECKS)
             
             failed_checks = [check for check, passed in checks.items() if not passed]
             
@@ -83,23 +155,13 @@ class ComprehensiveMemeBotTester:
             self.log_test(test_name, "FAIL", f"Error: {str(e)}")
             return False
     
+    @reads("bot.js")
     def test_set_fees_command(self):
         """Test /set_fees command with 0-99% tax configuration"""
         test_name = "/set_fees Command"
         
         try:
-            bot_js_path = self.telegram_bot_dir / "bot.js"
-            with open(bot_js_path, 'r') as f:
-                bot_content = f.read()
-            
-            checks = {
-                "Set Fees Command Handler": "/set_fees" in bot_content,
-                "Tax Rate Configuration": "0-99%" in bot_content or ("0%" in bot_content and "99%" in bot_content),
-                "SOL-based Tax System": "SOL" in bot_content and "tax" in bot_content.lower(),
-                "Interactive UI": "callback_data: 'set_fees'" in bot_content,
-                "Tax Manager Integration": "taxManager" in bot_content,
-                "Buy/Sell Tax Options": "buyTax" in bot_content and "sellTax" in bot_content
-            }
+            checks = self.scanner.evaluate(SET_FEES_CHECKS)
             
             failed_checks = [check for check, passed in checks.items() if not passed]
             
@@ -117,27 +179,13 @@ class ComprehensiveMemeBotTester:
             self.log_test(test_name, "FAIL", f"Error: {str(e)}")
             return False
     
+    @reads("bot.js", "real-trading-manager.js")
     def test_chart_activity_command(self):
         """Test /chart_activity command with small trades simulation"""
         test_name = "/chart_activity Command"
         
         try:
-            bot_js_path = self.telegram_bot_dir / "bot.js"
-            with open(bot_js_path, 'r') as f:
-                bot_content = f.read()
-            
-            real_trading_path = self.telegram_bot_dir / "real-trading-manager.js"
-            with open(real_trading_path, 'r') as f:
-                trading_content = f.read()
-            
-            checks = {
-                "Chart Activity Command": "/chart_activity" in bot_content,
-                "Start Chart Activity": "startChartActivity" in trading_content,
-                "Stop Chart Activity": "stopChartActivity" in trading_content,
-                "Small Trade Logic": "0.005" in trading_content and "0.02" in trading_content,
-                "Periodic Trading": "setInterval" in trading_content or "setTimeout" in trading_content,
-                "Command Handler": "chart_activity" in bot_content
-            }
+            checks = self.scanner.evaluate(CHART_ACTIVITY_CHECKS)
             
             failed_checks = [check for check, passed in checks.items() if not passed]
             
@@ -155,26 +203,13 @@ class ComprehensiveMemeBotTester:
             self.log_test(test_name, "FAIL", f"Error: {str(e)}")
             return False
     
+    @reads("bot.js", "tax-manager.js")
     def test_exempt_wallet_command(self):
         """Test /exempt_wallet command for tax exemption"""
         test_name = "/exempt_wallet Command"
         
         try:
-            bot_js_path = self.telegram_bot_dir / "bot.js"
-            with open(bot_js_path, 'r') as f:
-                bot_content = f.read()
-            
-            tax_manager_path = self.telegram_bot_dir / "tax-manager.js"
-            with open(tax_manager_path, 'r') as f:
-                tax_content = f.read()
-            
-            checks = {
-                "Exempt Wallet Command": "/exempt_wallet" in bot_content,
-                "Tax Exemption Logic": "exemptWallet" in tax_content or "addExemption" in tax_content,
-                "Exempt Wallets State": "exemptWallets" in bot_content,
-                "Command Handler": "exempt_wallet" in bot_content,
-                "Tax Manager Integration": "taxManager" in bot_content
-            }
+            checks = self.scanner.evaluate(EXEMPT_WALLET_CHECKS)
             
             failed_checks = [check for check, passed in checks.items() if not passed]
             
@@ -192,23 +227,13 @@ class ComprehensiveMemeBotTester:
             self.log_test(test_name, "FAIL", f"Error: {str(e)}")
             return False
     
+    @reads("bot.js")
     def test_mint_rugpull_command(self):
         """Test /mint_rugpull educational simulation command"""
         test_name = "/mint_rugpull Command"
         
         try:
-            bot_js_path = self.telegram_bot_dir / "bot.js"
-            with open(bot_js_path, 'r') as f:
-                bot_content = f.read()
-            
-            checks = {
-                "Mint Rugpull Command": "/mint_rugpull" in bot_content,
-                "Educational Messaging": "research" in bot_content.lower() and "simulation" in bot_content.lower(),
-                "Devnet Research Label": "devnet" in bot_content.lower(),
-                "Command Handler": "mint_rugpull" in bot_content,
-                "Interactive UI": "callback_data: 'mint_rugpull'" in bot_content,
-                "Educational Warning": "educational" in bot_content.lower() or "research" in bot_content.lower()
-            }
+            checks = self.scanner.evaluate(MINT_RUGPULL_CHECKS)
             
             failed_checks = [check for check, passed in checks.items() if not passed]
             
@@ -226,26 +251,13 @@ class ComprehensiveMemeBotTester:
             self.log_test(test_name, "FAIL", f"Error: {str(e)}")
             return False
     
+    @reads("bot.js", "raydium-manager.js")
     def test_liquidity_lock_command(self):
         """Test /liquidity_lock command with 1-month duration"""
         test_name = "/liquidity_lock Command"
         
         try:
-            bot_js_path = self.telegram_bot_dir / "bot.js"
-            with open(bot_js_path, 'r') as f:
-                bot_content = f.read()
-            
-            raydium_manager_path = self.telegram_bot_dir / "raydium-manager.js"
-            with open(raydium_manager_path, 'r') as f:
-                raydium_content = f.read()
-            
-            checks = {
-                "Liquidity Lock Command": "/liquidity_lock" in bot_content,
-                "1-Month Duration": "30" in raydium_content or "1 month" in raydium_content.lower(),
-                "Lock Liquidity Method": "lockLiquidity" in raydium_content,
-                "Command Handler": "liquidity_lock" in bot_content or "lock_liquidity" in bot_content,
-                "Lock Verification": "getLiquidityLock" in raydium_content
-            }
+            checks = self.scanner.evaluate(LIQUIDITY_LOCK_CHECKS)
             
             failed_checks = [check for check, passed in checks.items() if not passed]
             
@@ -263,27 +275,18 @@ class ComprehensiveMemeBotTester:
             self.log_test(test_name, "FAIL", f"Error: {str(e)}")
             return False
     
+    @reads("token-manager.js")
     def test_token_creation_wallet1_allocation(self):
         """Test token creation gives Wallet 1 exactly 20% of total supply"""
         test_name = "Token Creation (20% to Wallet 1)"
         
         try:
-            token_manager_path = self.telegram_bot_dir / "token-manager.js"
-            with open(token_manager_path, 'r') as f:
-                token_content = f.read()
-            
-            checks = {
-                "20% Allocation Logic": "0.2" in token_content or "20%" in token_content,
-                "Wallet 1 Share": "wallet1Share" in token_content,
-                "Not 100% to Wallet 1": not ("mintAmount = totalSupply * Math.pow(10, 9)" in token_content),
-                "Supply Distribution": "totalSupply *" in token_content,
-                "Mint to Wallet 1": "mintTo" in token_content
-            }
+            checks = self.scanner.evaluate(WALLET1_ALLOCATION_CHECKS)
             
             failed_checks = [check for check, passed in checks.items() if not passed]
             
             # Critical check: ensure it's not giving 100% to Wallet 1
-            if "mintAmount = totalSupply * Math.pow(10, 9)" in token_content:
+            if self.scanner.check(FULL_SUPPLY_TO_WALLET1):
                 self.log_test(test_name, "FAIL", "Still gives 100% to Wallet 1 - critical issue")
                 return False
             
@@ -301,27 +304,13 @@ class ComprehensiveMemeBotTester:
             self.log_test(test_name, "FAIL", f"Error: {str(e)}")
             return False
     
+    @reads("bot.js", "tax-manager.js")
     def test_sol_tax_system_verification(self):
         """Test SOL tax system (taxes collected in SOL, not tokens)"""
         test_name = "SOL Tax System"
         
         try:
-            tax_manager_path = self.telegram_bot_dir / "tax-manager.js"
-            with open(tax_manager_path, 'r') as f:
-                tax_content = f.read()
-            
-            bot_js_path = self.telegram_bot_dir / "bot.js"
-            with open(bot_js_path, 'r') as f:
-                bot_content = f.read()
-            
-            checks = {
-                "Tax Manager Class": "class TaxManager" in tax_content,
-                "SOL Collection State": "solTaxCollection" in bot_content,
-                "Collect in SOL Flag": "collectInSOL" in bot_content,
-                "SOL Tax Calculation": "calculateTaxAmount" in tax_content or "calculateSOLTax" in tax_content,
-                "Tax Stats Tracking": "taxStats" in tax_content or "recordTaxCollection" in tax_content,
-                "Status Shows SOL Tax": "SOL Collected" in bot_content and "Tax Recipient: Wallet 1" in bot_content
-            }
+            checks = self.scanner.evaluate(SOL_TAX_CHECKS)
             
             failed_checks = [check for check, passed in checks.items() if not passed]
             
@@ -359,16 +348,16 @@ class ComprehensiveMemeBotTester:
         failed = 0
         warnings = 0
         
+        report = ResultStream.from_env("comprehensive_meme_bot_test")
         for test in tests:
-            try:
-                result = test()
-                if result:
-                    passed += 1
-                else:
-                    failed += 1
-            except Exception as e:
-                self.log_test(test.__name__, "FAIL", f"Test execution error: {str(e)}")
+            first = len(self.test_results)
+            ok, wall_time, cpu_time = run_timed(test, self.log_test)
+            if ok:
+                passed += 1
+            else:
                 failed += 1
+            report.test("comprehensive_meme_bot_test", test.__name__, ok, self.test_results[first:], wall_time, cpu_time)
+        report.close()
         
         # Count warnings
         warnings = sum(1 for result in self.test_results if result['status'] == 'WARN')
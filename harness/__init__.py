@@ -0,0 +1,7 @@
+"""Shared infrastructure for the Meme-bot test harness scripts."""
+
+import os
+from pathlib import Path
+
+# Parsed symbol tables and the incremental-run manifest live here (gitignored)
+CACHE_DIR = Path(os.environ.get("HARNESS_CACHE_DIR", Path(__file__).parent.parent / ".harness_cache"))
@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the Telegram Bot API.
+
+Answers ``/bot<token>/<method>`` (GET or POST, query string, form or JSON
+parameters) for the methods the harness and the bot touch, with responses
+shaped like the real API:
+
+    getMe, getUpdates, getWebhookInfo, deleteWebhook, setWebhook,
+    getMyCommands, setMyCommands, sendMessage, editMessageText,
+    answerCallbackQuery
+
+Tokens must look like real ones (``<digits>:<35 chars>``) or the server
+answers 401 Unauthorized; the bot id is the token's numeric prefix.
+Unknown methods get 404. Use it from Python::
+
+    with FakeTelegramServer() as server:
+        os.environ["TELEGRAM_API_BASE_URL"] = server.base_url
+
+or standalone: ``python -m harness.fake_telegram --port 8081``.
+"""
+
+import argparse
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlsplit
+
+_PATH = re.compile(r"^/bot(?P<token>[^/]+)/(?P<method>\w+)$")
+_TOKEN = re.compile(r"^(?P<bot_id>\d+):[\w-]{30,}$")
+
+
+class FakeBotApi:
+    """Per-server state: commands, webhook and a message id counter"""
+
+    def __init__(self, username="memebot_fake_bot", first_name="Meme-bot (fake API)"):
+        self.username = username
+        self.first_name = first_name
+        self.commands = []
+        self.webhook_url = ""
+        self._message_id = 0
+        self._lock = threading.Lock()
+
+    def handle(self, token, method, params):
+        """(HTTP status, response body) for one API call"""
+        match = _TOKEN.match(token)
+        if match is None:
+            return 401, {"ok": False, "error_code": 401, "description": "Unauthorized"}
+        handler = getattr(self, f"_{method}", None)
+        if handler is None:
+            return 404, {"ok": False, "error_code": 404, "description": "Not Found"}
+        return 200, {"ok": True, "result": handler(int(match.group("bot_id")), params)}
+
+    def _getMe(self, bot_id, params):
+        return {
+            "id": bot_id,
+            "is_bot": True,
+            "first_name": self.first_name,
+            "username": self.username,
+            "can_join_groups": True,
+            "can_read_all_group_messages": False,
+            "supports_inline_queries": False,
+        }
+
+    def _getUpdates(self, bot_id, params):
+        return []
+
+    def _getWebhookInfo(self, bot_id, params):
+        return {"url": self.webhook_url, "has_custom_certificate": False, "pending_update_count": 0}
+
+    def _setWebhook(self, bot_id, params):
+        self.webhook_url = params.get("url", "")
+        return True
+
+    def _deleteWebhook(self, bot_id, params):
+        self.webhook_url = ""
+        return True
+
+    def _getMyCommands(self, bot_id, params):
+        return self.commands
+
+    def _setMyCommands(self, bot_id, params):
+        commands = params.get("commands", [])
+        self.commands = json.loads(commands) if isinstance(commands, str) else commands
+        return True
+
+    def _sendMessage(self, bot_id, params):
+        with self._lock:
+            self._message_id += 1
+            message_id = self._message_id
+        return {
+            "message_id": message_id,
+            "from": {"id": bot_id, "is_bot": True, "first_name": self.first_name, "username": self.username},
+            "chat": {"id": _int(params.get("chat_id")), "type": "private"},
+            "date": int(time.time()),
+            "text": params.get("text", ""),
+        }
+
+    def _editMessageText(self, bot_id, params):
+        message = self._sendMessage(bot_id, params)
+        message["message_id"] = _int(params.get("message_id"))
+        return message
+
+    def _answerCallbackQuery(self, bot_id, params):
+        return True
+
+
+def _int(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return value
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server_version = "FakeTelegramBotAPI/1.0"
+    protocol_version = "HTTP/1.1"  # keep-alive, so pooled clients reuse connections
+    disable_nagle_algorithm = True  # headers and body go out as separate writes
+
+    def do_GET(self):
+        self._dispatch(dict(parse_qsl(urlsplit(self.path).query)))
+
+    def do_POST(self):
+        params = dict(parse_qsl(urlsplit(self.path).query))
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length) if length else b""
+        if body:
+            if self.headers.get("Content-Type", "").startswith("application/json"):
+                params.update(json.loads(body))
+            else:
+                params.update(parse_qsl(body.decode()))
+        self._dispatch(params)
+
+    def _dispatch(self, params):
+        match = _PATH.match(urlsplit(self.path).path)
+        if match is None:
+            status, payload = 404, {"ok": False, "error_code": 404, "description": "Not Found"}
+        else:
+            status, payload = self.server.api.handle(match.group("token"), match.group("method"), params)
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass  # keep harness output clean
+
+
+class FakeTelegramServer:
+    """Runs the fake API on a background thread; ``port=0`` picks a free port"""
+
+    def __init__(self, host="127.0.0.1", port=0, api=None):
+        self.httpd = ThreadingHTTPServer((host, port), _Handler)
+        self.httpd.daemon_threads = True
+        self.httpd.api = api or FakeBotApi()
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name="fake-telegram", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve a fake Telegram Bot API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8081)
+    args = parser.parse_args()
+
+    server = FakeTelegramServer(args.host, args.port)
+    print(f"🤖 Fake Telegram Bot API on {server.base_url}")
+    print(f"   export TELEGRAM_API_BASE_URL={server.base_url}")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+
+
+if __name__ == "__main__":
+    main()
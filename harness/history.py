@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+"""
+SQLite history of harness and benchmark results, with regression queries.
+
+Every run adds one ``runs`` row (kind, name, git SHA, start time, wall and
+CPU time) and one ``results`` row per test or benchmark metric (suite, test,
+status, cached, wall time, CPU time). ResultStream writes harness runs here
+when it closes. The benchmarks call ``record_benchmark``.
+
+``HistoryStore.regressions`` compares each test's latest run with a rolling
+baseline of the runs before it:
+
+* runtime: the latest uncached time is more than ``slowdown`` times the
+  baseline median, and more than ``min_delta`` seconds slower than it (so
+  sub-millisecond checks don't flag on scheduler noise)
+* pass rate: the pass rate over the last ``recent`` runs dropped by at least
+  ``pass_rate_drop`` below the baseline's
+
+The database defaults to ``.harness_cache/history.sqlite``.
+``HARNESS_HISTORY_DB`` points elsewhere; setting it to an empty string turns
+recording off.
+
+Usage: python -m harness.history runs [--limit N]
+       python -m harness.history regressions [--window N] [--slowdown X]
+
+``regressions`` exits 1 when it finds any, so CI can gate on it.
+"""
+
+import argparse
+import os
+import sqlite3
+import statistics
+import subprocess
+import sys
+import time
+import uuid
+from collections import defaultdict
+from pathlib import Path
+
+# Runnable as a script from anywhere
+sys.path.append(str(Path(__file__).parent.parent))
+
+from harness import CACHE_DIR  # noqa: E402
+
+HISTORY_ENV = "HARNESS_HISTORY_DB"
+DEFAULT_DB = CACHE_DIR / "history.sqlite"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    name TEXT NOT NULL,
+    git_sha TEXT,
+    started_at REAL NOT NULL,
+    wall_time REAL,
+    cpu_time REAL
+);
+CREATE TABLE IF NOT EXISTS results (
+    run_id TEXT NOT NULL REFERENCES runs(id),
+    suite TEXT NOT NULL,
+    test TEXT NOT NULL,
+    status TEXT NOT NULL,
+    cached INTEGER NOT NULL DEFAULT 0,
+    wall_time REAL,
+    cpu_time REAL,
+    PRIMARY KEY (run_id, suite, test)
+);
+CREATE INDEX IF NOT EXISTS results_by_test ON results (suite, test);
+CREATE INDEX IF NOT EXISTS runs_by_start ON runs (started_at);
+"""
+
+# Each test's rows, newest first, numbered per test: one pass over the
+# (suite, test) index instead of a query per test
+_RECENT_ROWS = """
+SELECT suite, test, status, cached, COALESCE(results.wall_time, results.cpu_time) AS seconds
+FROM (
+    SELECT results.*, ROW_NUMBER() OVER (
+        PARTITION BY suite, test ORDER BY runs.started_at DESC
+    ) AS age
+    FROM results JOIN runs ON runs.id = results.run_id
+    WHERE runs.kind = ?
+) AS results
+WHERE age <= ?
+ORDER BY suite, test, age
+"""
+
+_git_sha = None
+
+
+def git_sha(root=None):
+    """HEAD of the checkout the harness lives in, or None outside git"""
+    global _git_sha
+    if _git_sha is None:
+        try:
+            result = subprocess.run(
+                ["git", "rev-parse", "HEAD"],
+                cwd=root or Path(__file__).parent.parent,
+                capture_output=True,
+                text=True,
+                timeout=5
+            )
+            _git_sha = result.stdout.strip() if result.returncode == 0 else ""
+        except (OSError, subprocess.SubprocessError):
+            _git_sha = ""
+    return _git_sha or None
+
+
+def default_path():
+    """Database path from the environment; None when recording is turned off"""
+    path = os.environ.get(HISTORY_ENV)
+    if path is None:
+        return DEFAULT_DB
+    return Path(path) if path else None
+
+
+class Regression:
+    __slots__ = ("suite", "test", "kind", "baseline", "current", "runs")
+
+    def __init__(self, suite, test, kind, baseline, current, runs):
+        self.suite = suite
+        self.test = test
+        self.kind = kind  # "runtime" or "pass_rate"
+        self.baseline = baseline
+        self.current = current
+        self.runs = runs  # size of the baseline
+
+    def format(self):
+        if self.kind == "runtime":
+            return (f"{self.suite}::{self.test}: {self.current * 1000:.2f}ms vs {self.baseline * 1000:.2f}ms "
+                    f"median of the previous {self.runs} runs ({self.current / self.baseline:.1f}x)")
+        return (f"{self.suite}::{self.test}: pass rate {self.current:.0%} vs {self.baseline:.0%} "
+                f"over the previous {self.runs} runs")
+
+    def __repr__(self):
+        return f"Regression({self.suite}::{self.test}, {self.kind})"
+
+
+class HistoryStore:
+    def __init__(self, path=DEFAULT_DB):
+        self.path = Path(path)
+
+    def _connect(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        connection = sqlite3.connect(self.path, timeout=10)
+        connection.execute("PRAGMA journal_mode=WAL")  # concurrent suites don't block each other's reads
+        connection.executescript(_SCHEMA)
+        return connection
+
+    def record_run(self, kind, name, rows, wall_time=None, cpu_time=None, run_id=None, started_at=None):
+        """Store one run. ``rows`` are (suite, test, status, cached, wall_time, cpu_time) tuples.
+
+        Returns the run id.
+        """
+        run_id = run_id or uuid.uuid4().hex
+        started_at = started_at if started_at is not None else time.time()
+        connection = self._connect()
+        try:
+            with connection:
+                connection.execute(
+                    "INSERT INTO runs (id, kind, name, git_sha, started_at, wall_time, cpu_time) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (run_id, kind, name, git_sha(), started_at, wall_time, cpu_time)
+                )
+                connection.executemany(
+                    "INSERT OR REPLACE INTO results (run_id, suite, test, status, cached, wall_time, cpu_time) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    [(run_id, suite, test, status, int(bool(cached)), wall, cpu)
+                     for suite, test, status, cached, wall, cpu in rows]
+                )
+        finally:
+            connection.close()
+        return run_id
+
+    def runs(self, limit=20, kind=None):
+        """Most recent runs first, as dicts with test and failure counts"""
+        connection = self._connect()
+        connection.row_factory = sqlite3.Row
+        try:
+            rows = connection.execute(
+                "SELECT runs.*, COUNT(results.test) AS tests, "
+                "SUM(results.status = 'FAIL') AS failures "
+                "FROM runs LEFT JOIN results ON results.run_id = runs.id "
+                "WHERE ? IS NULL OR runs.kind = ? "
+                "GROUP BY runs.id ORDER BY runs.started_at DESC LIMIT ?",
+                (kind, kind, limit)
+            ).fetchall()
+        finally:
+            connection.close()
+        return [dict(row) for row in rows]
+
+    def regressions(self, kind="harness", window=10, recent=1, min_runs=5,
+                    slowdown=1.5, min_delta=0.001, pass_rate_drop=0.2):
+        """Tests whose latest runs regressed against the ``window`` runs before them"""
+        connection = self._connect()
+        try:
+            rows = connection.execute(_RECENT_ROWS, (kind, recent + window)).fetchall()
+        finally:
+            connection.close()
+
+        history = defaultdict(list)
+        for suite, test, status, cached, seconds in rows:
+            history[(suite, test)].append((status, cached, seconds))
+
+        found = []
+        for (suite, test), entries in history.items():
+            latest, baseline = entries[:recent], entries[recent:]
+            if len(baseline) < min_runs:
+                continue
+
+            status, cached, seconds = latest[0]
+            timings = [s for _, c, s in baseline if not c and s is not None]
+            if not cached and seconds is not None and len(timings) >= min_runs:
+                median = statistics.median(timings)
+                if median > 0 and seconds > median * slowdown and seconds - median > min_delta:
+                    found.append(Regression(suite, test, "runtime", median, seconds, len(timings)))
+
+            baseline_rate = sum(1 for s, _, _ in baseline if s != "FAIL") / len(baseline)
+            recent_rate = sum(1 for s, _, _ in latest if s != "FAIL") / len(latest)
+            if baseline_rate - recent_rate >= pass_rate_drop:
+                found.append(Regression(suite, test, "pass_rate", baseline_rate, recent_rate, len(baseline)))
+        return found
+
+
+def record_benchmark(name, metrics, path=None):
+    """Store one benchmark run; ``metrics`` maps metric name to seconds (wall, or CPU for CPU-only benchmarks)
+
+    Does nothing when HARNESS_HISTORY_DB turns recording off.
+    """
+    path = path or default_path()
+    if path is None:
+        return None
+    rows = [(name, metric, "PASS", False, seconds, None) for metric, seconds in metrics.items()]
+    return HistoryStore(path).record_run("benchmark", name, rows)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Query the harness results history")
+    parser.add_argument("--db", default=default_path() or DEFAULT_DB, help="History database")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    runs_parser = commands.add_parser("runs", help="List recent runs")
+    runs_parser.add_argument("--limit", type=int, default=20)
+    runs_parser.add_argument("--kind", choices=["harness", "benchmark"])
+
+    regressions_parser = commands.add_parser("regressions", help="Flag tests that got slower or started failing")
+    regressions_parser.add_argument("--kind", choices=["harness", "benchmark"], default="harness")
+    regressions_parser.add_argument("--window", type=int, default=10, help="Baseline size in runs")
+    regressions_parser.add_argument("--recent", type=int, default=1, help="Runs compared against the baseline")
+    regressions_parser.add_argument("--slowdown", type=float, default=1.5, help="Runtime ratio that counts as slower")
+    regressions_parser.add_argument("--min-delta-ms", type=float, default=1.0, help="Ignore slowdowns smaller than this")
+    args = parser.parse_args(argv)
+
+    store = HistoryStore(args.db)
+    if args.command == "runs":
+        for run in store.runs(args.limit, args.kind):
+            started = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(run["started_at"]))
+            sha = (run["git_sha"] or "-")[:10]
+            wall = f"{run['wall_time']:.2f}s" if run["wall_time"] is not None else "-"
+            print(f"{started}  {sha:<10}  {run['kind']:<9}  {run['name']:<28}  "
+                  f"{run['tests']:>3} tests  {run['failures'] or 0:>3} failed  {wall:>8}")
+        return 0
+
+    found = store.regressions(args.kind, args.window, args.recent, slowdown=args.slowdown,
+                              min_delta=args.min_delta_ms / 1000)
+    if not found:
+        print("✅ No regressions against the rolling baseline")
+        return 0
+    print(f"📉 {len(found)} regression(s) against the rolling baseline:")
+    for regression in found:
+        icon = "🐢" if regression.kind == "runtime" else "❌"
+        print(f"{icon} {regression.format()}")
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
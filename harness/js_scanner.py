@@ -0,0 +1,511 @@
+"""
+Tokenizer-level scanner and symbol table for the telegram-bot sources.
+
+Checks that need "the body of showStatus" used to slice the raw text around
+a ``find()``; that breaks on braces inside strings, template literals,
+regexes and comments. ``tokenize`` understands all four, and ``SymbolTable``
+records from the token stream:
+
+* functions - ``function f() {}``, ``const f = (...) => {}``,
+  ``const f = function () {}`` and class methods as ``Class.method``
+* handlers - ``bot.onText(/regex/, ...)`` calls with their regex source
+* callback_data - every ``callback_data: '...'`` value
+
+Tables are cached on disk under ``.harness_cache/`` keyed by the file's
+SHA-256, so a repeat run over unchanged sources skips tokenizing entirely::
+
+    symbols = JsSymbols.shared(SourceIndex.shared(bot_dir))
+    body = symbols.body("bot.js", "showStatus")   # exact source text or None
+"""
+
+import bisect
+import json
+import os
+import re
+import tempfile
+import threading
+from pathlib import Path
+
+from harness import CACHE_DIR
+
+# Bump when tokenizing or symbol extraction changes, so stale caches are ignored
+SCANNER_VERSION = 1
+
+_IDENT = re.compile(r"[A-Za-z_$\u0080-￿][\w$\u0080-￿]*")
+_NUMBER = re.compile(r"0[xXbBoO][\da-fA-F_]+n?|(?:\d[\d_]*(?:\.[\d_]*)?|\.\d[\d_]*)(?:[eE][+-]?\d+)?n?")
+_SPACE = re.compile(r"\s+")
+_PUNCT = re.compile(
+    r">>>=|\.\.\.|===|!==|\*\*=|<<=|>>>|>>=|&&=|\|\|=|\?\?=|"
+    r"=>|==|!=|<=|>=|&&|\|\||\?\?|\?\.|\+\+|--|[-+*%&|^]=|\*\*|<<|>>|"
+    r"[{}()\[\];,<>+\-*%&|^!~?:=.@#]"
+)
+
+# After these keywords a "/" starts a regex literal, not a division
+_REGEX_KEYWORDS = frozenset({
+    "return", "typeof", "instanceof", "in", "of", "new", "delete", "void",
+    "throw", "case", "do", "else", "yield", "await",
+})
+_CONTROL_KEYWORDS = frozenset({"if", "for", "while", "switch", "catch", "with", "function"})
+_METHOD_MODIFIERS = frozenset({"static", "async", "get", "set", "*"})
+
+
+class Token:
+    __slots__ = ("kind", "value", "start", "end")
+
+    def __init__(self, kind, value, start, end):
+        self.kind = kind
+        self.value = value
+        self.start = start
+        self.end = end
+
+    def __repr__(self):
+        return f"Token({self.kind}, {self.value!r}, {self.start})"
+
+
+class JsSyntaxError(ValueError):
+    pass
+
+
+def tokenize(text, comments=False):
+    """Tokens of ``text`` as a list.
+
+    Kinds: ident, number, punct, string, template, regex and (only when
+    ``comments`` is true) comment. Template literals with ``${...}``
+    substitutions come out as a template token per literal chunk, with the
+    substitution's tokens in between.
+    """
+    tokens = []
+    braces = []  # "{" for blocks/objects, "`" for an open ${ substitution
+    pos = 0
+    length = len(text)
+    if text.startswith("#!"):
+        pos = text.find("\n") if "\n" in text else length
+
+    def regex_allowed():
+        for token in reversed(tokens):
+            if token.kind == "comment":
+                continue
+            if token.kind in ("number", "string", "template", "regex"):
+                return False
+            if token.kind == "ident":
+                return token.value in _REGEX_KEYWORDS
+            return token.value not in (")", "]", "}")
+        return True
+
+    while pos < length:
+        char = text[pos]
+        if char.isspace():
+            pos = _SPACE.match(text, pos).end()
+            continue
+        start = pos
+
+        if char == "/" and text.startswith("//", pos):
+            end = text.find("\n", pos)
+            pos = length if end == -1 else end
+            if comments:
+                tokens.append(Token("comment", text[start:pos], start, pos))
+            continue
+        if char == "/" and text.startswith("/*", pos):
+            end = text.find("*/", pos + 2)
+            if end == -1:
+                raise JsSyntaxError(f"unterminated comment at offset {start}")
+            pos = end + 2
+            if comments:
+                tokens.append(Token("comment", text[start:pos], start, pos))
+            continue
+
+        if char in "'\"":
+            pos = _scan_string(text, pos)
+            tokens.append(Token("string", text[start:pos], start, pos))
+            continue
+        if char == "`" or (char == "}" and braces and braces[-1] == "`"):
+            if char == "}":
+                braces.pop()
+            pos, substitution = _scan_template(text, pos + 1)
+            tokens.append(Token("template", text[start:pos], start, pos))
+            if substitution:
+                braces.append("`")
+            continue
+        if char == "/" and regex_allowed():
+            pos = _scan_regex(text, pos)
+            tokens.append(Token("regex", text[start:pos], start, pos))
+            continue
+
+        match = _IDENT.match(text, pos)
+        if match:
+            pos = match.end()
+            tokens.append(Token("ident", match.group(), start, pos))
+            continue
+        if char.isdigit() or (char == "." and pos + 1 < length and text[pos + 1].isdigit()):
+            pos = _NUMBER.match(text, pos).end()
+            tokens.append(Token("number", text[start:pos], start, pos))
+            continue
+        if char == "/":
+            pos += 2 if text.startswith("/=", pos) else 1
+            tokens.append(Token("punct", text[start:pos], start, pos))
+            continue
+        match = _PUNCT.match(text, pos)
+        if match is None:
+            raise JsSyntaxError(f"unexpected {char!r} at offset {pos}")
+        pos = match.end()
+        value = match.group()
+        if value == "{":
+            braces.append("{")
+        elif value == "}" and braces:
+            braces.pop()
+        tokens.append(Token("punct", value, start, pos))
+    return tokens
+
+
+def _scan_string(text, pos):
+    quote = text[pos]
+    pos += 1
+    while pos < len(text):
+        char = text[pos]
+        if char == "\\":
+            pos += 2
+        elif char == quote:
+            return pos + 1
+        elif char == "\n":
+            break
+        else:
+            pos += 1
+    raise JsSyntaxError(f"unterminated string at offset {pos}")
+
+
+def _scan_template(text, pos):
+    """Scan a template chunk from ``pos``; returns (end, opened_substitution)"""
+    while pos < len(text):
+        char = text[pos]
+        if char == "\\":
+            pos += 2
+        elif char == "`":
+            return pos + 1, False
+        elif char == "$" and text.startswith("${", pos):
+            return pos + 2, True
+        else:
+            pos += 1
+    raise JsSyntaxError(f"unterminated template literal at offset {pos}")
+
+
+def _scan_regex(text, pos):
+    start = pos
+    pos += 1
+    in_class = False
+    while pos < len(text):
+        char = text[pos]
+        if char == "\\":
+            pos += 2
+            continue
+        if char == "\n":
+            break
+        if char == "[":
+            in_class = True
+        elif char == "]":
+            in_class = False
+        elif char == "/" and not in_class:
+            pos += 1
+            while pos < len(text) and (text[pos].isalnum() or text[pos] in "_$"):
+                pos += 1
+            return pos
+        pos += 1
+    raise JsSyntaxError(f"unterminated regex literal at offset {start}")
+
+
+class Span:
+    """A named region of a file: [start, end) character offsets and 1-based line"""
+
+    __slots__ = ("name", "kind", "start", "end", "line")
+
+    def __init__(self, name, kind, start, end, line):
+        self.name = name
+        self.kind = kind
+        self.start = start
+        self.end = end
+        self.line = line
+
+    def to_list(self):
+        return [self.name, self.kind, self.start, self.end, self.line]
+
+    def __repr__(self):
+        return f"Span({self.name!r}, {self.kind}, line {self.line})"
+
+
+class SymbolTable:
+    """Functions, onText handlers and callback_data values of one file"""
+
+    def __init__(self, sha256, functions=(), handlers=(), callback_data=()):
+        self.sha256 = sha256
+        self.functions = {}  # name -> first Span with that name
+        self.all_functions = list(functions)
+        for span in self.all_functions:
+            self.functions.setdefault(span.name, span)
+        self.handlers = list(handlers)  # Span named by the handler's regex source
+        self.callback_data = list(callback_data)  # Span named by the value
+
+    @classmethod
+    def build(cls, text, sha256):
+        return _SymbolBuilder(text).build(cls, sha256)
+
+    def to_dict(self):
+        return {
+            "version": SCANNER_VERSION,
+            "sha256": self.sha256,
+            "functions": [span.to_list() for span in self.all_functions],
+            "handlers": [span.to_list() for span in self.handlers],
+            "callback_data": [span.to_list() for span in self.callback_data],
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        if data.get("version") != SCANNER_VERSION:
+            raise ValueError("symbol table written by another scanner version")
+        return cls(
+            data["sha256"],
+            [Span(*item) for item in data["functions"]],
+            [Span(*item) for item in data["handlers"]],
+            [Span(*item) for item in data["callback_data"]],
+        )
+
+
+class _SymbolBuilder:
+    def __init__(self, text):
+        self.text = text
+        self.tokens = tokenize(text)
+        self.partner = self._pair_brackets()
+        self._line_starts = [0] + [match.end() for match in re.finditer("\n", text)]
+
+    def _pair_brackets(self):
+        partner = {}
+        stack = []
+        closing = {")": "(", "]": "[", "}": "{"}
+        for index, token in enumerate(self.tokens):
+            if token.kind != "punct":
+                continue
+            if token.value in "([{":
+                stack.append(index)
+            elif token.value in closing:
+                if not stack or self.tokens[stack[-1]].value != closing[token.value]:
+                    raise JsSyntaxError(f"unbalanced {token.value!r} at offset {token.start}")
+                opened = stack.pop()
+                partner[opened] = index
+                partner[index] = opened
+        if stack:
+            raise JsSyntaxError(f"unclosed {self.tokens[stack[-1]].value!r} at offset {self.tokens[stack[-1]].start}")
+        return partner
+
+    def line(self, offset):
+        return bisect.bisect_right(self._line_starts, offset)
+
+    def is_punct(self, index, value):
+        return 0 <= index < len(self.tokens) and self.tokens[index].kind == "punct" and self.tokens[index].value == value
+
+    def is_ident(self, index, value=None):
+        if not 0 <= index < len(self.tokens) or self.tokens[index].kind != "ident":
+            return False
+        return value is None or self.tokens[index].value == value
+
+    def span(self, name, kind, first, last):
+        start = self.tokens[first].start
+        return Span(name, kind, start, self.tokens[last].end, self.line(start))
+
+    def build(self, cls, sha256):
+        functions, handlers, callback_data = [], [], []
+        class_bodies = {}  # index of a class body's "{" -> class name
+        enclosing = []  # indexes of the open "{" tokens around the current token
+        tokens = self.tokens
+        for index, token in enumerate(tokens):
+            if token.kind == "punct":
+                if token.value == "{":
+                    enclosing.append(index)
+                elif token.value == "}" and enclosing:
+                    enclosing.pop()
+                continue
+            if token.kind == "string" and token.value[1:-1] == "callback_data" and self.is_punct(index + 1, ":"):
+                token = Token("ident", "callback_data", token.start, token.end)
+            if token.kind != "ident":
+                continue
+
+            if token.value == "function":
+                span = self._function_declaration(index)
+                if span:
+                    functions.append(span)
+            elif token.value == "class":
+                name = tokens[index + 1].value if self.is_ident(index + 1) else None
+                body = index + 2
+                while body < len(tokens) and not self.is_punct(body, "{"):
+                    body += 1
+                if name and body < len(tokens):
+                    class_bodies[body] = name
+            elif enclosing and enclosing[-1] in class_bodies:
+                span = self._method(index, class_bodies[enclosing[-1]])
+                if span:
+                    functions.append(span)
+
+            if token.value in ("const", "let", "var"):
+                span = self._function_expression(index + 1)
+                if span:
+                    functions.append(span)
+            elif self.is_punct(index + 1, ":") and not self.is_punct(index - 1, "?"):
+                if token.value == "callback_data" and index + 2 < len(tokens) and tokens[index + 2].kind in ("string", "template"):
+                    value = tokens[index + 2]
+                    callback_data.append(Span(value.value[1:-1], "callback_data", value.start, value.end, self.line(value.start)))
+                else:
+                    span = self._function_expression(index, separator=":")
+                    if span:
+                        functions.append(span)
+            elif token.value == "onText" and self.is_punct(index - 1, ".") and self.is_punct(index + 1, "("):
+                pattern = index + 2
+                if pattern < len(tokens) and tokens[pattern].kind == "regex":
+                    first = index - 2 if self.is_ident(index - 2) else index
+                    handlers.append(self.span(tokens[pattern].value, "onText", first, self.partner[index + 1]))
+        return cls(sha256, functions, handlers, callback_data)
+
+    def _function_declaration(self, index):
+        """``[async] function [*] name (...) {...}``"""
+        name_index = index + 1
+        if self.is_punct(name_index, "*"):
+            name_index += 1
+        if not self.is_ident(name_index) or not self.is_punct(name_index + 1, "("):
+            return None  # anonymous: picked up by _function_expression if named
+        body = self.partner[name_index + 1] + 1
+        if not self.is_punct(body, "{"):
+            return None
+        first = index - 1 if self.is_ident(index - 1, "async") else index
+        return self.span(self.tokens[name_index].value, "function", first, self.partner[body])
+
+    def _function_expression(self, name_index, separator="="):
+        """``name = [async] function (...) {...}`` or ``name = [async] (...) => {...}``"""
+        if not self.is_ident(name_index) or not self.is_punct(name_index + 1, separator):
+            return None
+        index = name_index + 2
+        if self.is_ident(index, "async"):
+            index += 1
+        if self.is_ident(index, "function"):
+            index += 1
+            if self.is_punct(index, "*"):
+                index += 1
+            if self.is_ident(index):
+                index += 1
+            if not self.is_punct(index, "("):
+                return None
+            index = self.partner[index] + 1
+        elif self.is_punct(index, "("):
+            index = self.partner[index] + 1
+            if not self.is_punct(index, "=>"):
+                return None
+            index += 1
+        elif self.is_ident(index) and self.is_punct(index + 1, "=>"):
+            index += 2
+        else:
+            return None
+        if not self.is_punct(index, "{"):
+            return None
+        return self.span(self.tokens[name_index].value, "function", name_index, self.partner[index])
+
+    def _method(self, index, class_name):
+        """``[static] [async] [get|set] name (...) {...}`` directly inside a class body"""
+        token = self.tokens[index]
+        if token.value in _METHOD_MODIFIERS or token.value in _CONTROL_KEYWORDS:
+            return None
+        if not self.is_punct(index + 1, "("):
+            return None
+        body = self.partner[index + 1] + 1
+        if not self.is_punct(body, "{"):
+            return None
+        first = index
+        while first > 0 and (self.is_ident(first - 1) or self.is_punct(first - 1, "*")) and self.tokens[first - 1].value in _METHOD_MODIFIERS:
+            first -= 1
+        return self.span(f"{class_name}.{token.value}", "method", first, self.partner[body])
+
+
+class JsSymbols:
+    """Symbol tables for the ``*.js`` files of a SourceIndex, cached on disk by hash"""
+
+    _shared = {}
+    _shared_lock = threading.Lock()
+
+    def __init__(self, index, cache_dir=CACHE_DIR):
+        self.index = index
+        self.cache_dir = Path(cache_dir) / "js-symbols" if cache_dir else None
+        self._lock = threading.Lock()
+        self._tables = {}  # file -> SymbolTable
+        self.parsed = 0
+        self.cache_hits = 0
+
+    @classmethod
+    def shared(cls, index):
+        with cls._shared_lock:
+            symbols = cls._shared.get(id(index))
+            if symbols is None:
+                symbols = cls._shared[id(index)] = cls(index)
+            return symbols
+
+    def files(self):
+        return sorted(path.name for path in self.index.root.glob("*.js"))
+
+    def table(self, file):
+        """SymbolTable for ``file``; raises FileNotFoundError or JsSyntaxError"""
+        view = self.index.view(file)
+        table = self._tables.get(file)
+        if table is not None and table.sha256 == view.sha256:
+            return table
+        with self._lock:
+            table = self._tables.get(file)
+            if table is None or table.sha256 != view.sha256:
+                table = self._tables[file] = self._load(view)
+            return table
+
+    def tables(self):
+        """Tables for every parseable ``*.js`` file; files that fail to tokenize are skipped"""
+        tables = {}
+        for file in self.files():
+            try:
+                tables[file] = self.table(file)
+            except JsSyntaxError:
+                continue
+        return tables
+
+    def function(self, file, name):
+        """Span of the function or ``Class.method`` called ``name`` in ``file``, or None"""
+        return self.table(file).functions.get(name)
+
+    def body(self, file, name):
+        """Exact source text of ``name`` in ``file``, or None when it is not defined there"""
+        span = self.function(file, name)
+        if span is None:
+            return None
+        return self.index.view(file).text[span.start:span.end]
+
+    def find_function(self, name):
+        """(file, Span) of the first definition of ``name`` across all files, or None"""
+        for file, table in self.tables().items():
+            span = table.functions.get(name)
+            if span is not None:
+                return file, span
+        return None
+
+    def _load(self, view):
+        path = self.cache_dir / f"{view.sha256}.json" if self.cache_dir else None
+        if path is not None:
+            try:
+                table = SymbolTable.from_dict(json.loads(path.read_text()))
+                self.cache_hits += 1
+                return table
+            except (OSError, ValueError, KeyError, TypeError):
+                pass
+        table = SymbolTable.build(view.text, view.sha256)
+        self.parsed += 1
+        if path is not None:
+            self._store(path, table)
+        return table
+
+    def _store(self, path, table):
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            handle, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+            with os.fdopen(handle, "w") as f:
+                json.dump(table.to_dict(), f)
+            os.replace(tmp, path)
+        except OSError:
+            pass  # a read-only checkout just runs uncached
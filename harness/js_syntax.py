@@ -0,0 +1,104 @@
+"""
+Batched JavaScript syntax validation.
+
+``node -c`` per file pays Node's startup once for every module.
+``check_files`` hands all of them to harness/js_syntax_check.js in a single
+``node`` invocation and gets structured diagnostics back as JSON.
+``SyntaxChecker`` validates every telegram-bot/*.js that way once per
+process (later calls only re-check files whose hash changed), so every test
+asking about a single file shares that one Node startup.
+"""
+
+import json
+import subprocess
+import threading
+from pathlib import Path
+
+CHECKER = Path(__file__).with_name("js_syntax_check.js")
+
+
+class Diagnostic:
+    """Outcome of compiling one file"""
+
+    __slots__ = ("file", "ok", "error", "message", "line", "column", "source")
+
+    def __init__(self, file, ok, error=None, message=None, line=None, column=None, source=None):
+        self.file = file
+        self.ok = ok
+        self.error = error
+        self.message = message
+        self.line = line
+        self.column = column
+        self.source = source
+
+    def format(self):
+        """The error the way ``node -c`` prints it"""
+        if self.ok:
+            return ""
+        if self.line is None:
+            return f"{self.file}\n\n{self.error}: {self.message}"
+        caret = " " * ((self.column or 1) - 1) + "^"
+        return f"{self.file}:{self.line}\n{self.source}\n{caret}\n\n{self.error}: {self.message}"
+
+    def __repr__(self):
+        state = "ok" if self.ok else f"{self.error} at line {self.line}"
+        return f"Diagnostic({self.file!r}, {state})"
+
+
+def check_files(paths, node="node", timeout=60):
+    """Diagnostics for ``paths`` (same order) from one Node process.
+
+    Raises FileNotFoundError when ``node`` is not installed.
+    """
+    paths = [str(path) for path in paths]
+    if not paths:
+        return []
+    result = subprocess.run(
+        [node, str(CHECKER), *paths],
+        capture_output=True,
+        text=True,
+        timeout=timeout
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"syntax checker failed: {result.stderr.strip()}")
+    return [Diagnostic(**item) for item in json.loads(result.stdout)]
+
+
+class SyntaxChecker:
+    """Syntax diagnostics for the ``*.js`` files of a SourceIndex, one Node run per change"""
+
+    _shared = {}
+    _shared_lock = threading.Lock()
+
+    def __init__(self, index, node="node"):
+        self.index = index
+        self.node = node
+        self._lock = threading.Lock()
+        self._results = {}  # file -> (sha256, Diagnostic)
+        self.node_runs = 0
+
+    @classmethod
+    def shared(cls, index):
+        with cls._shared_lock:
+            checker = cls._shared.get(id(index))
+            if checker is None:
+                checker = cls._shared[id(index)] = cls(index)
+            return checker
+
+    def check_all(self):
+        """{file: Diagnostic} for every ``*.js`` file under the index root"""
+        with self._lock:
+            views = {path.name: self.index.view(path.name) for path in sorted(self.index.root.glob("*.js"))}
+            stale = [name for name, view in views.items()
+                     if name not in self._results or self._results[name][0] != view.sha256]
+            if stale:
+                diagnostics = check_files([views[name].path for name in stale], self.node)
+                self.node_runs += 1
+                for name, diagnostic in zip(stale, diagnostics):
+                    diagnostic.file = name
+                    self._results[name] = (views[name].sha256, diagnostic)
+            return {name: self._results[name][1] for name in views}
+
+    def diagnostic(self, file):
+        """Diagnostic for one file (None if it doesn't exist); checks all files together on first use"""
+        return self.check_all().get(file)
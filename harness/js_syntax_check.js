@@ -0,0 +1,41 @@
+#!/usr/bin/env node
+// Syntax-checks every file named on the command line in this one Node process
+// and prints a JSON array of diagnostics, one per file, in argument order:
+//   {"file", "ok", "error", "message", "line", "column", "source"}
+// Files are compiled the way `node -c` sees them (CommonJS module wrapper)
+// but never run.
+'use strict';
+
+const fs = require('fs');
+const vm = require('vm');
+
+const MODULE_PARAMS = ['exports', 'require', 'module', '__filename', '__dirname'];
+
+function check(file) {
+    let code;
+    try {
+        code = fs.readFileSync(file, 'utf8');
+    } catch (err) {
+        return { file, ok: false, error: 'ReadError', message: err.message, line: null, column: null, source: null };
+    }
+    try {
+        vm.compileFunction(code, MODULE_PARAMS, { filename: file });
+        return { file, ok: true, error: null, message: null, line: null, column: null, source: null };
+    } catch (err) {
+        // V8 puts "file:line", the offending source line and a caret line first
+        const stack = String(err.stack || '').split('\n');
+        const location = /:(\d+)$/.exec(stack[0] || '');
+        const caret = (stack[2] || '').indexOf('^');
+        return {
+            file,
+            ok: false,
+            error: err.name || 'Error',
+            message: err.message,
+            line: location ? Number(location[1]) : null,
+            column: caret >= 0 ? caret + 1 : null,
+            source: location ? stack[1] : null,
+        };
+    }
+}
+
+process.stdout.write(JSON.stringify(process.argv.slice(2).map(check)));
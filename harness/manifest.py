@@ -0,0 +1,110 @@
+"""
+File-hash manifest behind incremental harness runs.
+
+For every test that declares its inputs with ``@reads(...)`` the manifest
+stores the SHA-256 of each input file, a fingerprint of the test code (the
+suite module plus the harness package) and the test's outcome and output.
+A later run replays that entry instead of executing the test when nothing
+it depends on has changed. It also remembers each suite's test list, so a
+run where everything is cached does not even import the suites.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+from pathlib import Path
+
+from harness import CACHE_DIR
+
+MANIFEST_VERSION = 1
+DEFAULT_PATH = CACHE_DIR / "manifest.json"
+
+_HARNESS_DIR = Path(__file__).parent
+
+
+def code_fingerprint(suite_path):
+    """SHA-256 over the suite module and the harness package it builds on"""
+    digest = hashlib.sha256()
+    harness_files = sorted(_HARNESS_DIR.glob("*.py")) + sorted(_HARNESS_DIR.glob("*.js"))
+    for path in [Path(suite_path)] + harness_files:
+        digest.update(path.name.encode())
+        digest.update(path.read_bytes())
+    return digest.hexdigest()
+
+
+def input_hashes(index, files):
+    """{file: sha256} for ``files`` in ``index``; globs like ``*.js`` are expanded
+    and missing files hash to None"""
+    names = []
+    for pattern in files:
+        if any(char in pattern for char in "*?["):
+            names.extend(sorted(path.name for path in index.root.glob(pattern)))
+        else:
+            names.append(pattern)
+    hashes = {}
+    for name in names:
+        try:
+            hashes[name] = index.view(name).sha256
+        except FileNotFoundError:
+            hashes[name] = None
+    return hashes
+
+
+class Manifest:
+    def __init__(self, path=DEFAULT_PATH, data=None):
+        self.path = Path(path)
+        data = data or {}
+        self.suites = data.get("suites", {})
+        self.tests = data.get("tests", {})
+
+    @classmethod
+    def load(cls, path=DEFAULT_PATH):
+        """Manifest from ``path``; a missing, corrupt or outdated file gives an empty one"""
+        try:
+            data = json.loads(Path(path).read_text())
+        except (OSError, ValueError):
+            return cls(path)
+        if not isinstance(data, dict) or data.get("version") != MANIFEST_VERSION:
+            return cls(path)
+        return cls(path, data)
+
+    def suite_tests(self, suite, fingerprint):
+        """[(test name, reads or None)] recorded for ``suite`` at ``fingerprint``, else None"""
+        entry = self.suites.get(suite)
+        if entry is None or entry["fingerprint"] != fingerprint:
+            return None
+        return [(name, tuple(files) if files is not None else None) for name, files in entry["tests"]]
+
+    def record_suite(self, suite, fingerprint, tests):
+        self.suites[suite] = {
+            "fingerprint": fingerprint,
+            "tests": [[name, list(files) if files is not None else None] for name, files in tests],
+        }
+
+    def cached(self, test_id, fingerprint, inputs):
+        """The stored entry for ``test_id`` if it was produced from the same code and inputs"""
+        entry = self.tests.get(test_id)
+        if entry is None or entry["fingerprint"] != fingerprint or entry["inputs"] != inputs:
+            return None
+        return entry
+
+    def record(self, test_id, fingerprint, inputs, passed, results, output):
+        self.tests[test_id] = {
+            "fingerprint": fingerprint,
+            "inputs": inputs,
+            "passed": passed,
+            "results": results,
+            "output": output,
+        }
+
+    def save(self):
+        data = {"version": MANIFEST_VERSION, "suites": self.suites, "tests": self.tests}
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            handle, tmp = tempfile.mkstemp(dir=self.path.parent, suffix=".tmp")
+            with os.fdopen(handle, "w") as f:
+                json.dump(data, f, ensure_ascii=False)
+            os.replace(tmp, self.path)
+        except OSError:
+            pass  # a read-only checkout just runs without the cache
@@ -0,0 +1,260 @@
+"""
+Declarative source checks answered by a single-pass multi-pattern scan.
+
+Checks are declared as data instead of ad-hoc ``"needle" in content`` tests::
+
+    BOT = source("bot.js")
+    CHECKS = {
+        "Tax Manager Import": BOT.has("require('./tax-manager')") | BOT.has("TaxManager"),
+        "Educational Messaging": BOT.has_i("research") & BOT.has_i("simulation"),
+        "No DALL-E References": ~AI.has_i("dall-e"),
+    }
+    results = scanner.evaluate(CHECKS)   # {"Tax Manager Import": True, ...}
+
+Every needle declared against a file, across all harness modules, is
+compiled into one Aho-Corasick automaton per file (``pyahocorasick``). The
+automaton runs once over the file's lower-cased text, which the SourceIndex
+computes once; case-sensitive needles are confirmed against the original
+text at the match position. Each file is therefore scanned once and every
+check is answered from the resulting match table. When a file changes only
+that file is re-scanned, with its compiled automaton reused.
+
+Without ``pyahocorasick`` the table falls back to one C-level substring
+search per distinct needle over the same shared texts: a pure-Python
+automaton walks the file a character at a time and is slower than that.
+"""
+
+import collections
+import threading
+
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+
+class Expr:
+    """Boolean expression over pattern matches; combine with &, | and ~"""
+
+    def __and__(self, other):
+        return All(self, other)
+
+    def __or__(self, other):
+        return Any(self, other)
+
+    def __invert__(self):
+        return Not(self)
+
+    def patterns(self):
+        raise NotImplementedError
+
+    def evaluate(self, tables):
+        raise NotImplementedError
+
+
+class Contains(Expr):
+    """True when ``needle`` occurs in ``file`` at least ``at_least`` times"""
+
+    def __init__(self, file, needle, ignore_case=False, at_least=1):
+        self.file = file
+        self.needle = needle
+        self.ignore_case = ignore_case
+        self.at_least = at_least
+
+    @property
+    def key(self):
+        return (self.needle, self.ignore_case)
+
+    def patterns(self):
+        yield self
+
+    def evaluate(self, tables):
+        return tables[self.file].has(self.key, self.at_least)
+
+    def __repr__(self):
+        suffix = "_i" if self.ignore_case else ""
+        return f"{self.file}.has{suffix}({self.needle!r})"
+
+
+class All(Expr):
+    def __init__(self, *terms):
+        self.terms = terms
+
+    def patterns(self):
+        for term in self.terms:
+            yield from term.patterns()
+
+    def evaluate(self, tables):
+        return all(term.evaluate(tables) for term in self.terms)
+
+
+class Any(Expr):
+    def __init__(self, *terms):
+        self.terms = terms
+
+    def patterns(self):
+        for term in self.terms:
+            yield from term.patterns()
+
+    def evaluate(self, tables):
+        return any(term.evaluate(tables) for term in self.terms)
+
+
+class Not(Expr):
+    def __init__(self, term):
+        self.term = term
+
+    def patterns(self):
+        return self.term.patterns()
+
+    def evaluate(self, tables):
+        return not self.term.evaluate(tables)
+
+
+# file name -> {(needle, ignore_case)}; filled as harness modules declare checks
+_registry = collections.defaultdict(set)
+_registry_lock = threading.Lock()
+
+
+class SourcePatterns:
+    """Factory for checks against one file; every needle is registered"""
+
+    def __init__(self, file):
+        self.file = file
+
+    def has(self, needle, at_least=1):
+        return self._declare(Contains(self.file, needle, False, at_least))
+
+    def has_i(self, needle, at_least=1):
+        """Case-insensitive variant (the old ``needle in content.lower()``)"""
+        return self._declare(Contains(self.file, needle.lower(), True, at_least))
+
+    def _declare(self, pattern):
+        with _registry_lock:
+            _registry[self.file].add(pattern.key)
+        return pattern
+
+
+def source(file):
+    return SourcePatterns(file)
+
+
+def declared_needles(file):
+    with _registry_lock:
+        return frozenset(_registry[file])
+
+
+class Automaton:
+    """Aho-Corasick automaton over the lower-cased needles of one file"""
+
+    def __init__(self, keys):
+        self.keys = sorted(keys)
+        self._automaton = None
+        if ahocorasick is not None and self.keys:
+            # Needles that only differ in case (has("TaxManager") / has("taxManager"),
+            # or has() and has_i() of one word) share a word: it resolves to every key
+            words = collections.defaultdict(list)
+            for key_id, (needle, _) in enumerate(self.keys):
+                words[needle.lower()].append(key_id)
+            self._automaton = ahocorasick.Automaton()
+            for word, key_ids in words.items():
+                self._automaton.add_word(word, key_ids)
+            self._automaton.make_automaton()
+
+    def scan(self, text, folded):
+        """Match table for ``text``; ``folded`` is ``text.lower()``"""
+        if self._automaton is None or len(folded) != len(text):
+            # No C automaton (or lower-casing changed the length, so match
+            # positions can't be checked against the original): answer each
+            # distinct needle with a C-level search on the shared texts instead.
+            return MatchTable(text, folded)
+        keys = self.keys
+        counts = [0] * len(keys)
+        next_start = [0] * len(keys)
+        for end, key_ids in self._automaton.iter(folded):
+            for key_id in key_ids:
+                needle, ignore_case = keys[key_id]
+                start = end - len(needle) + 1
+                # Non-overlapping, like str.count()
+                if start < next_start[key_id]:
+                    continue
+                if not ignore_case and text[start:end + 1] != needle:
+                    continue
+                counts[key_id] += 1
+                next_start[key_id] = end + 1
+        return MatchTable(text, folded, dict(zip(keys, counts)))
+
+
+class MatchTable:
+    """Occurrence counts per (needle, ignore_case) for one file"""
+
+    def __init__(self, text, folded, counts=None):
+        self._text = text
+        self._folded = folded
+        self._counts = counts if counts is not None else {}
+        self._complete = counts is not None
+        self._present = {}
+
+    def has(self, key, at_least=1):
+        count = self._counts.get(key)
+        if count is None:
+            if self._complete:
+                raise KeyError(key)
+            needle, ignore_case = key
+            haystack = self._folded if ignore_case else self._text
+            if at_least == 1:
+                present = self._present.get(key)
+                if present is None:
+                    present = self._present[key] = needle in haystack
+                return present
+            count = self._counts[key] = haystack.count(needle)
+        return count >= at_least
+
+
+class PatternScanner:
+    """Scans each indexed file once and answers declared checks from the result"""
+
+    _shared = {}
+    _shared_lock = threading.Lock()
+
+    def __init__(self, index):
+        self.index = index
+        self._lock = threading.Lock()
+        self._tables = {}  # file -> (sha256, needle keys, MatchTable)
+        self._automata = {}  # file -> (needle keys, Automaton), reused when only the text changed
+        self.scans = 0
+
+    @classmethod
+    def shared(cls, index):
+        with cls._shared_lock:
+            scanner = cls._shared.get(id(index))
+            if scanner is None:
+                scanner = cls._shared[id(index)] = cls(index)
+            return scanner
+
+    def table(self, file):
+        view = self.index.view(file)
+        keys = declared_needles(file)
+        cached = self._tables.get(file)
+        if cached is not None and cached[0] == view.sha256 and cached[1] >= keys:
+            return cached[2]
+        with self._lock:
+            cached = self._tables.get(file)
+            if cached is None or cached[0] != view.sha256 or not cached[1] >= keys:
+                compiled = self._automata.get(file)
+                if compiled is None or compiled[0] != keys:
+                    compiled = self._automata[file] = (keys, Automaton(keys))
+                table = compiled[1].scan(view.text, view.lower)
+                self.scans += 1
+                cached = self._tables[file] = (view.sha256, keys, table)
+            return cached[2]
+
+    def evaluate(self, checks):
+        """Evaluate ``{name: Expr}`` and return ``{name: bool}`` in the same order"""
+        files = {pattern.file for expr in checks.values() for pattern in expr.patterns()}
+        tables = {file: self.table(file) for file in files}
+        return {name: expr.evaluate(tables) for name, expr in checks.items()}
+
+    def check(self, expr):
+        """Evaluate a single expression"""
+        return self.evaluate({"": expr})[""]
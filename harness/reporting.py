@@ -0,0 +1,203 @@
+"""
+Machine-readable harness results: JSON lines and JUnit XML.
+
+``ResultStream`` gets one call per finished test with its status, log_test
+entries, wall time and CPU time (``time.thread_time``, so concurrent tests
+don't bill each other). The JSON report is appended to as each test
+finishes and flushed immediately, so a crashed or killed run still leaves
+everything up to that point. It is never truncated: every run adds a
+``start`` event, one ``test`` event per test, a ``suite`` event per suite
+and a closing ``run`` event, all tagged with the run id, so one file
+accumulates the runtime history dashboards chart::
+
+    {"event": "test", "run": "...", "suite": "backend_test",
+     "test": "test_sol_tax_system_implementation", "status": "PASS",
+     "cached": false, "wall_time": 0.0004, "cpu_time": 0.0004, "checks": [...]}
+
+JUnit XML needs each ``<testsuite>``'s totals up front, so every
+``<testcase>`` is rendered as its test finishes and the file is written
+(atomically) when the stream closes. Per-test CPU time and cache state go
+into ``<properties>`` the way pytest's ``record_property`` puts them.
+
+Closing the stream also stores the run in the SQLite history
+(harness/history.py) that regression checks query.
+
+Standalone suites pick their paths up from ``HARNESS_JSON_REPORT``,
+``HARNESS_JUNIT_REPORT`` and ``HARNESS_HISTORY_DB``; the runner also takes
+``--json`` / ``--junit`` / ``--no-history``.
+"""
+
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+import uuid
+from pathlib import Path
+from xml.sax.saxutils import escape, quoteattr
+
+from harness.history import HistoryStore, default_path
+
+JSON_ENV = "HARNESS_JSON_REPORT"
+JUNIT_ENV = "HARNESS_JUNIT_REPORT"
+
+
+def run_timed(test, log_test):
+    """Call a suite test method the way run_all_tests does: (passed, wall time, CPU time)"""
+    wall_start, cpu_start = time.perf_counter(), time.thread_time()
+    try:
+        passed = bool(test())
+    except Exception as e:
+        log_test(test.__name__, "FAIL", f"Test execution error: {str(e)}")
+        passed = False
+    return passed, time.perf_counter() - wall_start, time.thread_time() - cpu_start
+
+
+class ResultStream:
+    """Streams test outcomes to a JSON lines file, a JUnit XML file and the history database;
+    any of the paths may be None"""
+
+    def __init__(self, json_path=None, junit_path=None, name="harness", history_path=None):
+        self.name = name
+        self.run_id = uuid.uuid4().hex
+        self.junit_path = Path(junit_path) if junit_path else None
+        self.history = HistoryStore(history_path) if history_path else None
+        self._history_rows = []
+        self._lock = threading.Lock()
+        self._suites = {}  # suite -> totals and rendered <testcase> elements, in first-seen order
+        self._wall_start = time.perf_counter()
+        self._cpu_start = time.process_time()
+        self._started = time.time()
+        self._started_at = time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(self._started))
+        self._closed = False
+        self._json = None
+        if json_path:
+            json_path = Path(json_path)
+            json_path.parent.mkdir(parents=True, exist_ok=True)
+            self._json = open(json_path, "a", encoding="utf-8")
+            self._emit({"event": "start", "name": name, "started_at": self._started_at})
+
+    @classmethod
+    def from_env(cls, name="harness"):
+        return cls(os.environ.get(JSON_ENV), os.environ.get(JUNIT_ENV), name, default_path())
+
+    @property
+    def enabled(self):
+        return self._json is not None or self.junit_path is not None or self.history is not None
+
+    def test(self, suite, name, passed, checks, wall_time, cpu_time, cached=False):
+        """Record one finished test; ``checks`` are the log_test entries it produced"""
+        if not self.enabled:
+            return
+        status = "PASS" if passed else "FAIL"
+        with self._lock:
+            totals = self._suites.setdefault(suite, {
+                "tests": 0, "failures": 0, "warnings": 0, "cached": 0,
+                "wall_time": 0.0, "cpu_time": 0.0, "testcases": [],
+            })
+            totals["tests"] += 1
+            totals["failures"] += not passed
+            totals["warnings"] += sum(1 for check in checks if check["status"] == "WARN")
+            totals["cached"] += cached
+            totals["wall_time"] += wall_time
+            totals["cpu_time"] += cpu_time
+            self._history_rows.append((suite, name, status, cached, None if cached else wall_time,
+                                       None if cached else cpu_time))
+            if self.junit_path is not None:
+                totals["testcases"].append(_testcase(suite, name, passed, checks, wall_time, cpu_time, cached))
+            self._emit({
+                "event": "test", "suite": suite, "test": name, "status": status, "cached": cached,
+                "wall_time": round(wall_time, 6), "cpu_time": round(cpu_time, 6), "checks": checks,
+            })
+
+    def close(self):
+        """Write the suite and run totals (and the JUnit file); safe to call twice"""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            wall_time = time.perf_counter() - self._wall_start
+            cpu_time = time.process_time() - self._cpu_start
+            for suite, totals in self._suites.items():
+                self._emit({"event": "suite", "suite": suite, **_rounded(totals)})
+            self._emit({
+                "event": "run", "name": self.name,
+                "tests": sum(totals["tests"] for totals in self._suites.values()),
+                "failures": sum(totals["failures"] for totals in self._suites.values()),
+                "wall_time": round(wall_time, 6), "cpu_time": round(cpu_time, 6),
+            })
+            if self._json is not None:
+                self._json.close()
+            if self.junit_path is not None:
+                self._write_junit(wall_time, cpu_time)
+            if self.history is not None and self._history_rows:
+                try:
+                    self.history.record_run("harness", self.name, self._history_rows, wall_time, cpu_time,
+                                            run_id=self.run_id, started_at=self._started)
+                except sqlite3.Error:
+                    pass  # results are still in the reports; a locked or read-only database shouldn't fail the run
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _emit(self, event):
+        if self._json is None:
+            return
+        event["run"] = self.run_id
+        self._json.write(json.dumps(event, ensure_ascii=False, default=str) + "\n")
+        self._json.flush()
+
+    def _write_junit(self, wall_time, cpu_time):
+        tests = sum(totals["tests"] for totals in self._suites.values())
+        failures = sum(totals["failures"] for totals in self._suites.values())
+        lines = [
+            '<?xml version="1.0" encoding="utf-8"?>',
+            f'<testsuites name={quoteattr(self.name)} tests="{tests}" failures="{failures}" errors="0" '
+            f'time="{wall_time:.6f}">',
+        ]
+        for suite, totals in self._suites.items():
+            lines.append(
+                f'  <testsuite name={quoteattr(suite)} tests="{totals["tests"]}" failures="{totals["failures"]}" '
+                f'errors="0" skipped="0" time="{totals["wall_time"]:.6f}" timestamp="{self._started_at}">'
+            )
+            lines.append(_properties({"cpu_time": f'{totals["cpu_time"]:.6f}', "warnings": totals["warnings"],
+                                      "cached": totals["cached"]}, "    "))
+            lines.extend(totals["testcases"])
+            lines.append("  </testsuite>")
+        lines.append(f'  <!-- run {self.run_id}: process CPU time {cpu_time:.6f}s -->')
+        lines.append("</testsuites>")
+
+        self.junit_path.parent.mkdir(parents=True, exist_ok=True)
+        handle, tmp = tempfile.mkstemp(dir=self.junit_path.parent, suffix=".tmp")
+        with os.fdopen(handle, "w", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n")
+        os.replace(tmp, self.junit_path)
+
+
+def _rounded(totals):
+    return {key: round(value, 6) if isinstance(value, float) else value
+            for key, value in totals.items() if key != "testcases"}
+
+
+def _properties(values, indent):
+    items = "".join(f"{indent}  <property name={quoteattr(key)} value={quoteattr(str(value))}/>\n"
+                    for key, value in values.items())
+    return f"{indent}<properties>\n{items}{indent}</properties>"
+
+
+def _testcase(suite, name, passed, checks, wall_time, cpu_time, cached):
+    lines = [f'    <testcase classname={quoteattr(suite)} name={quoteattr(name)} time="{wall_time:.6f}">']
+    lines.append(_properties({"cpu_time": f"{cpu_time:.6f}", "cached": str(cached).lower()}, "      "))
+    if not passed:
+        failures = [check for check in checks if check["status"] == "FAIL"] or checks
+        message = "; ".join(f'{check["test"]}: {check["message"]}' for check in failures) or "test returned False"
+        lines.append(f"      <failure message={quoteattr(message)}/>")
+    if checks:
+        output = "\n".join(f'{check["status"]} {check["test"]}: {check["message"]}' for check in checks)
+        lines.append(f"      <system-out>{escape(output)}</system-out>")
+    lines.append("    </testcase>")
+    return "\n".join(lines)
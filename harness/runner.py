@@ -0,0 +1,405 @@
+#!/usr/bin/env python3
+"""
+Unified runner for the harness suites.
+
+Discovers the ``test_*`` methods of backend_test, comprehensive_meme_bot_test
+and launch_token_test (in definition order, the same order each suite's
+``run_all_tests`` uses), runs them concurrently and prints one merged report
+in that fixed order, whatever order the tests finished in.
+
+Tests marked ``@io_bound`` (Telegram ``getMe``, ``node -c``) are started
+first so their waits overlap with everything else. Static checks run on the
+same thread pool: they share the process-wide SourceIndex and PatternScanner
+and finish in well under a millisecond once those are warm, which a process
+pool would throw away by re-reading and re-scanning in every worker.
+
+Runs are incremental: results of tests that declare their inputs with
+``@reads(...)`` are kept in a file-hash manifest (harness/manifest.py) and
+replayed while those files and the test code are unchanged. ``--force``
+re-runs everything.
+
+``--json PATH`` / ``--junit PATH`` also write the results, with wall and
+CPU time per test and per suite, through harness/reporting.py; they default
+to ``HARNESS_JSON_REPORT`` / ``HARNESS_JUNIT_REPORT``. Every run is also
+stored in the SQLite history (harness/history.py, ``--no-history`` to skip)
+and the report ends with any tests that got slower or started failing
+against the previous runs.
+
+``--watch`` keeps the process alive after the first run and watches
+telegram-bot/ (inotify, harness/watch.py). The suites stay imported and the
+SourceIndex, pattern automata and symbol tables stay warm. On every save
+only the tests whose ``@reads`` cover a changed file re-run, and the status
+changes are printed. Tests without ``@reads`` only run in the first pass.
+
+``--fake-telegram`` starts harness.fake_telegram on a free local port and
+points TELEGRAM_API_BASE_URL at it, so the connectivity tests run offline.
+
+Exit code is 0 when every test passed and 1 otherwise, as in backend_test.
+
+Usage: python -m harness.runner [--suite NAME ...] [--workers N] [--force] [--fake-telegram]
+                                [--json PATH] [--junit PATH] [--no-history] [--watch]
+"""
+
+import argparse
+import fnmatch
+import importlib
+import io
+import os
+import sqlite3
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+# The suites live in the project root
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from harness.fake_telegram import FakeTelegramServer  # noqa: E402
+from harness.history import HistoryStore, default_path  # noqa: E402
+from harness.manifest import DEFAULT_PATH, Manifest, code_fingerprint, input_hashes  # noqa: E402
+from harness.reporting import JSON_ENV, JUNIT_ENV, ResultStream, run_timed  # noqa: E402
+from harness.source_index import SourceIndex  # noqa: E402
+from harness.tags import declared_reads, is_io_bound  # noqa: E402
+from harness.watch import DirectoryWatcher  # noqa: E402
+
+# (module, tester class) in report order
+SUITES = [
+    ("backend_test", "MemeBotCriticalTester"),
+    ("comprehensive_meme_bot_test", "ComprehensiveMemeBotTester"),
+    ("launch_token_test", "LaunchTokenTester"),
+]
+
+TELEGRAM_BOT_DIR = project_root / "telegram-bot"
+
+_local = threading.local()
+_testers = {}  # module name -> tester instance, so --watch reuses one per suite
+
+
+class _ThreadOutput(io.TextIOBase):
+    """sys.stdout stand-in that sends each test thread's prints to its own buffer"""
+
+    def __init__(self, stream):
+        self.stream = stream
+
+    def write(self, text):
+        buffer = getattr(_local, "output", None)
+        return (buffer or self.stream).write(text)
+
+    def flush(self):
+        self.stream.flush()
+
+
+class TestCase:
+    def __init__(self, suite, name, tester=None, reads=None, fingerprint=None):
+        self.suite = suite
+        self.name = name
+        self.tester = tester
+        self.method = getattr(tester, name) if tester is not None else None
+        self.io_bound = self.method is not None and is_io_bound(self.method)
+        self.reads = reads
+        self.fingerprint = fingerprint
+        self.inputs = None  # {file: sha256} taken before the run
+        self.cached = False
+        # Filled in by run(), or by replay() from the manifest
+        self.passed = None
+        self.results = []  # the log_test entries this test produced
+        self.output = ""
+        self.elapsed = 0.0
+        self.cpu_time = 0.0
+
+    @classmethod
+    def replay(cls, suite, name, entry):
+        case = cls(suite, name)
+        case.cached = True
+        case.passed = entry["passed"]
+        case.results = entry["results"]
+        case.output = entry["output"]
+        return case
+
+    @property
+    def id(self):
+        return f"{self.suite}::{self.name}"
+
+    def run(self):
+        _local.output = io.StringIO()
+        _local.results = self.results
+        try:
+            self.passed, self.elapsed, self.cpu_time = run_timed(self.method, self.tester.log_test)
+        finally:
+            self.output = _local.output.getvalue()
+            _local.output = None
+            _local.results = None
+        return self
+
+
+def _recording(log_test):
+    """Wrap a tester's log_test so entries are attributed to the calling test"""
+    def wrapper(test_name, status, message="", details=None):
+        log_test(test_name, status, message, details)
+        results = getattr(_local, "results", None)
+        if results is not None:
+            results.append({"test": test_name, "status": status, "message": message, "details": details or {}})
+    return wrapper
+
+
+def discover(module_name, class_name, fingerprint):
+    """Instantiate a suite's tester and return its tests in report order"""
+    module = importlib.import_module(module_name)
+    tester_class = getattr(module, class_name)
+    tester = _testers.get(module_name)
+    if tester is None:
+        tester = _testers[module_name] = tester_class()
+        tester.log_test = _recording(tester.log_test)
+    cases = []
+    for name in vars(tester_class):
+        if name.startswith("test_") and callable(getattr(tester_class, name)):
+            reads = declared_reads(getattr(tester_class, name))
+            cases.append(TestCase(module_name, name, tester, reads, fingerprint))
+    return cases
+
+
+def plan(manifest, suite_names=None, force=False):
+    """Tests in report order: replayed from ``manifest`` where inputs are unchanged, else fresh"""
+    index = SourceIndex.shared(TELEGRAM_BOT_DIR)
+    cases = []
+    for module_name, class_name in SUITES:
+        if suite_names and module_name not in suite_names:
+            continue
+        fingerprint = code_fingerprint(project_root / f"{module_name}.py")
+        known = None if force else manifest.suite_tests(module_name, fingerprint)
+        replayed = {}
+        for name, reads in known or ():
+            if reads is None:
+                continue
+            entry = manifest.cached(f"{module_name}::{name}", fingerprint, input_hashes(index, reads))
+            if entry is not None:
+                replayed[name] = TestCase.replay(module_name, name, entry)
+        if known is not None and len(replayed) == len(known):
+            # Everything cached: no need to import the suite at all
+            cases.extend(replayed[name] for name, _ in known)
+            continue
+
+        discovered = discover(module_name, class_name, fingerprint)
+        manifest.record_suite(module_name, fingerprint, [(case.name, case.reads) for case in discovered])
+        for case in discovered:
+            if case.name in replayed:
+                cases.append(replayed[case.name])
+                continue
+            if case.reads is not None:
+                case.inputs = input_hashes(index, case.reads)
+            cases.append(case)
+    return cases
+
+
+def remember(manifest, cases):
+    """Store the outcome of every freshly run test that declared its inputs"""
+    for case in cases:
+        if not case.cached and case.inputs is not None:
+            manifest.record(case.id, case.fingerprint, case.inputs, case.passed, case.results, case.output)
+
+
+def _report(stream, case):
+    stream.test(case.suite, case.name, case.passed, case.results, case.elapsed, case.cpu_time, case.cached)
+
+
+def run(cases, workers=None, stream=None):
+    """Run ``cases`` concurrently, I/O-bound ones first; returns wall time in seconds.
+
+    Each outcome goes to ``stream`` (a ResultStream) as soon as the test finishes.
+    """
+    if stream is not None:
+        for case in cases:
+            if case.cached:
+                _report(stream, case)
+    cases = [case for case in cases if not case.cached]
+    if workers is None:
+        io_count = sum(1 for case in cases if case.io_bound)
+        workers = min(32, io_count + (os.cpu_count() or 1))
+    ordered = sorted(cases, key=lambda case: not case.io_bound)
+    stdout = sys.stdout
+    sys.stdout = _ThreadOutput(stdout)
+    start = time.perf_counter()
+    try:
+        with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="harness") as pool:
+            futures = [pool.submit(case.run) for case in ordered]
+            if stream is not None:
+                for future in futures:
+                    future.add_done_callback(lambda done: _report(stream, done.result()))
+            for future in futures:
+                future.result()
+    finally:
+        sys.stdout = stdout
+    return time.perf_counter() - start
+
+
+def print_report(cases, wall_time):
+    suite = None
+    for case in cases:
+        if case.suite != suite:
+            suite = case.suite
+            print(f"\n📁 {suite}")
+            print("-" * 70)
+        sys.stdout.write(case.output)
+
+    passed = sum(1 for case in cases if case.passed)
+    failed = len(cases) - passed
+    warnings = sum(1 for case in cases for result in case.results if result["status"] == "WARN")
+    cached = sum(1 for case in cases if case.cached)
+    slowest = max((case for case in cases if not case.cached), key=lambda case: case.elapsed, default=None)
+
+    print("\n" + "=" * 70)
+    print("📊 HARNESS TEST SUMMARY")
+    print("=" * 70)
+    print(f"✅ Passed: {passed}")
+    print(f"❌ Failed: {failed}")
+    print(f"⚠️  Warnings: {warnings}")
+    print(f"📋 Total: {len(cases)}")
+    if cached:
+        print(f"♻️  Cached: {cached} (inputs unchanged, not re-run; --force to re-run)")
+    if slowest is not None:
+        serial = sum(case.elapsed for case in cases)
+        print(f"⏱️  Wall time: {wall_time:.2f}s (slowest test {slowest.id}: {slowest.elapsed:.2f}s, "
+              f"sum of all tests: {serial:.2f}s)")
+
+    critical_failures = [(case, result) for case in cases for result in case.results if result["status"] == "FAIL"]
+    if critical_failures:
+        print("\n🚨 CRITICAL ISSUES:")
+        for case, failure in critical_failures:
+            print(f"❌ {case.suite}: {failure['test']}: {failure['message']}")
+    return failed
+
+
+def print_regressions(history):
+    """Tests that got slower or started failing against the previous runs (informational)"""
+    try:
+        found = history.regressions()
+    except sqlite3.Error:
+        return
+    if found:
+        print("\n📉 REGRESSIONS (vs. previous runs; python -m harness.history regressions):")
+        for regression in found:
+            icon = "🐢" if regression.kind == "runtime" else "❌"
+            print(f"{icon} {regression.format()}")
+
+
+def affected(case, changed):
+    """Whether ``case`` declared a read of any of the ``changed`` file names"""
+    return case.reads is not None and any(
+        fnmatch.fnmatchcase(name, pattern) for pattern in case.reads for name in changed
+    )
+
+
+def _icon(status):
+    return "✅" if status == "PASS" else "❌" if status == "FAIL" else "⚠️"
+
+
+def print_changes(changed, cases, previous, elapsed):
+    """One line per re-run, then every test and check whose status flipped"""
+    print(f"\n🔁 {', '.join(changed)} changed: re-ran {len(cases)} tests in {elapsed * 1000:.1f}ms")
+    flipped = 0
+    for case in cases:
+        before = previous.get(case.id)
+        checks_before = {result["test"]: result["status"] for result in before.results} if before else {}
+        check_changes = [result for result in case.results
+                         if result["test"] in checks_before and checks_before[result["test"]] != result["status"]]
+        if before is not None and before.passed == case.passed and not check_changes:
+            continue
+        flipped += 1
+        was = "🆕" if before is None else "✅" if before.passed else "❌"
+        now = "✅" if case.passed else "❌"
+        print(f"   {was} → {now} {case.id}")
+        for result in check_changes:
+            print(f"      {_icon(checks_before[result['test']])} → {_icon(result['status'])} "
+                  f"{result['test']}: {result['message']}")
+    if not flipped:
+        failing = sum(1 for case in cases if not case.passed)
+        print(f"   no status changes ({failing} of {len(cases)} failing)")
+
+
+def watch(manifest, cases, suite_names=None, workers=None):
+    """Re-run affected tests on every change under telegram-bot/ until interrupted"""
+    index = SourceIndex.shared(TELEGRAM_BOT_DIR)
+    previous = {case.id: case for case in cases}
+    fingerprints = {}
+    for module_name, class_name in SUITES:
+        if not suite_names or module_name in suite_names:
+            fingerprints[module_name] = code_fingerprint(project_root / f"{module_name}.py")
+            discover(module_name, class_name, fingerprints[module_name])  # import and warm up front
+
+    with DirectoryWatcher(TELEGRAM_BOT_DIR) as watcher:
+        print(f"\n👀 Watching {TELEGRAM_BOT_DIR.name}/ ({watcher.mechanism}); Ctrl+C to stop")
+        while True:
+            changed = watcher.wait()
+            start = time.perf_counter()
+            index.refresh()
+            rerun = [case for module_name, class_name in SUITES if module_name in fingerprints
+                     for case in discover(module_name, class_name, fingerprints[module_name])
+                     if affected(case, changed)]
+            for case in rerun:
+                case.inputs = input_hashes(index, case.reads)
+            run(rerun, workers)
+            elapsed = time.perf_counter() - start
+            remember(manifest, rerun)
+            manifest.save()
+            print_changes(changed, rerun, previous, elapsed)
+            previous.update((case.id, case) for case in rerun)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the harness suites concurrently with one merged report")
+    parser.add_argument("--suite", action="append", choices=[name for name, _ in SUITES],
+                        help="Only run this suite (repeatable)")
+    parser.add_argument("--workers", type=int, default=None, help="Thread pool size")
+    parser.add_argument("--force", action="store_true", help="Re-run every test, ignoring cached results")
+    parser.add_argument("--manifest", default=DEFAULT_PATH, help="Manifest file for incremental runs")
+    parser.add_argument("--fake-telegram", action="store_true", help="Serve the Bot API locally for connectivity tests")
+    parser.add_argument("--json", default=os.environ.get(JSON_ENV), help="Append JSON lines results to this file")
+    parser.add_argument("--junit", default=os.environ.get(JUNIT_ENV), help="Write JUnit XML results to this file")
+    parser.add_argument("--no-history", action="store_true", help="Don't record this run in the results history")
+    parser.add_argument("--watch", action="store_true", help="Stay running and re-run affected tests on every save")
+    args = parser.parse_args(argv)
+
+    fake_telegram = None
+    history_path = None if args.no_history else default_path()
+    stream = ResultStream(args.json, args.junit, history_path=history_path)
+    try:
+        if args.fake_telegram:
+            fake_telegram = FakeTelegramServer().start()
+            os.environ["TELEGRAM_API_BASE_URL"] = fake_telegram.base_url
+        manifest = Manifest.load(args.manifest)
+        cases = plan(manifest, args.suite, args.force)
+        print(f"🚀 Starting Harness Tests ({len(cases)} tests)...")
+        print("=" * 70)
+        wall_time = run(cases, args.workers, stream)
+        stream.close()
+        remember(manifest, cases)
+        manifest.save()
+        failed = print_report(cases, wall_time)
+        if history_path is not None:
+            print_regressions(HistoryStore(history_path))
+        if args.watch:
+            try:
+                watch(manifest, cases, args.suite, args.workers)
+            except KeyboardInterrupt:
+                print("\n👋 Stopped watching")
+                sys.exit(0)
+    except Exception as e:
+        print(f"❌ Test execution failed: {str(e)}")
+        sys.exit(1)
+    finally:
+        stream.close()
+        if fake_telegram is not None:
+            fake_telegram.stop()
+
+    success_rate = (len(cases) - failed) / len(cases) * 100 if cases else 100.0
+    if failed == 0:
+        print(f"\n🎉 ALL HARNESS TESTS PASSED! Success rate: {success_rate:.1f}%")
+        sys.exit(0)
+    print(f"\n💥 {failed} HARNESS TESTS FAILED! Success rate: {success_rate:.1f}%")
+    sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""
+Load-once index of the telegram-bot sources.
+
+Every harness check inspects the same handful of JS files. ``SourceIndex``
+reads each file a single time, keys its contents by SHA-256 and hands out
+immutable ``SourceView`` objects, so a full run costs one read per file no
+matter how many checks look at it. Identical contents share one decoded
+string.
+"""
+
+import hashlib
+import threading
+from pathlib import Path
+
+
+class SourceView:
+    """Immutable view of one file's contents"""
+
+    __slots__ = ("name", "path", "sha256", "text", "_lower")
+
+    def __init__(self, name, path, sha256, text):
+        object.__setattr__(self, "name", name)
+        object.__setattr__(self, "path", path)
+        object.__setattr__(self, "sha256", sha256)
+        object.__setattr__(self, "text", text)
+        object.__setattr__(self, "_lower", None)
+
+    def __setattr__(self, key, value):
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    @property
+    def lower(self):
+        """Lower-cased text, computed once on first use"""
+        if self._lower is None:
+            object.__setattr__(self, "_lower", self.text.lower())
+        return self._lower
+
+    def __len__(self):
+        return len(self.text)
+
+    def __repr__(self):
+        return f"SourceView({self.name!r}, sha256={self.sha256[:12]}, {len(self.text)} chars)"
+
+
+class SourceIndex:
+    """Maps file names under ``root`` to shared SourceViews"""
+
+    _shared = {}
+    _shared_lock = threading.Lock()
+
+    def __init__(self, root):
+        self.root = Path(root)
+        self._lock = threading.Lock()
+        self._by_name = {}  # name -> (stat signature, SourceView)
+        self._texts = {}  # sha256 -> decoded text
+        self.reads = 0
+
+    @classmethod
+    def shared(cls, root):
+        """Process-wide index for ``root``, so every harness shares one load"""
+        root = Path(root).resolve()
+        with cls._shared_lock:
+            index = cls._shared.get(root)
+            if index is None:
+                index = cls._shared[root] = cls(root)
+            return index
+
+    def view(self, name):
+        """SourceView for ``name``; raises FileNotFoundError like open()"""
+        entry = self._by_name.get(name)
+        if entry is not None:
+            return entry[1]
+        with self._lock:
+            entry = self._by_name.get(name)
+            if entry is None:
+                entry = self._load(name)
+            return entry[1]
+
+    def read(self, name):
+        """Text of ``name`` (what ``open(path).read()`` used to return)"""
+        return self.view(name).text
+
+    def exists(self, name):
+        return name in self._by_name or (self.root / name).exists()
+
+    def refresh(self):
+        """Reload files whose size or mtime changed; returns the changed names"""
+        changed = []
+        with self._lock:
+            for name, (signature, view) in list(self._by_name.items()):
+                try:
+                    current = self._signature(self.root / name)
+                except FileNotFoundError:
+                    del self._by_name[name]
+                    changed.append(name)
+                    continue
+                if current != signature and self._load(name)[1].sha256 != view.sha256:
+                    changed.append(name)
+        return changed
+
+    @staticmethod
+    def _signature(path):
+        stat = path.stat()
+        return (stat.st_size, stat.st_mtime_ns)
+
+    def _load(self, name):
+        path = self.root / name
+        signature = self._signature(path)
+        data = path.read_bytes()
+        self.reads += 1
+        sha256 = hashlib.sha256(data).hexdigest()
+        text = self._texts.get(sha256)
+        if text is None:
+            # Same newline handling as text-mode open()
+            text = self._texts[sha256] = data.decode("utf-8").replace("\r\n", "\n").replace("\r", "\n")
+        entry = (signature, SourceView(name, path, sha256, text))
+        self._by_name[name] = entry
+        return entry
@@ -0,0 +1,39 @@
+"""
+Markers that harness suites put on their test methods for the runner.
+
+    @io_bound
+    def test_telegram_bot_connectivity(self): ...
+
+    @reads("bot.js", "tax-manager.js")
+    def test_sol_tax_system_implementation(self): ...
+
+The markers only set attributes; calling the method directly (as each
+suite's own ``run_all_tests`` does) behaves exactly as before.
+"""
+
+
+def io_bound(method):
+    """Test waits on the network or a subprocess; the runner starts it first"""
+    method.io_bound = True
+    return method
+
+
+def is_io_bound(method):
+    return getattr(method, "io_bound", False)
+
+
+def reads(*files):
+    """Telegram-bot files the test's result depends on.
+
+    The runner caches results of tests that declare their inputs and only
+    re-runs them when one of these files (or the test code) changes. Tests
+    without a declaration always run.
+    """
+    def mark(method):
+        method.reads = tuple(files)
+        return method
+    return mark
+
+
+def declared_reads(method):
+    return getattr(method, "reads", None)
@@ -0,0 +1,143 @@
+"""
+Shared client for the Telegram Bot API calls the harness makes.
+
+Every suite's connectivity test goes through one ``TelegramApi``: a single
+event loop thread owns one pooled async HTTP client (``httpx`` when it is
+installed, otherwise a pooled ``requests.Session`` driven from worker
+threads), so concurrent tests reuse connections instead of each opening
+their own. All calls share one deadline: once ``HARNESS_NETWORK_DEADLINE``
+seconds have passed since the first call, further calls fail immediately
+instead of blocking the run.
+
+The API endpoint comes from ``TELEGRAM_API_BASE_URL`` (default
+https://api.telegram.org). Point it at ``harness.fake_telegram`` to run the
+connectivity tests offline.
+"""
+
+import asyncio
+import json
+import os
+import threading
+import time
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+import requests
+from requests.adapters import HTTPAdapter
+
+DEFAULT_BASE_URL = "https://api.telegram.org"
+
+
+class NetworkError(Exception):
+    """The request could not be completed (connection, timeout or deadline)"""
+
+
+class ApiResponse:
+    def __init__(self, status_code, text):
+        self.status_code = status_code
+        self.text = text
+
+    def json(self):
+        return json.loads(self.text)
+
+
+class TelegramApi:
+    _shared = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self, base_url=None, deadline=None, request_timeout=10.0, max_connections=10):
+        self.base_url = (base_url or os.environ.get("TELEGRAM_API_BASE_URL", DEFAULT_BASE_URL)).rstrip("/")
+        if deadline is None:
+            deadline = float(os.environ.get("HARNESS_NETWORK_DEADLINE", "10"))
+        self.deadline = deadline
+        self.request_timeout = request_timeout
+        self.max_connections = max_connections
+        self._lock = threading.Lock()
+        self._loop = None
+        self._client = None  # created on the loop thread
+        self._session = None
+        self._started_at = None
+
+    @classmethod
+    def shared(cls):
+        """Process-wide client, configured from the environment on first use"""
+        with cls._shared_lock:
+            if cls._shared is None:
+                cls._shared = cls()
+                cls._shared.warm()
+            return cls._shared
+
+    def call(self, token, method, **params):
+        """Blocking Bot API call, safe from any thread; returns an ApiResponse"""
+        future = asyncio.run_coroutine_threadsafe(self.acall(token, method, **params), self._event_loop())
+        return future.result()
+
+    def get_me(self, token):
+        return self.call(token, "getMe")
+
+    async def acall(self, token, method, **params):
+        timeout = self._remaining()
+        url = f"{self.base_url}/bot{token}/{method}"
+        if httpx is not None:
+            self._ensure_client()
+            try:
+                response = await self._client.get(url, params=params or None, timeout=timeout)
+            except httpx.HTTPError as e:
+                raise NetworkError(f"{type(e).__name__}: {e}") from e
+            return ApiResponse(response.status_code, response.text)
+
+        if self._session is None:
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.max_connections)
+            self._session = requests.Session()
+            self._session.mount("http://", adapter)
+            self._session.mount("https://", adapter)
+        try:
+            response = await asyncio.to_thread(self._session.get, url, params=params or None, timeout=timeout)
+        except requests.exceptions.RequestException as e:
+            raise NetworkError(str(e)) from e
+        return ApiResponse(response.status_code, response.text)
+
+    def warm(self):
+        """Build the HTTP client on the loop thread now, off the caller's path"""
+        if httpx is not None:
+            self._event_loop().call_soon_threadsafe(self._ensure_client)
+
+    def _ensure_client(self):
+        # Only ever called on the loop thread
+        if self._client is None:
+            limits = httpx.Limits(max_connections=self.max_connections,
+                                  max_keepalive_connections=self.max_connections)
+            # Loading the CA bundle is slow; skip it for a plain-http fake server
+            verify = self.base_url.startswith("https://")
+            self._client = httpx.AsyncClient(limits=limits, verify=verify)
+
+    def close(self):
+        with self._lock:
+            loop, self._loop = self._loop, None
+        if loop is None:
+            return
+        if self._client is not None:
+            asyncio.run_coroutine_threadsafe(self._client.aclose(), loop).result()
+            self._client = None
+        if self._session is not None:
+            self._session.close()
+            self._session = None
+        loop.call_soon_threadsafe(loop.stop)
+
+    def _event_loop(self):
+        with self._lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                threading.Thread(target=self._loop.run_forever, name="telegram-api", daemon=True).start()
+            return self._loop
+
+    def _remaining(self):
+        if self._started_at is None:
+            self._started_at = time.monotonic()
+        remaining = self.deadline - (time.monotonic() - self._started_at)
+        if remaining <= 0:
+            raise NetworkError(f"network deadline of {self.deadline:.0f}s exceeded")
+        return min(self.request_timeout, remaining)
@@ -0,0 +1,169 @@
+"""
+File change notifications for ``python -m harness.runner --watch``.
+
+``DirectoryWatcher(root).wait()`` blocks until files directly under ``root``
+change and returns their names. On Linux it uses inotify: through
+``inotify_simple`` when that is installed, otherwise straight through libc
+with ctypes. Elsewhere it falls back to polling size and mtime. Bursts of
+events (an editor writing a temp file, then renaming it over the original)
+are coalesced into one batch.
+"""
+
+import ctypes
+import ctypes.util
+import os
+import re
+import select
+import struct
+import sys
+import time
+from pathlib import Path
+
+try:
+    import inotify_simple
+except ImportError:
+    inotify_simple = None
+
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_DELETE = 0x00000200
+WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_DELETE
+
+_EVENT_HEADER = struct.Struct("iIII")  # wd, mask, cookie, len
+
+
+# Scratch files written next to the real one: sed -i's sedXXXXXX, the 4913
+# (then 5036, ...) vim creates to probe the directory, emacs' #autosave#
+_SCRATCH_NAME = re.compile(r"sed[A-Za-z0-9]{6}|\d+|#.*#")
+
+
+def _ignored(name):
+    """Editor swap, backup, scratch and hidden files"""
+    return (
+        not name or name.startswith(".") or name.endswith(("~", ".swp", ".swo", ".swx", ".tmp"))
+        or _SCRATCH_NAME.fullmatch(name) is not None
+    )
+
+
+class _LibcInotify:
+    """Minimal inotify binding: one watch, raw event reads"""
+
+    def __init__(self, root):
+        libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        self.fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        if libc.inotify_add_watch(self.fd, os.fsencode(root), WATCH_MASK) < 0:
+            errno = ctypes.get_errno()
+            os.close(self.fd)
+            raise OSError(errno, f"inotify_add_watch failed for {root}")
+
+    def read(self, timeout):
+        """Names from the events available within ``timeout`` seconds"""
+        if not select.select([self.fd], [], [], timeout)[0]:
+            return set()
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return set()
+        names, offset = set(), 0
+        while offset < len(data):
+            _, _, _, length = _EVENT_HEADER.unpack_from(data, offset)
+            offset += _EVENT_HEADER.size
+            names.add(os.fsdecode(data[offset:offset + length].rstrip(b"\0")))
+            offset += length
+        return names
+
+    def close(self):
+        os.close(self.fd)
+
+
+class _InotifySimple:
+    def __init__(self, root):
+        self._inotify = inotify_simple.INotify()
+        self._inotify.add_watch(root, WATCH_MASK)
+
+    def read(self, timeout):
+        return {event.name for event in self._inotify.read(timeout=int(timeout * 1000))}
+
+    def close(self):
+        self._inotify.close()
+
+
+class _Polling:
+    """Compares (size, mtime) of every file under root on each call"""
+
+    def __init__(self, root, interval=0.25):
+        self.root = Path(root)
+        self.interval = interval
+        self._snapshot = self._scan()
+
+    def _scan(self):
+        snapshot = {}
+        for path in self.root.iterdir():
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            if path.is_file():
+                snapshot[path.name] = (stat.st_size, stat.st_mtime_ns)
+        return snapshot
+
+    def read(self, timeout):
+        time.sleep(min(timeout, self.interval) if timeout else 0)
+        current = self._scan()
+        changed = {name for name in current.keys() | self._snapshot.keys()
+                   if current.get(name) != self._snapshot.get(name)}
+        self._snapshot = current
+        return changed
+
+    def close(self):
+        pass
+
+
+class DirectoryWatcher:
+    def __init__(self, root, debounce=0.05):
+        self.root = Path(root)
+        self.debounce = debounce
+        self.backend = self._open(self.root)
+
+    @staticmethod
+    def _open(root):
+        if sys.platform.startswith("linux"):
+            try:
+                if inotify_simple is not None:
+                    return _InotifySimple(root)
+                return _LibcInotify(root)
+            except (OSError, AttributeError):
+                pass  # out of watches, or a libc without inotify
+        return _Polling(root)
+
+    @property
+    def mechanism(self):
+        return "polling" if isinstance(self.backend, _Polling) else "inotify"
+
+    def wait(self, timeout=None):
+        """Names of changed files, sorted; empty if ``timeout`` seconds pass without one"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        changed = set()
+        while not changed:
+            remaining = 1.0 if deadline is None else deadline - time.monotonic()
+            if remaining <= 0:
+                return []
+            changed = {name for name in self.backend.read(remaining) if not _ignored(name)}
+        while True:
+            # Let the rest of an editor's save land before reporting
+            more = {name for name in self.backend.read(self.debounce) if not _ignored(name)}
+            if not more:
+                return sorted(changed)
+            changed |= more
+
+    def close(self):
+        self.backend.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
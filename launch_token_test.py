@@ -13,18 +13,72 @@ import os
 import sys
 import json
 import time
-import subprocess
-import requests
 from pathlib import Path
 
 # Add the project root to Python path
 project_root = Path(__file__).parent
 sys.path.append(str(project_root))
 
+from harness.js_syntax import SyntaxChecker
+from harness.patterns import PatternScanner, source
+from harness.reporting import ResultStream, run_timed
+from harness.source_index import SourceIndex
+from harness.tags import io_bound, reads
+from harness.telegram_api import NetworkError, TelegramApi
+
+# Source checks, compiled into one scan per file (see harness/patterns.py)
+BOT = source("bot.js")
+
+LAUNCH_COMMAND_CHECKS = {
+    "Launch Command Registration": BOT.has("bot.onText(/\\/launch/"),
+    "Launch Command Handler": BOT.has("/launch"),
+    "Launch Function Call": BOT.has("startTokenCreation"),
+    "Command Error Handling": BOT.has("try {") & BOT.has("catch")
+}
+
+LAUNCH_BUTTON_CHECKS = {
+    "Launch Token Button": BOT.has("callback_data: 'launch_token'"),
+    "Launch Token Callback Handler": BOT.has("data === 'launch_token'"),
+    "Button in Start Menu": BOT.has("'🚀 Launch Coin'"),
+    "Callback Query Handler": BOT.has("bot.on('callback_query'"),
+    "Button Response": BOT.has("startTokenCreation")
+}
+
+TOKEN_CREATION_FLOW_CHECKS = {
+    "StartTokenCreation Function": BOT.has("function startTokenCreation("),
+    "User Session Management": BOT.has("botState.userSessions"),
+    "Token Creation Steps": BOT.has("waiting_for_name"),
+    "Input Validation": BOT.has("validateTokenParams"),
+    "Token Manager Integration": BOT.has("tokenManager"),
+    "Multi-Step Flow": BOT.has("step:") & BOT.has("tokenData:")
+}
+
+ERROR_HANDLING_CHECKS = {
+    "Try-Catch Blocks": BOT.has("try {", at_least=2),
+    "Error Logging": BOT.has("console.error"),
+    "User Error Messages": BOT.has("❌"),
+    "Fallback Handling": BOT.has("catch (error)"),
+    "Session Cleanup": BOT.has("botState.userSessions.delete"),
+    "Validation Errors": BOT.has("validateTokenParams") & BOT.has("errors")
+}
+
+BOT_RESPONSE_CHECKS = {
+    "Bot Send Message": BOT.has("bot.sendMessage"),
+    "Launch Response Message": BOT.has("Create New Meme Coin") | BOT.has_i("token creation"),
+    "Interactive UI": BOT.has("reply_markup"),
+    "Step-by-Step Guidance": BOT.has("Step 1") | BOT.has("step:"),
+    "Callback Query Answers": BOT.has("bot.answerCallbackQuery"),
+    "Message Formatting": BOT.has("parse_mode")
+}
+
 class LaunchTokenTester:
     def __init__(self):
         self.telegram_bot_dir = project_root / "telegram-bot"
         self.bot_token = None
+        self.sources = SourceIndex.shared(self.telegram_bot_dir)
+        self.scanner = PatternScanner.shared(self.sources)
+        self.telegram = TelegramApi.shared()
+        self.syntax = SyntaxChecker.shared(self.sources)
         self.test_results = []
         self.load_config()
     
@@ -61,6 +115,7 @@ class LaunchTokenTester:
             for key, value in details.items():
                 print(f"   {key}: {value}")
     
+    @reads("bot.js")
     def test_launch_command_handler(self):
         """Test 1: Verify /launch command is registered and working"""
         test_name = "Launch Command Handler"
@@ -71,16 +126,8 @@ class LaunchTokenTester:
                 self.log_test(test_name, "FAIL", "bot.js file not found")
                 return False
             
-            with open(bot_js_path, 'r') as f:
-                bot_content = f.read()
-            
             # Check for /launch command registration
-            launch_checks = {
-                "Launch Command Registration": "bot.onText(/\\/launch/" in bot_content,
-                "Launch Command Handler": "/launch" in bot_content,
-                "Launch Function Call": "startTokenCreation" in bot_content,
-                "Command Error Handling": "try {" in bot_content and "catch" in bot_content
-            }
+            launch_checks = self.scanner.evaluate(LAUNCH_COMMAND_CHECKS)
             
             failed_checks = []
             for check, passed in launch_checks.items():
@@ -103,23 +150,14 @@ class LaunchTokenTester:
             self.log_test(test_name, "FAIL", f"Error analyzing launch command: {str(e)}")
             return False
     
+    @reads("bot.js")
     def test_launch_token_button(self):
         """Test 2: Test 'launch_token' callback handler"""
         test_name = "Launch Token Button"
         
         try:
-            bot_js_path = self.telegram_bot_dir / "bot.js"
-            with open(bot_js_path, 'r') as f:
-                bot_content = f.read()
-            
             # Check for launch_token callback handler
-            button_checks = {
-                "Launch Token Button": "callback_data: 'launch_token'" in bot_content,
-                "Launch Token Callback Handler": "data === 'launch_token'" in bot_content,
-                "Button in Start Menu": "'🚀 Launch Coin'" in bot_content,
-                "Callback Query Handler": "bot.on('callback_query'" in bot_content,
-                "Button Response": "startTokenCreation" in bot_content
-            }
+            button_checks = self.scanner.evaluate(LAUNCH_BUTTON_CHECKS)
             
             failed_checks = []
             for check, passed in button_checks.items():
@@ -142,24 +180,14 @@ class LaunchTokenTester:
             self.log_test(test_name, "FAIL", f"Error analyzing launch token button: {str(e)}")
             return False
     
+    @reads("bot.js")
     def test_token_creation_flow(self):
         """Test 3: Test startTokenCreation function executes"""
         test_name = "Token Creation Flow"
         
         try:
-            bot_js_path = self.telegram_bot_dir / "bot.js"
-            with open(bot_js_path, 'r') as f:
-                bot_content = f.read()
-            
             # Check for startTokenCreation function and flow
-            flow_checks = {
-                "StartTokenCreation Function": "function startTokenCreation(" in bot_content,
-                "User Session Management": "botState.userSessions" in bot_content,
-                "Token Creation Steps": "waiting_for_name" in bot_content,
-                "Input Validation": "validateTokenParams" in bot_content,
-                "Token Manager Integration": "tokenManager" in bot_content,
-                "Multi-Step Flow": "step:" in bot_content and "tokenData:" in bot_content
-            }
+            flow_checks = self.scanner.evaluate(TOKEN_CREATION_FLOW_CHECKS)
             
             failed_checks = []
             for check, passed in flow_checks.items():
@@ -182,24 +210,14 @@ class LaunchTokenTester:
             self.log_test(test_name, "FAIL", f"Error analyzing token creation flow: {str(e)}")
             return False
     
+    @reads("bot.js")
     def test_error_handling(self):
         """Test 4: Test that launch errors are caught and handled"""
         test_name = "Error Handling"
         
         try:
-            bot_js_path = self.telegram_bot_dir / "bot.js"
-            with open(bot_js_path, 'r') as f:
-                bot_content = f.read()
-            
             # Check for error handling in launch functionality
-            error_checks = {
-                "Try-Catch Blocks": bot_content.count("try {") >= 2,
-                "Error Logging": "console.error" in bot_content,
-                "User Error Messages": "❌" in bot_content,
-                "Fallback Handling": "catch (error)" in bot_content,
-                "Session Cleanup": "botState.userSessions.delete" in bot_content,
-                "Validation Errors": "validateTokenParams" in bot_content and "errors" in bot_content
-            }
+            error_checks = self.scanner.evaluate(ERROR_HANDLING_CHECKS)
             
             failed_checks = []
             for check, passed in error_checks.items():
@@ -225,24 +243,14 @@ class LaunchTokenTester:
             self.log_test(test_name, "FAIL", f"Error analyzing error handling: {str(e)}")
             return False
     
+    @reads("bot.js")
     def test_bot_response(self):
         """Test 5: Test that the bot responds to launch requests"""
         test_name = "Bot Response"
         
         try:
-            bot_js_path = self.telegram_bot_dir / "bot.js"
-            with open(bot_js_path, 'r') as f:
-                bot_content = f.read()
-            
             # Check for bot response mechanisms
-            response_checks = {
-                "Bot Send Message": "bot.sendMessage" in bot_content,
-                "Launch Response Message": "Create New Meme Coin" in bot_content or "token creation" in bot_content.lower(),
-                "Interactive UI": "reply_markup" in bot_content,
-                "Step-by-Step Guidance": "Step 1" in bot_content or "step:" in bot_content,
-                "Callback Query Answers": "bot.answerCallbackQuery" in bot_content,
-                "Message Formatting": "parse_mode" in bot_content
-            }
+            response_checks = self.scanner.evaluate(BOT_RESPONSE_CHECKS)
             
             failed_checks = []
             for check, passed in response_checks.items():
@@ -265,26 +273,25 @@ class LaunchTokenTester:
             self.log_test(test_name, "FAIL", f"Error analyzing bot response: {str(e)}")
             return False
     
+    @io_bound
+    @reads("bot.js")
     def test_bot_syntax_validation(self):
         """Test 6: Verify Bot.js syntax is correct"""
         test_name = "Bot.js Syntax Validation"
         
         try:
-            bot_js_path = self.telegram_bot_dir / "bot.js"
+            # Checked by Node together with every other module (one process)
+            diagnostic = self.syntax.diagnostic("bot.js")
             
-            # Use Node.js to check syntax
-            result = subprocess.run(
-                ['node', '-c', str(bot_js_path)],
-                capture_output=True,
-                text=True,
-                cwd=self.telegram_bot_dir
-            )
+            if diagnostic is None:
+                self.log_test(test_name, "FAIL", "bot.js file not found")
+                return False
             
-            if result.returncode == 0:
+            if diagnostic.ok:
                 self.log_test(test_name, "PASS", "Bot.js syntax is valid")
                 return True
             else:
-                self.log_test(test_name, "FAIL", f"Bot.js syntax error: {result.stderr}")
+                self.log_test(test_name, "FAIL", f"Bot.js syntax error: {diagnostic.format()}")
                 return False
                 
         except FileNotFoundError:
@@ -294,8 +301,42 @@ class LaunchTokenTester:
             self.log_test(test_name, "FAIL", f"Error checking syntax: {str(e)}")
             return False
     
+    @io_bound
+    @reads("*.js")
+    def test_module_syntax_validation(self):
+        """Test 7: Verify every telegram-bot module parses"""
+        test_name = "Module Syntax Validation"
+        
+        try:
+            diagnostics = self.syntax.check_all()
+            
+            invalid_modules = [
+                f"{name}:{diagnostic.line}: {diagnostic.error}: {diagnostic.message}"
+                for name, diagnostic in diagnostics.items() if not diagnostic.ok
+            ]
+            
+            details = {
+                "Modules Checked": len(diagnostics),
+                "Invalid Modules": invalid_modules
+            }
+            
+            if invalid_modules:
+                self.log_test(test_name, "FAIL", f"{len(invalid_modules)} modules have syntax errors", details)
+                return False
+            
+            self.log_test(test_name, "PASS", f"All {len(diagnostics)} modules parse", details)
+            return True
+            
+        except FileNotFoundError:
+            self.log_test(test_name, "WARN", "Node.js not available for syntax check")
+            return True
+        except Exception as e:
+            self.log_test(test_name, "FAIL", f"Error checking syntax: {str(e)}")
+            return False
+    
+    @io_bound
     def test_telegram_bot_connectivity(self):
-        """Test 7: Test Telegram Bot API connectivity"""
+        """Test 8: Test Telegram Bot API connectivity"""
         test_name = "Telegram Bot API Connectivity"
         
         if not self.bot_token:
@@ -303,9 +344,8 @@ class LaunchTokenTester:
             return True
         
         try:
-            # Test bot token validity
-            url = f"https://api.telegram.org/bot{self.bot_token}/getMe"
-            response = requests.get(url, timeout=10)
+            # Test bot token validity (TELEGRAM_API_BASE_URL selects the endpoint)
+            response = self.telegram.get_me(self.bot_token)
             
             if response.status_code == 200:
                 bot_info = response.json()
@@ -324,7 +364,7 @@ class LaunchTokenTester:
                 self.log_test(test_name, "FAIL", f"HTTP {response.status_code}: {response.text}")
                 return False
                 
-        except requests.exceptions.RequestException as e:
+        except NetworkError as e:
             self.log_test(test_name, "FAIL", f"Network error: {str(e)}")
             return False
         except Exception as e:
@@ -343,6 +383,7 @@ class LaunchTokenTester:
             self.test_error_handling,
             self.test_bot_response,
             self.test_bot_syntax_validation,
+            self.test_module_syntax_validation,
             self.test_telegram_bot_connectivity
         ]
         
@@ -350,16 +391,16 @@ class LaunchTokenTester:
         failed = 0
         warnings = 0
         
+        report = ResultStream.from_env("launch_token_test")
         for test in tests:
-            try:
-                result = test()
-                if result:
-                    passed += 1
-                else:
-                    failed += 1
-            except Exception as e:
-                self.log_test(test.__name__, "FAIL", f"Test execution error: {str(e)}")
+            first = len(self.test_results)
+            ok, wall_time, cpu_time = run_timed(test, self.log_test)
+            if ok:
+                passed += 1
+            else:
                 failed += 1
+            report.test("launch_token_test", test.__name__, ok, self.test_results[first:], wall_time, cpu_time)
+        report.close()
         
         # Count warnings
         warnings = sum(1 for result in self.test_results if result['status'] == 'WARN')
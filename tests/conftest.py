@@ -0,0 +1,62 @@
+"""Shared fixtures: the backend app served from an in-memory MongoDB (mongomock-motor)."""
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+import pytest
+
+BACKEND_DIR = Path(__file__).parent.parent / "backend"
+sys.path.insert(0, str(BACKEND_DIR))
+
+# Read when server.py is imported; load_dotenv never overrides them
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+os.environ.setdefault("DB_NAME", "test_database")
+os.environ["MEMORY_SAMPLE_SECONDS"] = "0"
+os.environ["PROFILE_DIR"] = tempfile.mkdtemp(prefix="profiles-")
+
+ADMIN_TOKEN = "test-admin-token"
+ADMIN = {"X-Admin-Token": ADMIN_TOKEN}
+
+
+@pytest.fixture(scope="session")
+def server():
+    import server
+
+    return server
+
+
+@pytest.fixture
+def client(server, monkeypatch):
+    """TestClient on a fresh database, with every in-memory cache and index reset."""
+    from fastapi.testclient import TestClient
+    from mongomock_motor import AsyncMongoMockClient
+
+    from changes import SequenceAllocator
+    from clients import ClientDirectory
+    from counts import CountCache
+    from database import LazyDatabase
+    from partitions import PartitionRouter
+    from read_routing import ReadRouter
+    from sketches import RollingSketches
+
+    monkeypatch.setenv("ADMIN_TOKEN", ADMIN_TOKEN)
+    # LazyDatabase builds its client on first use; make that client an in-memory one
+    monkeypatch.setattr("motor.motor_asyncio.AsyncIOMotorClient", AsyncMongoMockClient)
+    monkeypatch.setattr(server, "db", LazyDatabase(os.environ["MONGO_URL"], os.environ["DB_NAME"]))
+    monkeypatch.setattr(server, "read_router", ReadRouter())
+    monkeypatch.setattr(server, "partitions", PartitionRouter("status_checks", codec=server.status_codec))
+    monkeypatch.setattr(server, "sequence", SequenceAllocator())
+    monkeypatch.setattr(server, "client_directory", ClientDirectory())
+    monkeypatch.setattr(server, "status_sketches", RollingSketches())
+    monkeypatch.setattr(server, "count_cache", CountCache(ttl=5))
+    with TestClient(server.app) as test_client:
+        yield test_client
+
+
+@pytest.fixture
+def post_checks(client):
+    def post(*names):
+        return [client.post("/api/status", json={"client_name": name}).json() for name in names]
+
+    return post
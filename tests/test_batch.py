@@ -0,0 +1,77 @@
+import msgpack
+
+from tests.conftest import ADMIN
+
+
+def run_batch(client, *requests, headers=None):
+    response = client.post("/api/batch", json={"requests": list(requests)}, headers=headers)
+    assert response.status_code == 200, response.text
+    if response.headers["content-type"] == "application/msgpack":
+        payload = msgpack.unpackb(response.content)
+    else:
+        payload = response.json()
+    return {result["id"]: result for result in payload["responses"]}
+
+
+def test_results_come_back_per_sub_request(client, post_checks):
+    post_checks("alpha", "beta")
+
+    results = run_batch(
+        client,
+        {"id": "list", "path": "/api/status", "query": {"limit": 1}},
+        {"id": "count", "path": "/api/status/count", "query": {"client_name": "alpha"}},
+        {"id": "head", "method": "HEAD", "path": "/api/status"},
+    )
+    # Sub-requests run concurrently, so the write gets a batch of its own
+    written = run_batch(client, {"id": "write", "method": "POST", "path": "/api/status", "body": {"client_name": "gamma"}})
+
+    assert results["list"]["status"] == 200 and len(results["list"]["body"]) == 1
+    assert results["count"]["body"] == {"count": 1}
+    assert results["head"]["headers"]["x-total-count"] == "2"
+    assert written["write"]["body"]["client_name"] == "gamma"
+
+
+def test_failures_stay_in_their_own_entry(client):
+    results = run_batch(
+        client,
+        {"id": "invalid", "path": "/api/status", "query": {"limit": 0}},
+        {"id": "missing", "path": "/api/nope"},
+        {"id": "nested", "method": "POST", "path": "/api/batch", "body": {"requests": []}},
+        {"id": "outside", "path": "/docs"},
+        {"id": "ok", "path": "/api/"},
+    )
+
+    assert results["invalid"]["status"] == 422
+    assert results["missing"]["status"] == 404
+    assert results["nested"]["status"] == 400
+    assert results["outside"]["status"] == 400
+    assert results["ok"]["body"] == {"message": "Hello World"}
+
+
+def test_sub_requests_always_answer_json(client, post_checks):
+    post_checks("alpha")
+
+    results = run_batch(
+        client,
+        {"id": "count", "path": "/api/status/count", "headers": {"Accept": "application/msgpack"}},
+        headers={"Accept": "application/msgpack", "Accept-Encoding": "gzip"},
+    )
+
+    # The batch itself is MessagePack here; what matters is the sub-result it carries
+    assert results["count"]["headers"]["content-type"] == "application/json"
+    assert results["count"]["body"] == {"count": 1}
+
+
+def test_admin_routes_use_the_batch_admin_token(client):
+    memory = {"id": "memory", "path": "/api/admin/memory"}
+
+    assert run_batch(client, memory)["memory"]["status"] == 403
+    result = run_batch(client, memory, headers=ADMIN)["memory"]
+    assert result["status"] == 200
+    assert "rss" in result["body"]
+
+
+def test_batch_size_is_capped(client, server):
+    assert client.post("/api/batch", json={"requests": []}).status_code == 400
+    too_many = [{"path": "/api/"}] * (server.batch_dispatcher.max_requests + 1)
+    assert client.post("/api/batch", json={"requests": too_many}).status_code == 400
@@ -0,0 +1,126 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+from mongomock_motor import AsyncMongoMockClient
+from pymongo import ReadPreference
+
+from changes import MULTI_WORKER_SETTLE_SECONDS, SequenceAllocator, read_changes, settle_seconds_from_env
+from read_routing import SECONDARY_PREFERRED, ReadRouter
+from storage import LegacyCodec
+
+
+def changes(client, since=0, limit=100):
+    response = client.get("/api/status/changes", params={"since": since, "limit": limit})
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def test_feed_pages_through_inserts_in_sequence_order(client, post_checks):
+    created = post_checks("alpha", "beta", "gamma")
+
+    first = changes(client, limit=2)
+    rest = changes(client, since=first["next_since"])
+
+    seen = first["changes"] + rest["changes"]
+    assert [change["id"] for change in seen] == [check["id"] for check in created]
+    assert [change["seq"] for change in seen] == [1, 2, 3]
+    assert rest["next_since"] == 3
+
+
+def test_caught_up_consumer_keeps_its_position(client, post_checks):
+    post_checks("alpha")
+    caught_up = changes(client, since=1)
+
+    assert caught_up == {"changes": [], "next_since": 1}
+    post_checks("beta")
+    assert [change["client_name"] for change in changes(client, since=1)["changes"]] == ["beta"]
+
+
+def test_stream_ingest_numbers_a_whole_batch(client):
+    lines = "".join(f'{{"client_name": "c{i}"}}\n' for i in range(5))
+    response = client.post("/api/status/stream", content=lines, headers={"Content-Type": "application/x-ndjson"})
+    assert response.status_code == 200
+
+    assert [change["seq"] for change in changes(client)["changes"]] == [1, 2, 3, 4, 5]
+
+
+def test_checks_without_a_number_stay_out_of_the_feed(client, server, post_checks):
+    client.portal.call(server.db.status_checks.insert_one, {"id": "old", "client_name": "legacy", "timestamp": datetime.utcnow()})
+    post_checks("alpha")
+
+    assert [change["client_name"] for change in changes(client)["changes"]] == ["alpha"]
+
+
+def test_horizon_stops_below_numbers_still_being_inserted():
+    async def scenario():
+        counters = AsyncMongoMockClient()["test"].counters
+        allocator = SequenceAllocator()
+        first = await allocator.allocate(counters, 2)
+        second = await allocator.allocate(counters)
+
+        allocator.release(second)
+        held_back = allocator.horizon()
+        allocator.release(first)
+        return first, second, held_back, allocator.horizon()
+
+    first, second, held_back, released = asyncio.run(scenario())
+
+    assert (first, second) == (1, 3)
+    assert held_back == 0
+    assert released is None
+
+
+def test_numbers_committed_out_of_order_by_two_workers_are_served_in_order():
+    fields = LegacyCodec.fields
+
+    async def scenario():
+        database = AsyncMongoMockClient()["test"]
+        checks = database.status_checks
+        slow_worker, fast_worker = SequenceAllocator(), SequenceAllocator()
+        first = await slow_worker.allocate(database.counters)
+        second = await fast_worker.allocate(database.counters)
+        created = datetime.utcnow()
+
+        # The later number lands first; the fast worker knows nothing of the slow one's allocation
+        await checks.insert_one({"id": "b", "seq": second, "timestamp": created})
+        fast_worker.release(second)
+        early = await read_changes([checks], 0, 10, fields, fast_worker.horizon(), MULTI_WORKER_SETTLE_SECONDS)
+
+        await checks.insert_one({"id": "a", "seq": first, "timestamp": created})
+        slow_worker.release(first)
+        # Once both are older than the settle window they come back in number order
+        settled = created - timedelta(seconds=MULTI_WORKER_SETTLE_SECONDS + 1)
+        await checks.update_many({}, {"$set": {"timestamp": settled}})
+        late = await read_changes([checks], 0, 10, fields, fast_worker.horizon(), MULTI_WORKER_SETTLE_SECONDS)
+        return early, late
+
+    early, late = asyncio.run(scenario())
+
+    assert early == []
+    assert [document["id"] for document in late] == ["a", "b"]
+
+
+@pytest.mark.parametrize("environ, expected", [
+    ({}, 0.0),
+    ({"WEB_CONCURRENCY": "1"}, 0.0),
+    ({"WEB_CONCURRENCY": "4"}, MULTI_WORKER_SETTLE_SECONDS),
+    ({"WEB_CONCURRENCY": "4", "STATUS_CHANGES_SETTLE_SECONDS": "0.5"}, 0.5),
+])
+def test_settle_window_defaults_on_with_several_workers(environ, expected):
+    assert settle_seconds_from_env(environ) == expected
+
+
+def test_feed_reads_the_primary_even_when_listings_use_secondaries(client, server, monkeypatch, post_checks):
+    monkeypatch.setattr(server, "read_router", ReadRouter(SECONDARY_PREFERRED))
+    post_checks("alpha")
+    seen = []
+
+    async def spy(collections, *args, **kwargs):
+        seen.extend(collection.read_preference for collection in collections)
+        return await read_changes(collections, *args, **kwargs)
+
+    monkeypatch.setattr(server, "read_changes", spy)
+
+    assert [change["client_name"] for change in changes(client)["changes"]] == ["alpha"]
+    assert seen and all(preference == ReadPreference.PRIMARY for preference in seen)
@@ -0,0 +1,32 @@
+from datetime import datetime
+
+from clients import ClientDirectory
+
+
+def lookup(client, prefix="", limit=20):
+    response = client.get("/api/clients", params={"prefix": prefix, "limit": limit})
+    assert response.status_code == 200, response.text
+    return response.json()["clients"]
+
+
+def test_prefix_lookup_is_case_insensitive_and_ordered(client, post_checks):
+    post_checks("Beta", "alpha", "Alpine", "gamma", "alpha")
+
+    assert lookup(client) == ["alpha", "Alpine", "Beta", "gamma"]
+    assert lookup(client, "AL") == ["alpha", "Alpine"]
+    assert lookup(client, "alpi") == ["Alpine"]
+    assert lookup(client, "delta") == []
+    assert lookup(client, "a", limit=1) == ["alpha"]
+
+
+def test_names_already_stored_are_loaded_on_first_lookup(client, server, monkeypatch):
+    stored = [{"id": str(i), "client_name": name, "timestamp": datetime.utcnow()} for i, name in enumerate("xyz")]
+    client.portal.call(server.db.status_checks.insert_many, stored)
+    monkeypatch.setattr(server, "client_directory", ClientDirectory())
+
+    assert lookup(client) == ["x", "y", "z"]
+
+
+def test_limit_is_bounded(client):
+    assert client.get("/api/clients", params={"limit": 0}).status_code == 422
+    assert client.get("/api/clients", params={"limit": 1001}).status_code == 422
@@ -0,0 +1,93 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from counts import CountCache, StatusFilter, count_status_checks
+
+
+def test_count_filters_by_client_and_time(client, post_checks):
+    post_checks("alpha", "alpha", "beta")
+    now = datetime.now(timezone.utc)
+
+    def count(**params):
+        return client.get("/api/status/count", params=params).json()["count"]
+
+    assert count() == 3
+    assert count(client_name="alpha") == 2
+    assert count(client_name="nobody") == 0
+    assert count(since=(now - timedelta(minutes=1)).isoformat()) == 3
+    assert count(until=(now - timedelta(minutes=1)).isoformat()) == 0
+
+
+def test_head_status_reports_the_total_without_a_body(client, post_checks):
+    post_checks("alpha", "beta")
+
+    response = client.head("/api/status", params={"client_name": "beta"})
+
+    assert response.status_code == 200
+    assert response.headers["x-total-count"] == "1"
+    assert response.content == b""
+
+
+def test_cached_counts_include_writes_made_since(client, post_checks):
+    post_checks("alpha")
+    assert client.get("/api/status/count").json() == {"count": 1}
+    assert client.head("/api/status", params={"client_name": "alpha"}).headers["x-total-count"] == "1"
+
+    post_checks("alpha", "beta")
+
+    assert client.get("/api/status/count").json() == {"count": 3}
+    assert client.head("/api/status", params={"client_name": "alpha"}).headers["x-total-count"] == "2"
+
+
+def test_count_rejects_malformed_bounds(client):
+    assert client.get("/api/status/count", params={"since": "yesterday"}).status_code == 422
+
+
+class SlowCollection:
+    """Counts its documents, then lets the test insert more before answering."""
+
+    def __init__(self, documents, counted):
+        self.documents = documents
+        self.counted = counted
+        self.release = asyncio.Event()
+
+    async def count_documents(self, query):
+        total = sum(1 for document in self.documents if document["client_name"] == query["client_name"])
+        self.counted.set()
+        await self.release.wait()
+        return total
+
+
+def test_inserts_during_an_in_flight_count_are_not_lost():
+    alpha = StatusFilter("alpha")
+
+    async def scenario():
+        cache = CountCache(ttl=60)
+        counted = asyncio.Event()
+        collection = SlowCollection([{"client_name": "alpha"}], counted)
+        query = asyncio.create_task(count_status_checks([collection], cache, alpha))
+        await counted.wait()
+        for name in ("alpha", "beta", "alpha"):
+            cache.record_insert({"client_name": name, "timestamp": datetime.utcnow()})
+        collection.release.set()
+        return await query, cache.get(alpha)
+
+    assert asyncio.run(scenario()) == (3, 3)
+
+
+def test_a_failed_count_caches_nothing():
+    class Failing:
+        async def count_documents(self, query):
+            raise RuntimeError("boom")
+
+    async def scenario():
+        cache = CountCache()
+        with pytest.raises(RuntimeError):
+            await count_status_checks([Failing()], cache, StatusFilter("alpha"))
+        return cache
+
+    cache = asyncio.run(scenario())
+
+    assert cache.get(StatusFilter("alpha")) is None
@@ -0,0 +1,88 @@
+import msgpack
+import pytest
+
+from encoding import choose_encoder, zstandard
+
+MSGPACK = {"Accept": "application/msgpack"}
+
+
+def get_raw(client, url, headers):
+    """The response and its body as sent, before httpx decodes it."""
+    with client.stream("GET", url, headers=headers) as response:
+        raw = b"".join(response.iter_raw())
+    return response, raw
+
+
+def test_status_list_negotiates_msgpack_with_native_timestamps(client, post_checks):
+    [created] = post_checks("alpha")
+
+    response = client.get("/api/status", headers=MSGPACK)
+
+    assert response.headers["content-type"] == "application/msgpack"
+    assert response.headers["vary"] == "Accept, Accept-Encoding"
+    [check] = msgpack.unpackb(response.content, timestamp=3)
+    assert check["id"] == created["id"]
+    assert check["timestamp"].isoformat().startswith(created["timestamp"][:19])
+
+
+def test_json_wins_ties_and_unknown_formats(client, post_checks):
+    post_checks("alpha")
+
+    for accept in ("application/json, application/msgpack;q=0.5", "text/html", "*/*"):
+        response = client.get("/api/status", headers={"Accept": accept})
+        assert response.headers["content-type"] == "application/json"
+        assert response.json()[0]["client_name"] == "alpha"
+
+
+def test_small_responses_are_not_compressed(client):
+    response = client.get("/api/", headers={"Accept-Encoding": "gzip"})
+
+    assert "content-encoding" not in response.headers
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert response.json() == {"message": "Hello World"}
+
+
+def test_responses_vary_on_accept_encoding_even_when_not_encoded(client):
+    response = client.get("/api/", headers={"Accept-Encoding": "identity"})
+
+    assert "content-encoding" not in response.headers
+    assert response.headers["vary"] == "Accept-Encoding"
+
+
+@pytest.mark.skipif(zstandard is None, reason="zstandard not installed")
+@pytest.mark.parametrize("accept_encoding, expected", [
+    ("gzip;q=1, zstd;q=0.1", "gzip"),
+    ("gzip, zstd", "zstd"),
+    ("gzip;q=0.5, zstd;q=0.5", "zstd"),
+    ("*", "zstd"),
+    ("zstd;q=0, *;q=0.5", "gzip"),
+    ("br, identity", None),
+    ("gzip;q=0", None),
+])
+def test_encoder_follows_q_values(accept_encoding, expected):
+    encoder = choose_encoder(accept_encoding)
+
+    assert (encoder.encoding if encoder else None) == expected
+
+
+@pytest.mark.parametrize("encoding", ["gzip", pytest.param("zstd", marks=pytest.mark.skipif(
+    zstandard is None, reason="zstandard not installed"))])
+def test_large_responses_are_compressed(client, post_checks, encoding):
+    post_checks(*(f"client-{i}" for i in range(30)))
+
+    plain = client.get("/api/status")
+    response, raw = get_raw(client, "/api/status", {"Accept-Encoding": encoding})
+
+    assert response.headers["content-encoding"] == encoding
+    assert "accept-encoding" in response.headers["vary"].lower()
+    assert len(raw) < len(plain.content)
+    assert client.get("/api/status", headers={"Accept-Encoding": encoding}).content == plain.content
+
+
+def test_msgpack_bodies_are_compressed_too(client, post_checks):
+    post_checks(*(f"client-{i}" for i in range(60)))
+
+    response = client.get("/api/status", headers={**MSGPACK, "Accept-Encoding": "gzip"})
+
+    assert response.headers["content-encoding"] == "gzip"
+    assert len(msgpack.unpackb(response.content, timestamp=3)) == 60
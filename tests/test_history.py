@@ -0,0 +1,51 @@
+import pytest
+
+from harness.history import HistoryStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    return HistoryStore(tmp_path / "history.sqlite")
+
+
+def record(store, runs, started_at=0):
+    """One harness run per (status, seconds) in ``runs``, oldest first."""
+    for offset, (status, seconds) in enumerate(runs):
+        store.record_run("harness", "suite", [("suite", "test_a", status, False, seconds, None)],
+                         started_at=started_at + offset)
+
+
+def test_slower_latest_run_is_flagged_against_the_baseline_median(store):
+    record(store, [("PASS", 0.10)] * 5 + [("PASS", 0.30)])
+
+    [regression] = store.regressions(min_runs=5)
+
+    assert (regression.suite, regression.test, regression.kind) == ("suite", "test_a", "runtime")
+    assert regression.baseline == pytest.approx(0.10)
+    assert regression.current == pytest.approx(0.30)
+    assert "3.0x" in regression.format()
+
+
+def test_noise_below_min_delta_and_short_histories_are_not_flagged(store):
+    record(store, [("PASS", 0.0001)] * 5 + [("PASS", 0.0009)])
+    assert store.regressions(min_runs=5) == []
+
+    assert store.regressions(min_runs=6) == []
+
+
+def test_new_failures_are_flagged_as_a_pass_rate_drop(store):
+    record(store, [("PASS", 0.1)] * 5 + [("FAIL", 0.1)])
+
+    [regression] = store.regressions(min_runs=5)
+
+    assert regression.kind == "pass_rate"
+    assert (regression.baseline, regression.current) == (1.0, 0.0)
+
+
+def test_cached_results_do_not_count_as_timings(store):
+    for offset in range(5):
+        store.record_run("harness", "suite", [("suite", "test_a", "PASS", True, 0.0, None)], started_at=offset)
+    record(store, [("PASS", 5.0)], started_at=10)
+
+    assert store.regressions(min_runs=5) == []
+    assert [run["tests"] for run in store.runs(limit=2)] == [1, 1]
@@ -0,0 +1,112 @@
+import asyncio
+import json
+
+from starlette.requests import ClientDisconnect
+
+from ingest import IngestSettings, IngestStream, iter_lines
+
+NDJSON = {"Content-Type": "application/x-ndjson"}
+
+
+class Check:
+    """Stand-in model for IngestStream: any JSON object is valid."""
+
+    def __init__(self, data):
+        self.data = data
+
+    @classmethod
+    def model_validate(cls, data):
+        return cls(data)
+
+
+def stream(client, body):
+    response = client.post("/api/status/stream", content=body, headers=NDJSON)
+    assert response.status_code == 200, response.text
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    return [json.loads(line) for line in response.text.splitlines()]
+
+
+def test_lines_are_acked_per_batch_and_stored(client, server, monkeypatch):
+    monkeypatch.setattr(server, "ingest_settings", IngestSettings(batch_size=2, flush_seconds=1))
+    body = "".join(f'{{"client_name": "agent-{i}"}}\n' for i in range(5))
+
+    acks = stream(client, body)
+
+    assert [ack["through_line"] for ack in acks[:-1]] == [2, 4, 5]
+    assert acks[-1] == {"done": True, "accepted": 5, "rejected": 0}
+    assert client.get("/api/status/count").json() == {"count": 5}
+
+
+def test_bad_lines_are_rejected_without_failing_the_stream(client, server, monkeypatch):
+    monkeypatch.setattr(server, "ingest_settings", IngestSettings(max_line_bytes=64))
+    body = '{"client_name": "ok"}\nnot json\n\n{"name": "x"}\n{"client_name": "' + "x" * 100 + '"}\n{"client_name": "last"}'
+
+    acks = stream(client, body)
+
+    rejected = [entry["line"] for ack in acks[:-1] for entry in ack["rejected"]]
+    assert rejected == [2, 4, 5]
+    assert acks[-1] == {"done": True, "accepted": 2, "rejected": 3}
+    assert client.get("/api/clients").json() == {"clients": ["last", "ok"]}
+
+
+def test_a_slow_store_stops_the_body_being_read():
+    settings = IngestSettings(batch_size=2, flush_seconds=0.01, queue_size=4)
+    chunks_read = 0
+
+    async def chunks():
+        nonlocal chunks_read
+        for i in range(100):
+            chunks_read += 1
+            yield b'{"n": %d}\n' % i
+
+    async def scenario():
+        unblock = asyncio.Event()
+
+        async def store(checks):
+            await unblock.wait()
+
+        acks = IngestStream(settings, Check, store).acks(chunks())
+        first_ack = asyncio.ensure_future(acks.__anext__())
+        await asyncio.sleep(0.1)
+        read_while_blocked = chunks_read
+        unblock.set()
+        await first_ack
+        remaining = [ack async for ack in acks]
+        return read_while_blocked, remaining[-1]
+
+    read_while_blocked, done = asyncio.run(scenario())
+
+    # One batch being stored, a full queue, and the line waiting to go in
+    assert read_while_blocked <= settings.batch_size + settings.queue_size + 1
+    assert done == {"done": True, "accepted": 100, "rejected": 0}
+
+
+def test_lines_split_across_chunks_are_reassembled():
+    async def chunks():
+        for chunk in (b'{"a": 1}\n{"b"', b': 2}\n\n', b'{"c": 3}\n{"d": 4}', b"\n" + b"x" * 20, b"x\n{}"):
+            yield chunk
+
+    async def scenario():
+        return [(number, line) async for number, line in iter_lines(chunks(), max_line_bytes=16)]
+
+    assert asyncio.run(scenario()) == [
+        (1, b'{"a": 1}'), (2, b'{"b": 2}'), (4, b'{"c": 3}'), (5, b'{"d": 4}'), (6, None), (7, b"{}"),
+    ]
+
+
+def test_a_failed_read_ends_with_an_error_not_done():
+    async def chunks():
+        yield b'{"n": 1}\n{"n": 2}\n'
+        raise ClientDisconnect()
+
+    async def scenario():
+        async def store(checks):
+            pass
+
+        return [ack async for ack in IngestStream(IngestSettings(flush_seconds=0.01), Check, store).acks(chunks())]
+
+    acks = asyncio.run(scenario())
+
+    assert acks[0]["through_line"] == 2
+    assert "done" not in acks[-1]
+    assert acks[-1]["accepted"] == 2 and "disconnected" in acks[-1]["error"]
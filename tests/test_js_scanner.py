@@ -0,0 +1,82 @@
+import pytest
+
+from harness.js_scanner import JsSymbols, JsSyntaxError, SymbolTable, tokenize
+from harness.source_index import SourceIndex
+
+BOT_JS = """const bot = new TelegramBot(token);
+
+function showStatus(chatId) {
+  const msg = `Status: ${state.ok ? "}" : '{'}`; // a } in a comment
+  if (/[}]/.test(msg)) { return "}"; }
+}
+
+const sendMenu = async (chatId) => {
+  bot.sendMessage(chatId, "menu", { reply_markup: { inline_keyboard: [[{ text: "Go", callback_data: 'go_now' }]] } });
+};
+
+class Wallet {
+  static create() { return new Wallet(); }
+  balance() { return 0; }
+}
+
+bot.onText(/\\/start (.+)/, (msg, match) => showStatus(msg.chat.id));
+"""
+
+
+@pytest.fixture
+def bot_dir(tmp_path):
+    (tmp_path / "bot.js").write_text(BOT_JS)
+    return tmp_path
+
+
+def test_symbol_table_finds_functions_methods_handlers_and_callbacks(bot_dir):
+    table = JsSymbols(SourceIndex(bot_dir), cache_dir=None).table("bot.js")
+
+    assert [(span.name, span.kind, span.line) for span in table.all_functions] == [
+        ("showStatus", "function", 3),
+        ("sendMenu", "function", 8),
+        ("Wallet.create", "method", 13),
+        ("Wallet.balance", "method", 14),
+    ]
+    assert [span.name for span in table.handlers] == ["/\\/start (.+)/"]
+    assert [(span.name, span.line) for span in table.callback_data] == [("go_now", 9)]
+
+
+def test_body_ignores_braces_in_strings_templates_regexes_and_comments(bot_dir):
+    body = JsSymbols(SourceIndex(bot_dir), cache_dir=None).body("bot.js", "showStatus")
+
+    assert body.startswith("function showStatus(chatId) {")
+    assert body.endswith('return "}"; }\n}')
+    assert JsSymbols(SourceIndex(bot_dir), cache_dir=None).body("bot.js", "missing") is None
+
+
+def test_tables_are_cached_by_content_hash(bot_dir, tmp_path_factory):
+    cache_dir = tmp_path_factory.mktemp("cache")
+    first = JsSymbols(SourceIndex(bot_dir), cache_dir=cache_dir)
+    first.table("bot.js")
+
+    second = JsSymbols(SourceIndex(bot_dir), cache_dir=cache_dir)
+    table = second.table("bot.js")
+    assert (second.parsed, second.cache_hits) == (0, 1)
+    assert table.functions["sendMenu"].line == 8
+
+    (bot_dir / "bot.js").write_text(BOT_JS.replace("sendMenu", "sendMainMenu"))
+    third = JsSymbols(SourceIndex(bot_dir), cache_dir=cache_dir)
+    assert "sendMainMenu" in third.table("bot.js").functions
+    assert (third.parsed, third.cache_hits) == (1, 0)
+
+
+def test_table_round_trips_through_its_cache_format(bot_dir):
+    table = JsSymbols(SourceIndex(bot_dir), cache_dir=None).table("bot.js")
+
+    copy = SymbolTable.from_dict(table.to_dict())
+
+    assert [span.to_list() for span in copy.all_functions] == [span.to_list() for span in table.all_functions]
+    with pytest.raises(ValueError):
+        SymbolTable.from_dict(table.to_dict() | {"version": -1})
+
+
+def test_unterminated_literals_are_syntax_errors():
+    for source in ('const a = "open;', "const b = `open ${x};", "const c = /open;"):
+        with pytest.raises(JsSyntaxError):
+            tokenize(source)
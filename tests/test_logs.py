@@ -0,0 +1,28 @@
+import logging
+
+from logs import parse_sample_rates
+
+
+def access_records(caplog):
+    return [record for record in caplog.records if record.name == "access"]
+
+
+def test_request_ids_are_echoed_or_generated(client):
+    assert client.get("/api/", headers={"X-Request-ID": "trace-42"}).headers["x-request-id"] == "trace-42"
+
+    generated = client.get("/api/", headers={"X-Request-ID": "no spaces\tor tabs"}).headers["x-request-id"]
+    assert generated != "no spaces\tor tabs" and len(generated) == 32
+
+
+def test_access_record_carries_route_status_and_request_id(client, caplog):
+    with caplog.at_level(logging.INFO, logger="access"):
+        client.get("/api/status/count", params={"client_name": "alpha"}, headers={"X-Request-ID": "abc"})
+
+    [record] = access_records(caplog)
+    assert (record.route, record.method, record.status, record.request_id) == ("/api/status/count", "GET", 200, "abc")
+    assert record.duration_ms >= 0
+
+
+def test_sample_rates_parse_per_route_with_a_default():
+    assert parse_sample_rates("/api/status=0.1, *=0.5") == {"/api/status": 0.1, "*": 0.5}
+    assert parse_sample_rates(None) == {"*": 1.0}
@@ -0,0 +1,49 @@
+import json
+
+from harness.manifest import Manifest, input_hashes
+from harness.source_index import SourceIndex
+
+
+def test_entry_is_replayed_only_for_the_same_code_and_inputs(tmp_path):
+    (tmp_path / "bot.js").write_text("const a = 1;\n")
+    index = SourceIndex(tmp_path)
+    inputs = input_hashes(index, ["bot.js"])
+    manifest = Manifest(tmp_path / "manifest.json")
+    manifest.record("suite::test_a", "code-1", inputs, True, [{"status": "PASS"}], "ok\n")
+
+    assert manifest.cached("suite::test_a", "code-1", inputs)["output"] == "ok\n"
+    assert manifest.cached("suite::test_a", "code-2", inputs) is None
+    assert manifest.cached("suite::test_b", "code-1", inputs) is None
+
+    (tmp_path / "bot.js").write_text("const a = 2;\n")
+    assert index.refresh() == ["bot.js"]
+    assert manifest.cached("suite::test_a", "code-1", input_hashes(index, ["bot.js"])) is None
+
+
+def test_missing_inputs_hash_to_none_until_they_appear(tmp_path):
+    index = SourceIndex(tmp_path)
+    missing = input_hashes(index, ["later.js"])
+    manifest = Manifest(tmp_path / "manifest.json")
+    manifest.record("suite::test_a", "code", missing, True, [], "")
+
+    assert missing == {"later.js": None}
+    (tmp_path / "later.js").write_text("// here now\n")
+    assert manifest.cached("suite::test_a", "code", input_hashes(SourceIndex(tmp_path), ["later.js"])) is None
+
+
+def test_saved_manifest_loads_back_and_bad_files_start_empty(tmp_path):
+    path = tmp_path / "cache" / "manifest.json"
+    manifest = Manifest(path)
+    manifest.record_suite("suite", "code", [("test_a", ("bot.js",)), ("test_b", None)])
+    manifest.record("suite::test_a", "code", {"bot.js": "abc"}, False, [], "failed\n")
+    manifest.save()
+
+    loaded = Manifest.load(path)
+    assert loaded.suite_tests("suite", "code") == [("test_a", ("bot.js",)), ("test_b", None)]
+    assert loaded.suite_tests("suite", "other code") is None
+    assert loaded.cached("suite::test_a", "code", {"bot.js": "abc"})["passed"] is False
+
+    path.write_text("{not json")
+    assert Manifest.load(path).tests == {}
+    path.write_text(json.dumps({"version": -1, "tests": {"x": {}}}))
+    assert Manifest.load(path).tests == {}
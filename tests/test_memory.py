@@ -0,0 +1,81 @@
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from memory import RSSSampler, SnapshotStore, growth_per_hour
+from tests.conftest import ADMIN
+
+
+@pytest.fixture
+def admin(client, server, monkeypatch):
+    monkeypatch.setattr(server, "rss_sampler", RSSSampler(interval=0))
+    monkeypatch.setattr(server, "memory_snapshots", SnapshotStore(keep=2))
+    yield client
+    tracemalloc.stop()
+
+
+def test_memory_routes_require_the_admin_token(client):
+    assert client.get("/api/admin/memory").status_code == 403
+    assert client.get("/api/admin/memory", headers={"X-Admin-Token": "wrong"}).status_code == 403
+
+
+def test_memory_reports_rss_and_tracing_state(admin):
+    memory = admin.get("/api/admin/memory", headers=ADMIN).json()
+
+    assert memory["rss"]["rss_bytes"] > 0
+    assert memory["tracemalloc"]["tracing"] is False
+
+
+def test_snapshots_need_tracing_and_diff_shows_growth(admin):
+    assert admin.post("/api/admin/memory/snapshots", headers=ADMIN).status_code == 409
+
+    started = admin.post("/api/admin/memory/tracemalloc", params={"frames": 2}, headers=ADMIN).json()
+    assert (started["tracing"], started["frames"]) == (True, 2)
+    base = admin.post("/api/admin/memory/snapshots", headers=ADMIN).json()["id"]
+    leak = [bytearray(1024) for _ in range(1000)]
+    growth = admin.get("/api/admin/memory/diff", params={"from": base, "top": 5}, headers=ADMIN).json()
+
+    assert growth["from"] == base and growth["to"] == base + 1
+    [top] = [site for site in growth["growth"] if "test_memory.py" in site["site"]][:1]
+    assert top["size_diff"] >= len(leak) * 1024
+    del leak
+
+
+def test_old_snapshots_are_dropped_and_stopping_frees_them(admin):
+    admin.post("/api/admin/memory/tracemalloc", headers=ADMIN)
+    ids = [admin.post("/api/admin/memory/snapshots", headers=ADMIN).json()["id"] for _ in range(3)]
+
+    assert admin.get(f"/api/admin/memory/snapshots/{ids[0]}", headers=ADMIN).status_code == 404
+    assert admin.get(f"/api/admin/memory/snapshots/{ids[-1]}", headers=ADMIN).status_code == 200
+    stopped = admin.delete("/api/admin/memory/tracemalloc", headers=ADMIN).json()
+    assert (stopped["tracing"], stopped["snapshots"]) == (False, [])
+
+
+def test_object_counts_track_live_models(admin, post_checks):
+    post_checks("alpha")
+
+    counts = admin.get("/api/admin/memory/objects", params={"top": 3}, headers=ADMIN).json()
+
+    assert set(counts["tracked"]) >= {"StatusCheck", "AsyncIOMotorCursor"}
+    assert len(counts["most_common"]) == 3
+
+
+def test_growth_is_a_least_squares_slope_per_hour():
+    assert growth_per_hour([(0, 100)]) is None
+    assert growth_per_hour([(0, 100), (1800, 200), (3600, 300)]) == pytest.approx(200)
+
+
+def test_snapshots_taken_on_other_threads_never_disturb_status():
+    store = SnapshotStore(keep=1)
+    store.start()
+    try:
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            taken = [pool.submit(store.take) for _ in range(8)]
+            while not all(future.done() for future in taken):
+                assert len(store.status()["snapshots"]) <= 1
+        ids = sorted(future.result() for future in taken)
+    finally:
+        store.stop()
+
+    assert ids == list(range(1, 9))
@@ -0,0 +1,124 @@
+import asyncio
+from datetime import datetime
+
+import pytest
+from mongomock_motor import AsyncMongoMockClient
+
+from partitions import PartitionRouter, parse_cursor
+from storage import LegacyCodec
+
+
+def monthly(server, monkeypatch):
+    router = PartitionRouter("status_checks", "month", codec=server.status_codec)
+    monkeypatch.setattr(server, "partitions", router)
+    return router
+
+
+def store(client, server, *checks):
+    """Insert (client_name, timestamp) checks through the normal write path."""
+    client.portal.call(server.store_status_checks, [
+        server.StatusCheck(client_name=name, timestamp=timestamp) for name, timestamp in checks
+    ])
+
+
+@pytest.mark.parametrize("granularity, name", [
+    ("year", "status_checks_2026"),
+    ("month", "status_checks_2026_10"),
+    ("day", "status_checks_2026_10_19"),
+])
+def test_partition_names_round_trip_to_their_period(granularity, name):
+    router = PartitionRouter("status_checks", granularity)
+
+    assert router.partition_name(datetime(2026, 10, 19, 12, 30)) == name
+    start, end = router.partition_range(name)
+    assert start <= datetime(2026, 10, 19, 12, 30) < end
+
+
+def test_names_outside_the_scheme_are_not_partitions():
+    router = PartitionRouter("status_checks", "month")
+
+    assert router.partition_range("status_checks_2026") is None
+    assert router.partition_range("status_checks_2026_10_19") is None
+    assert router.partition_range("status_checks_backup") is None
+    assert router.partition_range("status_checks_2025_12") == (datetime(2025, 12, 1), datetime(2026, 1, 1))
+
+
+def test_reads_only_touch_partitions_overlapping_the_range():
+    async def scenario():
+        database = AsyncMongoMockClient()["test"]
+        router = PartitionRouter("status_checks", "month", codec=LegacyCodec())
+        for month in (1, 2, 3):
+            await router.for_write(database, datetime(2026, month, 10))
+        await database.create_collection("status_checks_archive")
+        return (
+            await router.for_range(database),
+            await router.for_range(database, since=datetime(2026, 2, 15), until=datetime(2026, 3, 1)),
+            await router.for_range(database, since=datetime(2026, 3, 1)),
+        )
+
+    everything, february, march_on = asyncio.run(scenario())
+
+    assert everything == ["status_checks_2026_01", "status_checks_2026_02", "status_checks_2026_03"]
+    assert february == ["status_checks_2026_02"]
+    assert march_on == ["status_checks_2026_03"]
+
+
+def test_retention_drops_only_partitions_wholly_before_the_cutoff():
+    async def scenario():
+        database = AsyncMongoMockClient()["test"]
+        router = PartitionRouter("status_checks", "month", codec=LegacyCodec())
+        for month in (1, 2, 3):
+            await router.for_write(database, datetime(2026, month, 10))
+        dropped = await router.drop_before(database, datetime(2026, 2, 15))
+        return dropped, await router.for_range(database)
+
+    dropped, remaining = asyncio.run(scenario())
+
+    assert dropped == ["status_checks_2026_01"]
+    assert remaining == ["status_checks_2026_02", "status_checks_2026_03"]
+
+
+def test_listing_merges_partitions_in_time_order(client, server, monkeypatch):
+    monthly(server, monkeypatch)
+    store(
+        client, server,
+        ("march", datetime(2026, 3, 5)), ("january", datetime(2026, 1, 5)), ("february", datetime(2026, 2, 5)),
+    )
+
+    listed = client.get("/api/status").json()
+    ranged = client.get("/api/status", params={"since": "2026-02-01T00:00:00"}).json()
+
+    assert [check["client_name"] for check in listed] == ["january", "february", "march"]
+    assert [check["client_name"] for check in ranged] == ["february", "march"]
+
+
+def test_after_cursor_pages_across_partitions_and_timestamp_ties(client, server, monkeypatch):
+    monthly(server, monkeypatch)
+    tie = datetime(2026, 2, 28, 23, 59, 59)
+    store(
+        client, server,
+        ("a", datetime(2026, 1, 5)), ("b", tie), ("c", tie), ("d", tie), ("e", datetime(2026, 3, 1)),
+    )
+
+    pages, params = [], {"limit": 2}
+    while True:
+        page = client.get("/api/status", params=params).json()
+        if not page:
+            break
+        pages.append(page)
+        params["after"] = f"{page[-1]['timestamp']},{page[-1]['id']}"
+
+    listed = [check for page in pages for check in page]
+    assert [len(page) for page in pages] == [2, 2, 1]
+    assert len({check["id"] for check in listed}) == 5
+    assert [check["timestamp"] for check in listed] == sorted(check["timestamp"] for check in listed)
+    assert listed[0]["client_name"] == "a" and listed[-1]["client_name"] == "e"
+
+
+def test_malformed_cursors_are_rejected(client):
+    assert client.get("/api/status", params={"after": "yesterday"}).status_code == 422
+    assert client.get("/api/status", params={"after": "not-a-time,abc"}).status_code == 422
+
+
+def test_cursor_timestamps_are_naive_utc():
+    assert parse_cursor("2026-10-19T12:00:00+02:00,abc") == (datetime(2026, 10, 19, 10), "abc")
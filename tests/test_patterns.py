@@ -0,0 +1,37 @@
+import pytest
+
+from harness.patterns import Automaton, PatternScanner, ahocorasick, source
+from harness.source_index import SourceIndex
+
+
+@pytest.fixture
+def tree(tmp_path):
+    (tmp_path / "collide.js").write_text("const manager = new TaxManager();\nTAXMANAGER = 1;\n")
+    return tmp_path
+
+
+def test_needles_differing_only_in_case_are_resolved_separately(tree):
+    checks = source("collide.js")
+    exact = checks.has("TaxManager")
+    camel = checks.has("taxManager")
+    upper = checks.has("TAXMANAGER")
+    folded = checks.has_i("TaxManager", at_least=2)
+
+    scanner = PatternScanner(SourceIndex(tree))
+    results = scanner.evaluate({"exact": exact, "camel": camel, "upper": upper, "folded": folded})
+
+    assert results == {"exact": True, "camel": False, "upper": True, "folded": True}
+
+
+@pytest.mark.skipif(ahocorasick is None, reason="pyahocorasick not installed")
+def test_automaton_counts_every_key_of_a_shared_word():
+    text = "TaxManager taxmanager TaxManager"
+    keys = {("TaxManager", False), ("taxManager", False), ("taxmanager", True), ("taxmanager", False)}
+
+    table = Automaton(keys).scan(text, text.lower())
+
+    for needle, ignore_case in keys:
+        haystack = text.lower() if ignore_case else text
+        assert table.has((needle, ignore_case), haystack.count(needle) or 1) == (needle in haystack)
+    assert table.has(("taxmanager", True), 3)
+    assert not table.has(("TaxManager", False), 3)
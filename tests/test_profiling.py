@@ -0,0 +1,51 @@
+import os
+import threading
+from pathlib import Path
+
+from profiling import ProfileStore, StackSampler
+from tests.conftest import ADMIN
+
+PROFILE = {"X-Profile": "1", **ADMIN}
+
+
+def test_sampler_samples_work_shorter_than_its_interval():
+    sampler = StackSampler(threading.get_ident(), interval=1.0)
+    sampler.start()
+    sampler.stop()
+
+    assert sum(sampler.samples.values()) >= 1
+    assert sampler.collapsed().strip()
+
+
+def test_profiled_request_returns_and_keeps_the_profile(client):
+    response = client.get("/api/", headers=PROFILE)
+
+    assert response.status_code == 200
+    assert response.headers["x-profiled-status"] == "200"
+    assert int(response.headers["x-profile-samples"]) >= 1
+    saved = Path(os.environ["PROFILE_DIR"]) / response.headers["x-profile-file"]
+    assert saved.read_bytes() == response.content
+
+
+def test_pstats_mode_returns_a_cprofile_dump(client):
+    response = client.get("/api/", headers={"X-Profile": "pstats", **ADMIN})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/octet-stream"
+    assert response.content
+
+
+def test_profiling_requires_the_admin_token(client):
+    assert client.get("/api/", headers={"X-Profile": "1"}).status_code == 403
+    assert client.get("/api/").json() == {"message": "Hello World"}
+
+
+def test_rotation_keeps_the_newest_profiles_and_nothing_else(tmp_path):
+    (tmp_path / "notes.txt").write_text("keep me")
+    (tmp_path / "capture.prof").write_bytes(b"not ours")
+    store = ProfileStore(tmp_path, keep=2)
+
+    saved = [store.save("GET", f"/api/{n}", "prof", b"profile") for n in range(4)]
+
+    assert store.profiles() == saved[-2:]
+    assert (tmp_path / "notes.txt").exists() and (tmp_path / "capture.prof").exists()
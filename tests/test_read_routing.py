@@ -0,0 +1,77 @@
+import pytest
+from pymongo import ReadPreference
+
+from read_routing import PIN_COOKIE, PIN_HEADER, SECONDARY_PREFERRED, ReadRouter
+
+
+def test_secondary_reads_are_bounded_to_the_mongodb_minimum_by_default():
+    router = ReadRouter.from_env({"MONGO_READ_PREFERENCE": SECONDARY_PREFERRED})
+
+    assert router.read_preference.max_staleness == 90
+
+
+def test_no_staleness_bound_is_an_explicit_opt_out():
+    router = ReadRouter.from_env({"MONGO_READ_PREFERENCE": SECONDARY_PREFERRED, "MONGO_MAX_STALENESS_SECONDS": "-1"})
+
+    assert router.read_preference.max_staleness == -1
+
+
+@pytest.mark.parametrize("seconds", ["0", "30", "89"])
+def test_bounds_mongodb_would_reject_fail_at_startup(seconds):
+    with pytest.raises(ValueError, match="at least 90"):
+        ReadRouter.from_env({"MONGO_READ_PREFERENCE": SECONDARY_PREFERRED, "MONGO_MAX_STALENESS_SECONDS": seconds})
+
+
+def test_recent_writers_read_from_the_primary():
+    router = ReadRouter(SECONDARY_PREFERRED, pin_seconds=60)
+
+    router.record_write("alpha")
+
+    assert router.is_pinned("alpha")
+    assert not router.is_pinned("beta")
+
+
+def test_pin_tokens_hold_on_any_worker_sharing_the_secret():
+    issuing, other = (ReadRouter(SECONDARY_PREFERRED, secret="shared") for _ in range(2))
+    token = issuing.issue_pin()
+
+    assert other.holds_pin(token)
+    assert not ReadRouter(SECONDARY_PREFERRED, secret="elsewhere").holds_pin(token)
+    assert not other.holds_pin(token[:-1] + ("0" if token[-1] != "0" else "1"))
+    assert not other.holds_pin(None)
+
+
+def test_pin_tokens_expire_with_the_window():
+    router = ReadRouter(SECONDARY_PREFERRED, pin_seconds=-1, secret="shared")
+
+    assert not router.holds_pin(router.issue_pin())
+
+
+def test_writes_hand_back_a_pin_the_next_worker_honors(client, server, monkeypatch):
+    monkeypatch.setattr(server, "read_router", ReadRouter(SECONDARY_PREFERRED, secret="shared"))
+    written = client.post("/api/status", json={"client_name": "alpha"})
+    token = written.headers[PIN_HEADER]
+    assert client.cookies[PIN_COOKIE] == token
+
+    # A different worker: no in-memory pin for this reader, only the token
+    worker = ReadRouter(SECONDARY_PREFERRED, secret="shared")
+    monkeypatch.setattr(server, "read_router", worker)
+    handles = []
+    route = worker.for_read
+
+    def for_read(*args):
+        handles.append(route(*args))
+        return handles[-1]
+
+    monkeypatch.setattr(worker, "for_read", for_read)
+
+    listed = client.get("/api/status", headers={PIN_HEADER: token})
+
+    assert [check["client_name"] for check in listed.json()] == ["alpha"]
+    assert handles and all(handle.read_preference == ReadPreference.PRIMARY for handle in handles)
+
+
+def test_primary_mode_hands_out_no_pins(client):
+    response = client.post("/api/status", json={"client_name": "alpha"})
+
+    assert PIN_HEADER not in response.headers
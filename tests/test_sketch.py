@@ -0,0 +1,52 @@
+import pytest
+
+from sketches import RollingSketches
+
+
+class Clock:
+    def __init__(self, now=1_000_000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(server, monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(server, "status_sketches", RollingSketches(bucket_seconds=60, buckets=10, clock=clock))
+    return clock
+
+
+def sketch(client, **params):
+    response = client.get("/api/status/sketch", params=params)
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def test_sketch_summarises_recent_inserts(client, clock, post_checks):
+    post_checks(*["alpha"] * 5, *["beta"] * 3, "gamma")
+
+    summary = sketch(client, window=300, top=2, client_name="beta")
+
+    assert summary["checks"] == 9
+    assert summary["distinct_clients"] == 3
+    assert [(hitter["client_name"], hitter["count"]) for hitter in summary["heavy_hitters"]] == [("alpha", 5), ("beta", 3)]
+    assert summary["client_checks"] == 3
+    assert sketch(client)["client_checks"] is None
+
+
+def test_inserts_age_out_of_the_window(client, clock, post_checks):
+    post_checks("alpha", "beta")
+    clock.now += 120
+    post_checks("gamma")
+
+    assert sketch(client, window=60)["checks"] == 1
+    assert sketch(client, window=300)["checks"] == 3
+    clock.now += 3600
+    expired = sketch(client, window=300)
+    assert (expired["checks"], expired["distinct_clients"], expired["heavy_hitters"]) == (0, 0, [])
+
+
+def test_window_must_be_positive(client, clock):
+    assert client.get("/api/status/sketch", params={"window": 0}).status_code == 422
@@ -0,0 +1,88 @@
+import asyncio
+import uuid
+from datetime import datetime
+
+import msgpack
+from bson.binary import UUID_SUBTYPE, Binary
+from mongomock_motor import AsyncMongoMockClient
+
+import partitions
+from counts import CountCache
+from partitions import PartitionRouter
+from storage import CompactCodec, LegacyCodec
+
+CHECKS = [
+    ("7f0c2a1e-3b4d-4c5e-8f60-718293a4b5c6", "alpha", datetime(2026, 10, 19, 9, 0, 0, 125000)),
+    ("0a1b2c3d-4e5f-4a6b-9c7d-8e9fa0b1c2d3", "beta", datetime(2026, 10, 19, 9, 0, 0, 125000)),
+    ("d3c2b1a0-f9e8-4d7c-b6a5-948372615041", "alpha", datetime(2026, 10, 19, 9, 5)),
+]
+
+
+def test_compact_documents_round_trip_to_the_model(server):
+    codec = CompactCodec()
+    check = server.StatusCheck(id=CHECKS[0][0], client_name="alpha", timestamp=CHECKS[0][2])
+
+    document = codec.encode(check)
+    document["s"] = 7
+
+    assert set(document) == {"_id", "c", "t", "s"}
+    assert codec.decode_many([document]) == [{**check.model_dump(), "seq": 7}]
+
+
+def test_compact_ids_are_binary_uuids(server):
+    check = server.StatusCheck(id=CHECKS[0][0], client_name="alpha")
+
+    stored = CompactCodec().encode(check)["_id"]
+
+    assert isinstance(stored, Binary) and stored.subtype == UUID_SUBTYPE
+    assert stored.as_uuid() == uuid.UUID(check.id)
+
+
+def responses(client, server, monkeypatch, codec):
+    monkeypatch.setattr(server, "status_codec", codec)
+    monkeypatch.setattr(server, "partitions", PartitionRouter("status_checks", codec=codec))
+    monkeypatch.setattr(server, "count_cache", CountCache(ttl=5))
+    client.portal.call(server.store_status_checks, [
+        server.StatusCheck(id=check_id, client_name=name, timestamp=timestamp) for check_id, name, timestamp in CHECKS
+    ])
+    first = client.get("/api/status", params={"limit": 2}).json()
+    cursor = f"{first[-1]['timestamp']},{first[-1]['id']}"
+    stored = client.portal.call(server.db.status_checks.find_one, {codec.fields["client_name"]: "beta"})
+    return stored, [
+        client.get("/api/status").content,
+        client.get("/api/status", params={"client_name": "alpha"}).content,
+        client.get("/api/status", params={"after": cursor}).content,
+        client.get("/api/status", headers={"Accept": "application/msgpack"}).content,
+        client.get("/api/status/changes").content,
+        client.get("/api/status/count").content,
+    ]
+
+
+def test_api_responses_are_identical_under_either_schema(client, server, monkeypatch):
+    _, legacy = responses(client, server, monkeypatch, LegacyCodec())
+    client.portal.call(server.db.status_checks.drop)
+    client.portal.call(server.db.counters.drop)
+    stored, compact = responses(client, server, monkeypatch, CompactCodec(block_compressor=""))
+
+    assert compact == legacy
+    assert [check["client_name"] for check in msgpack.unpackb(compact[3])] == ["beta", "alpha", "alpha"]
+    assert stored["_id"] == Binary(uuid.UUID(CHECKS[1][0]).bytes, UUID_SUBTYPE)
+
+
+def test_the_collection_is_created_before_the_first_write(monkeypatch):
+    created = []
+
+    async def ensure_collection(database, name, codec):
+        created.append(name)
+
+    monkeypatch.setattr(partitions, "ensure_collection", ensure_collection)
+
+    async def scenario():
+        database = AsyncMongoMockClient()["test"]
+        router = PartitionRouter("status_checks", codec=CompactCodec())
+        for _ in range(3):
+            collection = await router.for_write(database, datetime.utcnow())
+        return collection.name
+
+    assert asyncio.run(scenario()) == "status_checks"
+    assert created == ["status_checks"]
@@ -0,0 +1,15 @@
+import pytest
+
+from harness.watch import _ignored
+
+
+@pytest.mark.parametrize("name", [
+    "sedAb12Xy", "4913", "5036", "bot.js~", ".bot.js.swp", "bot.js.swo", "#bot.js#", ".hidden", "",
+])
+def test_editor_and_sed_scratch_files_are_ignored(name):
+    assert _ignored(name)
+
+
+@pytest.mark.parametrize("name", ["bot.js", "sed.js", "seduce.js", "4913.js", "package.json"])
+def test_real_sources_are_watched(name):
+    assert not _ignored(name)